@@ -49,10 +49,11 @@ app.use('/api/batch', (await import('./routes/batch.js')).default);
 app.use('/api/real', (await import('./routes/realData.js')).default);
 
 // LLM Proxy Routes (Python LLM servers on GPUs)
-// 포트 4 (5004): keyword-why (GPU 4 전용 - 안정성 향상)
-// 포트 5 (5005): sns-analysis, category-trend
-// 포트 6 (5006): review-summary, category-strategy, country-strategy
-// 포트 7 (5007): rag-insight, chat/text, chat/multimodal
+// 포트 4 (5004): keyword-why, category-trend (GPU 4 전용 - 안정성 향상)
+// 포트 5 (5005): sns-analysis, whitespace-product
+// 포트 6 (5006): review-summary, category-strategy, country-strategy, whitespace-category
+// 포트 7 (5007): rag-insight, plc/category-prediction, chat/text, chat/multimodal
+// 포트별 엔드포인트 구성은 llm_host.json (Python 호스트 한 프로세스로 5004-5007 실행)
 const LLM_SERVER_PORT4 = process.env.LLM_SERVER_PORT4 || 'http://localhost:5004';  // llm_server_port4.py: keyword-why (dedicated GPU 4)
 const LLM_SERVER_PORT5 = process.env.LLM_SERVER_PORT5 || 'http://localhost:5005';  // llm_server_port5.py: sns-analysis
 const LLM_SERVER_PORT6 = process.env.LLM_SERVER_PORT6 || 'http://localhost:5006';  // llm_server_port6.py: review-summary, category-strategy
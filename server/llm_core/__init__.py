@@ -0,0 +1,12 @@
+"""
+AMORE CLUE LLM 서버 공용 모듈
+- batching: EXAONE 서버들이 공유하는 continuous batching 추론 엔진
+- prefix_cache / streaming: 시스템 프롬프트 KV cache 재사용, SSE 토큰 스트리밍
+- structured: 엔드포인트별 출력 형식(섹션/JSON)을 디코딩 단계에서 강제
+- rag / rag_index: RAG 검색 인덱스 (쿼리 인코더는 프로세스당 1개 공유)
+- runtime / registry / host: 디바이스별 모델 로드, 엔드포인트 레지스트리, 멀티 포트 호스트
+- endpoints: 엔드포인트 구현 (llm_host.json에서 포트별로 골라 마운트)
+
+각 서브모듈은 필요한 의존성(torch 등)을 직접 import 하므로
+패키지 자체는 가볍게 유지합니다. (예: from llm_core.batching import ContinuousBatchingEngine)
+"""
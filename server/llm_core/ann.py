@@ -0,0 +1,228 @@
+"""
+RAG 근사 최근접 이웃(ANN) 검색 백엔드 (CPU)
+- exact: 전체 내적 + argpartition (기본, 문서 수가 적으면 항상 사용)
+- ivf: k-means 코어스 양자화 + nprobe개 클러스터만 검색 (numpy만 사용, 추가 의존성 없음)
+- hnsw: hnswlib 설치 시 사용 가능한 그래프 인덱스
+- 인덱스 파일은 rag_index 디렉터리에 임베딩과 함께 저장, manifest.json의 "ann" 항목에 기록
+- 검색 폭은 요청별로 조절: ivf는 nprobe, hnsw는 ef (rag.INSIGHT_SEARCH에서 insight_type별 지정)
+- 여러 쿼리는 search_many (exact는 행렬곱 1회)
+
+기존 인덱스에 빌드: python -m llm_core.ann <index_dir> [ivf|hnsw] (현재 버전을 복사한 새 버전에 빌드 후 게시)
+"""
+import math
+import os
+import sys
+import threading
+
+import numpy as np
+
+from llm_core.rag_index import (
+    SCORE_CHUNK_ROWS, RagIndex, publish_index_version, restage_index_version, set_manifest_entry, top_k_rows,
+)
+
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSW_AVAILABLE = False
+
+# 이보다 문서가 적으면 ANN 인덱스가 있어도 exact 검색 (전체 내적이 더 빠르고 정확)
+ANN_MIN_DOCUMENTS = int(os.environ.get("LLM_RAG_ANN_MIN_DOCS", "5000"))
+# LLM_RAG_ANN=exact|ivf|hnsw: 서버는 manifest 대신 이 백엔드로 검색 (exact로 강제 등),
+# 빌드 스크립트(scripts/build_rag_embeddings.py, rebuild_rag_embeddings.py)는 이 백엔드로 빌드 (없으면 ivf)
+ANN_BACKEND_OVERRIDE = os.environ.get("LLM_RAG_ANN", "")
+DEFAULT_BUILD_BACKEND = "ivf"
+
+IVF_CENTROIDS_FILE = "ann_ivf_centroids.npy"
+IVF_ROWS_FILE = "ann_ivf_rows.npy"
+IVF_OFFSETS_FILE = "ann_ivf_offsets.npy"
+HNSW_FILE = "ann_hnsw.bin"
+
+DEFAULT_NPROBE = 8
+DEFAULT_EF = 64
+
+
+def _filter_type_ids(index: RagIndex, doc_types):
+    """검색 대상 type 번호 배열 (필터 없음/해당 type 없음이면 None → 전체 검색)"""
+    if not doc_types:
+        return None
+    ids = [index.types.index(name) for name in doc_types if name in index.types]
+    return np.asarray(ids, dtype=index.type_ids.dtype) if ids else None
+
+
+class ExactSearch:
+    name = "exact"
+
+    def __init__(self, index: RagIndex):
+        self.index = index
+
+    def candidate_rows(self, doc_types):
+        """type 필터 행 번호 (필터 없음/해당 문서 없음이면 None → 전체)"""
+        rows = self.index.rows_for_types(doc_types) if doc_types else None
+        return None if rows is not None and len(rows) == 0 else rows
+
+    def search(self, query, k: int, doc_types=None, **options):
+        return top_k_rows(self.index.scores(query), k, self.candidate_rows(doc_types))
+
+
+class IVFSearch:
+    """Inverted file index - 쿼리와 가까운 클러스터의 문서만 점수 계산"""
+    name = "ivf"
+
+    def __init__(self, index: RagIndex):
+        self.index = index
+        self.centroids = np.load(os.path.join(index.index_dir, IVF_CENTROIDS_FILE))
+        self.rows = np.load(os.path.join(index.index_dir, IVF_ROWS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index.index_dir, IVF_OFFSETS_FILE))
+
+    @staticmethod
+    def build(index: RagIndex, nlist: int = None, iterations: int = 15, sample_size: int = 50000, seed: int = 0) -> dict:
+        n = len(index)
+        nlist = nlist or max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        sample = np.asarray(index.embeddings[sample_rows], dtype=np.float32)
+
+        # spherical k-means (정규화된 임베딩이므로 내적 기준)
+        centroids = sample[rng.choice(len(sample), size=min(nlist, len(sample)), replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, SCORE_CHUNK_ROWS):
+            chunk = np.asarray(index.embeddings[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+
+        rows = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))]).astype(np.int64)
+        np.save(os.path.join(index.index_dir, IVF_CENTROIDS_FILE), centroids.astype(np.float32))
+        np.save(os.path.join(index.index_dir, IVF_ROWS_FILE), rows)
+        np.save(os.path.join(index.index_dir, IVF_OFFSETS_FILE), offsets)
+        return {"backend": "ivf", "nlist": int(len(centroids))}
+
+    def search(self, query, k: int, doc_types=None, nprobe: int = DEFAULT_NPROBE, **options):
+        query = np.asarray(query, dtype=np.float32)
+        probes, _ = top_k_rows(self.centroids @ query, nprobe or DEFAULT_NPROBE)
+        candidates = np.sort(np.concatenate([self.rows[self.offsets[p]:self.offsets[p + 1]] for p in probes]))
+
+        type_ids = _filter_type_ids(self.index, doc_types)
+        if type_ids is not None:
+            candidates = candidates[np.isin(self.index.type_ids[candidates], type_ids)]
+        if len(candidates) < k:
+            # 탐색한 클러스터에 후보가 부족하면 exact로
+            return ExactSearch(self.index).search(query, k, doc_types)
+
+        scores = np.asarray(self.index.embeddings[candidates], dtype=np.float32) @ query
+        top, top_scores = top_k_rows(scores, k)
+        return candidates[top], top_scores
+
+
+class HNSWSearch:
+    """hnswlib 그래프 인덱스 (type 필터는 넉넉히 가져온 뒤 거름)"""
+    name = "hnsw"
+
+    def __init__(self, index: RagIndex):
+        if not HNSW_AVAILABLE:
+            raise RuntimeError("hnswlib is not installed")
+        self.index = index
+        self._graph = hnswlib.Index(space="ip", dim=index.dimension)
+        self._graph.load_index(os.path.join(index.index_dir, HNSW_FILE), max_elements=len(index))
+        self._lock = threading.Lock()  # set_ef가 인덱스 전역 설정이라 검색과 함께 잠금
+
+    @staticmethod
+    def build(index: RagIndex, m: int = 16, ef_construction: int = 200) -> dict:
+        if not HNSW_AVAILABLE:
+            raise RuntimeError("hnswlib is not installed (pip install hnswlib)")
+        graph = hnswlib.Index(space="ip", dim=index.dimension)
+        graph.init_index(max_elements=len(index), ef_construction=ef_construction, M=m)
+        for start in range(0, len(index), SCORE_CHUNK_ROWS):
+            chunk = np.asarray(index.embeddings[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            graph.add_items(chunk, np.arange(start, start + len(chunk)))
+        graph.save_index(os.path.join(index.index_dir, HNSW_FILE))
+        return {"backend": "hnsw", "M": m, "efConstruction": ef_construction}
+
+    def search(self, query, k: int, doc_types=None, ef: int = DEFAULT_EF, **options):
+        query = np.asarray(query, dtype=np.float32)
+        type_ids = _filter_type_ids(self.index, doc_types)
+        fetch = k
+        if type_ids is not None:
+            allowed = sum(len(self.index.type_rows[self.index.types[t]]) for t in type_ids)
+            fetch = min(len(self.index), k * max(2, math.ceil(len(self.index) / max(allowed, 1)) * 2))
+        with self._lock:
+            self._graph.set_ef(max(ef or DEFAULT_EF, fetch))
+            labels, distances = self._graph.knn_query(query, k=fetch)
+        rows = labels[0].astype(np.int64)
+        scores = (1.0 - distances[0]).astype(np.float32)  # ip space의 distance = 1 - 내적
+        if type_ids is not None:
+            keep = np.isin(self.index.type_ids[rows], type_ids)
+            rows, scores = rows[keep], scores[keep]
+            if len(rows) < k:
+                return ExactSearch(self.index).search(query, k, doc_types)
+        return rows[:k], scores[:k]
+
+
+def search_many(search, queries, ks, options_list):
+    """여러 쿼리 검색 [(행 번호, 점수)] - exact는 (쿼리 수 × 문서 수) 행렬곱 1회, ANN은 쿼리별"""
+    if not isinstance(search, ExactSearch):
+        return [search.search(query, k, **options) for query, k, options in zip(queries, ks, options_list)]
+    scores = search.index.scores_batch(queries)
+    return [
+        top_k_rows(scores[i], k, search.candidate_rows(options.get("doc_types")))
+        for i, (k, options) in enumerate(zip(ks, options_list))
+    ]
+
+
+BACKENDS = {
+    ExactSearch.name: ExactSearch,
+    IVFSearch.name: IVFSearch,
+    HNSWSearch.name: HNSWSearch,
+}
+
+
+def build_ann(index_dir: str, backend: str = "ivf", update_manifest: bool = True, **kwargs) -> dict:
+    """ANN 인덱스 빌드 후 manifest에 기록 (update_manifest=False면 파일만 생성, 벤치마크용)"""
+    index = RagIndex(index_dir)
+    try:
+        if backend == ExactSearch.name:
+            info = {"backend": "exact"}
+        else:
+            info = BACKENDS[backend].build(index, **kwargs)
+    finally:
+        index.close()
+    if update_manifest:
+        set_manifest_entry(index_dir, "ann", info)
+    return info
+
+
+def rebuild_ann(index_dir: str, backend: str = "ivf", **kwargs) -> dict:
+    """게시된 인덱스의 ANN 재빌드 (새 버전으로 복사 → 빌드 → 게시)"""
+    version_dir = restage_index_version(index_dir)
+    info = build_ann(version_dir, backend, **kwargs)
+    publish_index_version(index_dir, version_dir)
+    return info
+
+
+def load_ann(index: RagIndex):
+    """manifest 기준 검색 백엔드 (작은 인덱스/빌드 안 됨/로드 실패 시 exact)"""
+    backend = ANN_BACKEND_OVERRIDE or index.manifest.get("ann", {}).get("backend", ExactSearch.name)
+    if backend == ExactSearch.name or len(index) < ANN_MIN_DOCUMENTS:
+        return ExactSearch(index)
+    try:
+        return BACKENDS[backend](index)
+    except Exception as e:
+        print(f"WARNING: ANN backend '{backend}' unavailable, using exact search: {e}")
+        return ExactSearch(index)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python -m llm_core.ann <index_dir> [ivf|hnsw|exact]")
+    print(rebuild_ann(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "ivf"))
@@ -0,0 +1,529 @@
+"""
+Continuous Batching 추론 엔진
+- Flask 핸들러 스레드가 요청을 큐에 넣고, 단일 워커 스레드가 하나의 디코딩 루프에서 함께 생성
+- 매 스텝마다 대기 중인 요청을 배치에 합류시키고, 끝난 시퀀스는 즉시 배치에서 제거 (iteration-level scheduling)
+- 기존 inference_semaphore(1) 직렬 처리 + CUDA 에러 재시도 로직을 대체
+- 등록된 정적 prefix(시스템 프롬프트 등)의 KV cache를 prefill 시 재사용
+- 스트리밍 요청이면 토큰마다 TokenStreamer로 전달 (SSE)
+- stop_on_repetition 요청은 같은 줄/문장이 반복되기 시작하면 조기 종료
+- schema 지정 요청은 해당 출력 형식에 맞는 토큰만 생성 (structured.py)
+- 대기 큐는 우선순위 스케줄러 (interactive/dashboard/batch, deadline, 대기열 상한)
+"""
+import gc
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+import torch
+from transformers import (
+    LogitsProcessorList,
+    RepetitionPenaltyLogitsProcessor,
+    EncoderRepetitionPenaltyLogitsProcessor,
+    NoRepeatNGramLogitsProcessor,
+    TemperatureLogitsWarper,
+    TopKLogitsWarper,
+    TopPLogitsWarper,
+)
+
+from llm_core.prefix_cache import PrefixCache, render_prefix_text
+from llm_core.repetition import RepetitionDetector
+from llm_core.scheduler import DASHBOARD, PriorityScheduler
+from llm_core.structured import StructuredLogitsProcessor, get_schema
+from llm_core.streaming import open_stream_stage
+
+try:
+    from transformers import DynamicCache
+except ImportError:  # 구버전 transformers
+    DynamicCache = None
+
+
+MAX_BATCH_SIZE = int(os.environ.get("LLM_MAX_BATCH_SIZE", "8"))
+MAX_CUDA_ERRORS = 5  # 이 횟수 초과시 서버 재시작 권장
+
+
+@dataclass
+class SamplingParams:
+    """요청별 샘플링 설정 (model.generate 인자와 동일한 의미)"""
+    temperature: float = 0.75
+    top_p: float = 0.9
+    top_k: int = 50
+    do_sample: bool = True
+    repetition_penalty: float = 1.05
+    no_repeat_ngram_size: int = 0
+    encoder_repetition_penalty: float = 1.0
+    stop_on_repetition: bool = False  # 반복 루프 감지 시 조기 종료
+    schema: Optional[str] = None  # 구조화 출력 스키마 이름 (structured.SCHEMAS)
+
+
+@dataclass(eq=False)
+class _Sequence:
+    """배치 안에서 디코딩 중인 시퀀스 1개"""
+    prompt_ids: torch.Tensor  # (1, L) on device
+    max_new_tokens: int
+    params: SamplingParams
+    future: Future
+    enqueued_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    generated: list = field(default_factory=list)
+    all_ids: Optional[torch.Tensor] = None
+    processors: Optional[LogitsProcessorList] = None
+    streamer: Optional[object] = None
+    priority: str = DASHBOARD
+    deadline: Optional[float] = None  # 이 시각까지 배치에 합류하지 못하면 timeout
+    started_at: Optional[float] = None
+    repetition: Optional[RepetitionDetector] = None
+    stopped: bool = False
+
+    def reset(self):
+        self.generated = []
+        self.all_ids = self.prompt_ids
+        self.processors = None
+        self.repetition = None
+        self.stopped = False
+        if self.streamer is not None and self.attempts:
+            self.streamer.reset()
+
+
+def _to_legacy(past_key_values):
+    """Cache 객체/튜플을 ((k, v), ...) 튜플 형태로 통일"""
+    if hasattr(past_key_values, "to_legacy_cache"):
+        return past_key_values.to_legacy_cache()
+    if hasattr(past_key_values, "layers"):  # transformers 5.x
+        return tuple((layer.keys, layer.values) for layer in past_key_values.layers)
+    return tuple((layer[0], layer[1]) for layer in past_key_values)
+
+
+def _from_legacy(legacy):
+    if DynamicCache is None:
+        return legacy
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(legacy)
+    cache = DynamicCache()
+    for layer_idx, (k, v) in enumerate(legacy):
+        cache.update(k, v, layer_idx)
+    return cache
+
+
+def _left_pad(tensor: torch.Tensor, length: int, dim: int, value=0) -> torch.Tensor:
+    """dim 축 왼쪽을 length 만큼 채움 (KV cache / attention mask 정렬용)"""
+    if length <= 0:
+        return tensor
+    shape = list(tensor.shape)
+    shape[dim] = length
+    pad = torch.full(shape, value, dtype=tensor.dtype, device=tensor.device)
+    return torch.cat([pad, tensor], dim=dim)
+
+
+def is_recoverable_error(error_msg: str) -> bool:
+    """재시도 가능한 CUDA/확률 텐서 에러인지 판별"""
+    is_cuda_error = "CUDA" in error_msg or "device-side assert" in error_msg or "out of memory" in error_msg.lower()
+    is_prob_error = "probability tensor" in error_msg or "inf" in error_msg or "nan" in error_msg
+    return is_cuda_error or is_prob_error
+
+
+class ContinuousBatchingEngine:
+    """하나의 GPU 모델을 여러 요청이 공유하는 continuous batching 스케줄러"""
+
+    def __init__(self, model, tokenizer, device: str, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_retries: int = 2, retry_delay: float = 2.0, scheduler_classes: Optional[dict] = None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.eos_token_ids = self._collect_eos_ids()
+        self.cuda_error_count = 0
+        self.prefix_cache = PrefixCache()
+        self._pending_prefixes = []
+
+        # 대기 큐 / 현재 배치 상태
+        self._waiting = PriorityScheduler(max_batch_size, scheduler_classes)
+        self._cond = threading.Condition()
+        self._active = []
+        self._kv = None  # ((k, v), ...) 각 텐서 (B, H, T, D)
+        self._attention_mask = None  # (B, T)
+        self._positions = None  # (B,) 다음 토큰의 position id
+        self._last_tokens = None  # (B, 1)
+
+        # 통계
+        self._stats_lock = threading.Lock()
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.peak_batch_size = 0
+        self.repetition_stops = 0
+
+        self._worker = threading.Thread(target=self._run, name="llm-batching", daemon=True)
+        self._worker.start()
+
+    def _collect_eos_ids(self):
+        eos = set()
+        if self.tokenizer.eos_token_id is not None:
+            eos.add(self.tokenizer.eos_token_id)
+        gen_eos = getattr(getattr(self.model, "generation_config", None), "eos_token_id", None)
+        if isinstance(gen_eos, int):
+            eos.add(gen_eos)
+        elif gen_eos:
+            eos.update(gen_eos)
+        return eos
+
+    # ===== Public API =====
+
+    def submit(self, messages: list, max_new_tokens: int = 1024, params: Optional[SamplingParams] = None,
+               streamer=None, priority: str = DASHBOARD, deadline: Optional[float] = None) -> Future:
+        """chat messages를 토크나이즈해서 큐에 넣고 Future 반환
+        대기열이 가득 차면 QueueFullError (retry_after 포함)"""
+        if params is not None and params.schema:
+            get_schema(params.schema)  # 알 수 없는 스키마면 워커가 아니라 호출 스레드에서 KeyError
+        text = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        prompt_ids = self.tokenizer(text, return_tensors="pt")["input_ids"].to(self.device)
+
+        seq = _Sequence(prompt_ids=prompt_ids, max_new_tokens=max_new_tokens,
+                        params=params or SamplingParams(), future=Future(), streamer=streamer,
+                        priority=self._waiting.resolve(priority))
+        seq.deadline = deadline or self._waiting.default_deadline(seq.priority, seq.enqueued_at)
+        seq.reset()
+        with self._cond:
+            self._waiting.push(seq)
+            self._cond.notify()
+        with self._stats_lock:
+            self.total_requests += 1
+        return seq.future
+
+    def register_prefix(self, name: str, system_prompt: str, user_prefix: str = ""):
+        """정적 prefix 등록 - KV 계산은 워커 스레드에서 수행"""
+        text = render_prefix_text(self.tokenizer, system_prompt, user_prefix)
+        ids = self.tokenizer(text, return_tensors="pt")["input_ids"].to(self.device)
+        with self._cond:
+            self._pending_prefixes.append((name, ids))
+            self._cond.notify()
+
+    def check_admission(self, priority: str = DASHBOARD):
+        """요청을 받기 전에 대기열 여유 확인 (가득 차면 QueueFullError)"""
+        with self._cond:
+            self._waiting.check_admission(priority)
+
+    def generate(self, messages: list, max_new_tokens: int = 1024, params: Optional[SamplingParams] = None,
+                 priority: str = DASHBOARD, deadline: Optional[float] = None) -> str:
+        """submit 후 결과 대기 (기존 generate_response와 동일한 동기 호출)
+        SSE 스트리밍 요청을 처리 중인 스레드라면 토큰이 자동으로 스트림에 전달됨"""
+        streamer = open_stream_stage(self.tokenizer)
+        return self.submit(messages, max_new_tokens, params, streamer=streamer,
+                           priority=priority, deadline=deadline).result()
+
+    def stats(self) -> dict:
+        """health 엔드포인트용 상태 정보"""
+        with self._cond:
+            waiting = len(self._waiting)
+            scheduler = self._waiting.stats(self._active_counts())
+        with self._stats_lock:
+            return {
+                "activeSequences": len(self._active),
+                "waitingRequests": waiting,
+                "maxBatchSize": self.max_batch_size,
+                "peakBatchSize": self.peak_batch_size,
+                "totalRequests": self.total_requests,
+                "totalTokens": self.total_tokens,
+                "cudaErrors": self.cuda_error_count,
+                "repetitionStops": self.repetition_stops,
+                "prefixCache": self.prefix_cache.stats(),
+                "scheduler": scheduler,
+            }
+
+    # ===== Worker loop =====
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._waiting and not self._active and not self._pending_prefixes:
+                    self._cond.wait()
+
+            try:
+                with torch.no_grad():
+                    self._build_pending_prefixes()
+                    self._admit_waiting()
+                    if self._active:
+                        self._decode_step()
+            except RuntimeError as e:
+                self._handle_step_error(e)
+            except Exception as e:
+                print(f"[BATCHING] Unexpected error: {e}")
+                self._fail_active(e)
+
+            if not self._active:
+                # 배치가 비면 메모리 정리 (기존 요청 단위 empty_cache와 동일한 효과)
+                torch.cuda.empty_cache()
+
+    def _build_pending_prefixes(self):
+        """등록된 prefix의 past_key_values 계산"""
+        with self._cond:
+            pending, self._pending_prefixes = self._pending_prefixes, []
+        for name, ids in pending:
+            try:
+                outputs = self.model(input_ids=ids, use_cache=True)
+                self.prefix_cache.add(name, ids, _to_legacy(outputs.past_key_values))
+                print(f"[PREFIX CACHE] '{name}' cached: {ids.shape[1]} tokens")
+            except Exception as e:
+                print(f"[PREFIX CACHE] '{name}' failed: {e}")
+
+    def _active_counts(self) -> Counter:
+        return Counter(seq.priority for seq in self._active)
+
+    def _expire_waiting(self):
+        with self._cond:
+            expired = self._waiting.expire(time.time())
+        for seq in expired:
+            # 스트리머를 직접 읽는 쪽(SSE)이 자체 타임아웃까지 기다리지 않도록 바로 종료
+            if seq.streamer is not None:
+                seq.streamer.end()
+            if not seq.future.done():
+                seq.future.set_exception(RuntimeError("Inference timeout: too many concurrent requests"))
+
+    def _admit_waiting(self):
+        """빈 슬롯만큼 대기 요청을 (우선순위/공정 분배 순서로) prefill 후 배치에 합류"""
+        self._expire_waiting()
+        while len(self._active) < self.max_batch_size:
+            with self._cond:
+                seq = self._waiting.pop_next(self._active_counts())
+            if seq is None:
+                break
+            # 재시도 요청은 Future가 이미 running 상태
+            if seq.attempts == 0:
+                if not seq.future.set_running_or_notify_cancel():
+                    continue
+                seq.started_at = time.time()
+            try:
+                self._prefill(seq)
+            except Exception:
+                # 에러 처리에서 배치와 함께 재시도/실패 처리되도록 등록
+                if seq not in self._active:
+                    self._active.append(seq)
+                raise
+
+        with self._stats_lock:
+            self.peak_batch_size = max(self.peak_batch_size, len(self._active))
+
+    def _prefill(self, seq: _Sequence):
+        """새 시퀀스의 프롬프트를 인코딩하고 KV cache를 배치에 왼쪽 정렬로 병합"""
+        prompt_len = seq.prompt_ids.shape[1]
+        prefix_len, prefix_kv = self.prefix_cache.lookup(seq.prompt_ids)
+        if prefix_kv is not None:
+            # 캐시된 prefix 이후 토큰만 인코딩 (position은 cache 길이부터 이어짐)
+            outputs = self.model(
+                input_ids=seq.prompt_ids[:, prefix_len:],
+                past_key_values=_from_legacy(prefix_kv),
+                use_cache=True,
+            )
+        else:
+            outputs = self.model(input_ids=seq.prompt_ids, use_cache=True)
+        new_kv = _to_legacy(outputs.past_key_values)
+        first_token = self._sample(seq, outputs.logits[:, -1, :])
+
+        new_mask = torch.ones((1, prompt_len), dtype=torch.long, device=self.device)
+        new_pos = torch.tensor([prompt_len], dtype=torch.long, device=self.device)
+
+        if not self._active:
+            self._kv = new_kv
+            self._attention_mask = new_mask
+            self._positions = new_pos
+            self._last_tokens = first_token.view(1, 1)
+        else:
+            batch_len = self._attention_mask.shape[1]
+            target_len = max(batch_len, prompt_len)
+            self._kv = tuple(
+                (
+                    torch.cat([_left_pad(bk, target_len - batch_len, 2), _left_pad(nk, target_len - prompt_len, 2)], dim=0),
+                    torch.cat([_left_pad(bv, target_len - batch_len, 2), _left_pad(nv, target_len - prompt_len, 2)], dim=0),
+                )
+                for (bk, bv), (nk, nv) in zip(self._kv, new_kv)
+            )
+            self._attention_mask = torch.cat([
+                _left_pad(self._attention_mask, target_len - batch_len, 1),
+                _left_pad(new_mask, target_len - prompt_len, 1),
+            ], dim=0)
+            self._positions = torch.cat([self._positions, new_pos])
+            self._last_tokens = torch.cat([self._last_tokens, first_token.view(1, 1)], dim=0)
+
+        self._active.append(seq)
+        self._after_token(len(self._active) - 1, first_token.item())
+        self._retire_finished()
+
+    def _decode_step(self):
+        """현재 배치 전체에 대해 한 토큰씩 디코딩"""
+        step_mask = torch.cat([
+            self._attention_mask,
+            torch.ones((self._attention_mask.shape[0], 1), dtype=torch.long, device=self.device),
+        ], dim=1)
+        outputs = self.model(
+            input_ids=self._last_tokens,
+            attention_mask=step_mask,
+            position_ids=self._positions.unsqueeze(1),
+            past_key_values=_from_legacy(self._kv),
+            use_cache=True,
+        )
+        self._kv = _to_legacy(outputs.past_key_values)
+        self._attention_mask = step_mask
+        self._positions = self._positions + 1
+
+        logits = outputs.logits[:, -1, :]
+        next_tokens = []
+        for i, seq in enumerate(self._active):
+            next_tokens.append(self._sample(seq, logits[i:i + 1]))
+        self._last_tokens = torch.stack(next_tokens).view(-1, 1)
+
+        for i in range(len(self._active)):
+            self._after_token(i, next_tokens[i].item())
+        self._retire_finished()
+
+    def _sample(self, seq: _Sequence, logits: torch.Tensor) -> torch.Tensor:
+        """시퀀스별 logits processor 적용 후 다음 토큰 선택"""
+        if seq.processors is None:
+            seq.processors = self._build_processors(seq)
+        scores = seq.processors(seq.all_ids, logits.float())
+        if seq.params.do_sample:
+            probs = torch.nn.functional.softmax(scores, dim=-1)
+            token = torch.multinomial(probs, num_samples=1)[0]
+        else:
+            token = torch.argmax(scores, dim=-1)
+        return token.view(1)
+
+    def _build_processors(self, seq: _Sequence) -> LogitsProcessorList:
+        params = seq.params
+        processors = LogitsProcessorList()
+        if params.repetition_penalty and params.repetition_penalty != 1.0:
+            processors.append(RepetitionPenaltyLogitsProcessor(params.repetition_penalty))
+        if params.encoder_repetition_penalty and params.encoder_repetition_penalty != 1.0:
+            processors.append(EncoderRepetitionPenaltyLogitsProcessor(params.encoder_repetition_penalty, seq.prompt_ids))
+        if params.no_repeat_ngram_size and not params.schema:
+            # 스키마의 고정 문구(섹션 제목, 불릿)는 반복되어야 하므로 함께 쓰지 않음
+            processors.append(NoRepeatNGramLogitsProcessor(params.no_repeat_ngram_size))
+        if params.schema:
+            processors.append(StructuredLogitsProcessor(
+                get_schema(params.schema), self.tokenizer, seq.prompt_ids.shape[1], sorted(self.eos_token_ids)))
+        if params.do_sample:
+            if params.temperature and params.temperature != 1.0:
+                processors.append(TemperatureLogitsWarper(params.temperature))
+            if params.top_k:
+                processors.append(TopKLogitsWarper(params.top_k))
+            if params.top_p is not None and params.top_p < 1.0:
+                processors.append(TopPLogitsWarper(params.top_p))
+        return processors
+
+    def _after_token(self, index: int, token_id: int):
+        seq = self._active[index]
+        seq.generated.append(token_id)
+        seq.all_ids = torch.cat([seq.all_ids, torch.tensor([[token_id]], device=self.device)], dim=1)
+        if seq.streamer is not None:
+            seq.streamer.put(token_id)
+        if seq.params.stop_on_repetition:
+            if seq.repetition is None:
+                seq.repetition = RepetitionDetector(self.tokenizer)
+            if seq.repetition.feed(token_id):
+                seq.stopped = True
+                with self._stats_lock:
+                    self.repetition_stops += 1
+        with self._stats_lock:
+            self.total_tokens += 1
+
+    def _is_finished(self, seq: _Sequence) -> bool:
+        if seq.stopped:
+            return True
+        return (seq.generated and seq.generated[-1] in self.eos_token_ids) or len(seq.generated) >= seq.max_new_tokens
+
+    def _retire_finished(self):
+        """완료된 시퀀스의 결과를 반환하고 배치에서 제거"""
+        keep = []
+        for i, seq in enumerate(self._active):
+            if self._is_finished(seq):
+                text = self.tokenizer.decode(seq.generated, skip_special_tokens=True)
+                if seq.streamer is not None:
+                    seq.streamer.end()
+                seq.future.set_result(text.strip())
+                with self._cond:
+                    self._waiting.record_service_time(time.time() - seq.started_at)
+                # 성공 시 에러 카운트 감소
+                self.cuda_error_count = max(0, self.cuda_error_count - 1)
+            else:
+                keep.append(i)
+
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._clear_batch()
+            return
+
+        index = torch.tensor(keep, dtype=torch.long, device=self.device)
+        self._active = [self._active[i] for i in keep]
+        self._kv = tuple((k.index_select(0, index), v.index_select(0, index)) for k, v in self._kv)
+        self._attention_mask = self._attention_mask.index_select(0, index)
+        self._positions = self._positions.index_select(0, index)
+        self._last_tokens = self._last_tokens.index_select(0, index)
+
+        # 남은 시퀀스 모두에게 padding인 앞쪽 컬럼은 잘라서 KV 길이를 줄임
+        valid_cols = self._attention_mask.any(dim=0).nonzero()
+        start = int(valid_cols[0]) if valid_cols.numel() else 0
+        if start > 0:
+            self._attention_mask = self._attention_mask[:, start:]
+            self._kv = tuple((k[:, :, start:, :], v[:, :, start:, :]) for k, v in self._kv)
+
+    def _clear_batch(self):
+        self._active = []
+        self._kv = None
+        self._attention_mask = None
+        self._positions = None
+        self._last_tokens = None
+
+    # ===== Error handling =====
+
+    def reset_cuda_state(self):
+        """CUDA 상태 초기화"""
+        try:
+            torch.cuda.empty_cache()
+            gc.collect()
+            print("[CUDA] Memory cache cleared")
+        except Exception as e:
+            print(f"[CUDA] Cache clear failed: {e}")
+        self.cuda_error_count += 1
+        if self.cuda_error_count >= MAX_CUDA_ERRORS:
+            print(f"[WARNING] CUDA errors exceeded {MAX_CUDA_ERRORS}. Server restart recommended.")
+
+    def _handle_step_error(self, error: RuntimeError):
+        """CUDA/확률 에러 시 배치를 비우고 진행 중이던 요청을 처음부터 재시도"""
+        error_msg = str(error)
+        if not is_recoverable_error(error_msg):
+            self._fail_active(error)
+            return
+
+        print(f"[INFERENCE ERROR] batch of {len(self._active)}: {error_msg[:100]}")
+        self.reset_cuda_state()
+
+        retry = []
+        for seq in self._active:
+            seq.attempts += 1
+            if seq.attempts > self.max_retries:
+                if seq.streamer is not None:
+                    seq.streamer.end()
+                seq.future.set_exception(RuntimeError(f"Inference error after {self.max_retries + 1} attempts. Server restart may be needed."))
+            else:
+                seq.reset()
+                retry.append(seq)
+        self._clear_batch()
+
+        time.sleep(self.retry_delay)  # 잠시 대기 후 재시도
+        with self._cond:
+            # 재시도 요청은 다른 대기 요청보다 먼저 합류
+            for seq in retry:
+                self._waiting.push_retry(seq)
+
+    def _fail_active(self, error: Exception):
+        for seq in self._active:
+            if seq.streamer is not None:
+                seq.streamer.end()
+            if not seq.future.done():
+                seq.future.set_exception(error)
+        self._clear_batch()
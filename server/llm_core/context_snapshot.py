@@ -0,0 +1,173 @@
+"""
+챗봇 대시보드 컨텍스트 스냅샷
+- 리더보드/트렌드/SNS/리뷰 키워드 블록은 질문과 무관 → 한 번 만들어 두고 모든 채팅 요청이 재사용
+  (채팅 요청은 질문별 조회만 DB로 보냄)
+- 갱신 조건
+  - TTL 만료: LLM_CONTEXT_TTL초 (기본 300)
+  - 워크플로우 완료 신호: 워크플로우(services/gemini_agents.py, langchain_workflow.py)가 DB 저장 후
+    mark_dashboard_updated() → cache_signals 컬렉션의 "dashboard" 문서 시각 갱신
+    (키워드 설명 스크립트 scripts/add_*descriptions.js도 끝날 때 같은 문서 갱신)
+    서버는 백그라운드 스레드가 LLM_CONTEXT_SIGNAL_INTERVAL초(기본 15, 0이면 끔)마다 확인
+- 갱신은 한 스레드만 수행하고 그동안 다른 요청은 이전 스냅샷 사용 (최초 생성만 대기, 감시 스레드가 시작 시 미리 생성)
+- gather_context(): 서로 독립인 컨텍스트 조회(ContextProvider)를 공용 스레드 풀에서 동시에 실행
+  - 각 조회는 LLM_CONTEXT_PROVIDER_TIMEOUT초(기본 2) 안에 끝나야 하고, 넘으면 그 블록만 빼고 나머지로 컨텍스트 구성
+  - 전체 대기 시간 = 가장 느린 조회 (순차 실행 시 합계), 결과 순서는 providers 순서 유지
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from llm_core.mongo import get_db
+
+CONTEXT_TTL = float(os.environ.get("LLM_CONTEXT_TTL", "300"))
+SIGNAL_INTERVAL = float(os.environ.get("LLM_CONTEXT_SIGNAL_INTERVAL", "15"))
+PROVIDER_TIMEOUT = float(os.environ.get("LLM_CONTEXT_PROVIDER_TIMEOUT", "2"))
+PROVIDER_WORKERS = int(os.environ.get("LLM_CONTEXT_WORKERS", "8"))
+
+SIGNAL_COLLECTION = "cache_signals"
+DASHBOARD_SIGNAL = "dashboard"
+
+
+_executor = ThreadPoolExecutor(max_workers=PROVIDER_WORKERS, thread_name_prefix="context-provider")
+
+
+@dataclass
+class ContextProvider:
+    name: str
+    fetch: Callable  # db → 컨텍스트 줄 목록
+    timeout: Optional[float] = None  # None이면 PROVIDER_TIMEOUT
+    inline: bool = False  # 호출 스레드에서 실행 (메모리 조회처럼 빠른 것, 시간 제한 없음)
+
+
+def _fetch_parts(provider: ContextProvider, db) -> list:
+    try:
+        return list(provider.fetch(db) or [])
+    except Exception as e:
+        print(f"{provider.name} query error: {e}")
+        return []
+
+
+def gather_context(providers, db) -> list:
+    """providers를 동시에 실행해 컨텍스트 줄을 순서대로 합침 (시간 초과한 provider는 제외)"""
+    start = time.monotonic()
+    futures = [(provider, None if provider.inline else _executor.submit(_fetch_parts, provider, db))
+               for provider in providers]
+    parts = []
+    for provider, future in futures:
+        if future is None:
+            parts.extend(_fetch_parts(provider, db))
+            continue
+        timeout = PROVIDER_TIMEOUT if provider.timeout is None else provider.timeout
+        remaining = max(0.0, start + timeout - time.monotonic())
+        try:
+            parts.extend(future.result(timeout=remaining))
+        except TimeoutError:
+            # 풀 스레드는 드라이버 소켓 타임아웃으로 정리됨, 이번 응답에서만 제외
+            print(f"{provider.name} query timed out ({timeout}s), skipped")
+    return parts
+
+
+def mark_dashboard_updated(db, source: str = ""):
+    """대시보드 데이터(leaderboard/trends/...)가 바뀌었음을 기록 → 챗봇 서버 스냅샷 재생성"""
+    db.get_collection(SIGNAL_COLLECTION).update_one(
+        {"_id": DASHBOARD_SIGNAL},
+        {"$set": {"updatedAt": datetime.now(), "source": source}},
+        upsert=True,
+    )
+
+
+def dashboard_signal(db):
+    doc = db.get_collection(SIGNAL_COLLECTION).find_one({"_id": DASHBOARD_SIGNAL}, {"updatedAt": 1})
+    return doc.get("updatedAt") if doc else None
+
+
+class ContextSnapshot:
+    """build_fn(db) 결과(컨텍스트 문자열, KeywordDictionary 등 len()이 되는 값)를 TTL/신호 기준으로 캐시"""
+
+    def __init__(self, name: str, build_fn, db_fn=get_db, ttl: float = CONTEXT_TTL):
+        self.name = name
+        self.build_fn = build_fn
+        self.db_fn = db_fn
+        self.ttl = ttl
+        self._value = None
+        self._built_at = 0.0
+        self._signal = None
+        self._stale = False
+        self._lock = threading.Lock()
+        self._watcher = None
+        self.builds = 0
+        self.hits = 0
+
+    def _expired(self) -> bool:
+        return self._stale or time.monotonic() - self._built_at > self.ttl
+
+    def get(self):
+        """현재 스냅샷 (만료됐으면 백그라운드에서 갱신하고 이전 값 반환)"""
+        value = self._value
+        if value is None:
+            return self.refresh()
+        if self._expired() and not self._lock.locked():
+            threading.Thread(target=self._refresh_quietly, daemon=True).start()
+        self.hits += 1
+        return value
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            if not force and self._value is not None and not self._expired():
+                return self._value
+            db = self.db_fn()
+            try:
+                signal = dashboard_signal(db)
+            except Exception as e:
+                print(f"[{self.name}] signal check failed: {e}")
+                signal = self._signal
+            start = time.perf_counter()
+            value = self.build_fn(db)
+            self._value, self._built_at, self._signal, self._stale = value, time.monotonic(), signal, False
+            self.builds += 1
+            print(f"[{self.name}] context snapshot built (size {len(value)}, {(time.perf_counter() - start) * 1000:.0f}ms)")
+            return value
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"[{self.name}] context refresh failed: {e}")
+
+    def invalidate(self):
+        """다음 get()에서 갱신"""
+        self._stale = True
+
+    def _watch(self, interval: float):
+        self._refresh_quietly()  # 첫 채팅 요청이 스냅샷 생성을 기다리지 않도록 미리 생성
+        while True:
+            time.sleep(interval)
+            try:
+                if self._value is not None and dashboard_signal(self.db_fn()) != self._signal:
+                    print(f"[{self.name}] dashboard updated, rebuilding context snapshot")
+                    self.invalidate()
+                if self._expired():
+                    self.refresh()
+            except Exception as e:
+                print(f"[{self.name}] context watcher error: {e}")
+
+    def start_watcher(self, interval: float = SIGNAL_INTERVAL):
+        """워크플로우 완료 신호/TTL 감시 스레드 (프로세스당 1회)"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True,
+                                         name=f"context-snapshot-{self.name}")
+        self._watcher.start()
+
+    def stats(self) -> dict:
+        return {
+            "ageSeconds": round(time.monotonic() - self._built_at, 1) if self._value is not None else None,
+            "ttlSeconds": self.ttl,
+            "builds": self.builds,
+            "hits": self.hits,
+            "signal": str(self._signal) if self._signal else None,
+        }
@@ -0,0 +1,271 @@
+"""
+세션별 대화 메모리 (챗봇 /api/chat/text, /api/chat/multimodal)
+- 세션마다 최근 LLM_CHAT_MEMORY_TURNS턴(기본 4) 링 버퍼 → 프롬프트에 넣는 이전 대화 길이 상한
+- 세션 수 상한 LLM_CHAT_MEMORY_SESSIONS(기본 1000, 가장 오래 안 쓴 세션부터 삭제),
+  마지막 사용 후 LLM_CHAT_MEMORY_TTL초(기본 3600) 지나면 삭제
+- 벡터 recall (LLM_CHAT_MEMORY_RECALL=1, 기본 켜짐): 링 버퍼에서 밀려난 턴을 임베딩해 두고
+  같은 세션 안에서만 질문과 비슷한 턴 LLM_CHAT_MEMORY_RECALL_K개(기본 2) 검색
+  - 세션당 LLM_CHAT_MEMORY_RECALL_MAX턴(기본 100)까지, 넘으면 오래된 것부터 삭제
+  - 인코더는 query_encoder.get_query_encoder (RAG 검색과 공유), 로드 실패 시 recall 없이 동작
+- 검색 비용 = 세션 하나의 턴 수 (전체 대화 수와 무관), 턴당 LLM_CHAT_MEMORY_CHARS자(기본 400)로 잘라서 프롬프트에 포함
+- 영구 기록: add()가 MongoDB chat_conversations에도 저장 (LLM_CHAT_MEMORY_PERSIST=0이면 프로세스 메모리만)
+  - 메모리에 없는 세션(재시작, 삭제된 세션)은 처음 접근할 때 chat_conversations의 최근 턴으로 복원
+    (최근 턴 + recall 상한만큼만 읽음, sessionId/timestamp 인덱스 사용)
+  - MongoDB 오류 시 저장/복원 없이 메모리만으로 동작
+- 요청 스레드에서는 메모리만 갱신: MongoDB 저장과 recall 임베딩은 백그라운드 스레드 1개가 순서대로 처리
+  (복원 조회는 세션당 1회, 동시에 들어온 같은 세션 요청은 그 결과를 기다림)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+MAX_TURNS = int(os.environ.get("LLM_CHAT_MEMORY_TURNS", "4"))
+MAX_SESSIONS = int(os.environ.get("LLM_CHAT_MEMORY_SESSIONS", "1000"))
+SESSION_TTL = float(os.environ.get("LLM_CHAT_MEMORY_TTL", "3600"))
+RECALL_ENABLED = os.environ.get("LLM_CHAT_MEMORY_RECALL", "1") != "0"
+RECALL_K = int(os.environ.get("LLM_CHAT_MEMORY_RECALL_K", "2"))
+RECALL_MAX = int(os.environ.get("LLM_CHAT_MEMORY_RECALL_MAX", "100"))
+TURN_CHARS = int(os.environ.get("LLM_CHAT_MEMORY_CHARS", "400"))
+PERSIST = os.environ.get("LLM_CHAT_MEMORY_PERSIST", "1") != "0"
+
+HISTORY_COLLECTION = "chat_conversations"
+
+
+def _clip(text: str, limit: int = TURN_CHARS) -> str:
+    text = str(text).strip()
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class _Session:
+    def __init__(self, max_turns: int):
+        self.turns = deque(maxlen=max(1, max_turns))  # (question, answer)
+        self.recall_turns = deque()  # 링 버퍼에서 밀려난 (question, answer)
+        self.recall_vectors = None  # (len(recall_turns), D) float32
+        self.last_used = time.monotonic()
+
+
+def _default_db():
+    from llm_core.mongo import get_db
+    return get_db()
+
+
+class ConversationMemory:
+    def __init__(self, max_turns: int = MAX_TURNS, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL,
+                 recall: bool = RECALL_ENABLED, recall_max: int = RECALL_MAX, encoder=None, db_fn=None):
+        """db_fn: chat_conversations 저장/복원용 DB (None이면 프로세스 메모리만)"""
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.recall_enabled = recall
+        self.recall_max = recall_max
+        self._encoder = encoder
+        self._db_fn = db_fn
+        self._index_ready = False
+        self._sessions = OrderedDict()  # session_id → _Session (오래 안 쓴 순)
+        self._loading = {}  # session_id → 복원 중인 Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-memory")
+        self.evicted = 0
+        self.restored = 0
+
+    def _encode(self, texts: list):
+        """recall용 임베딩 (인코더는 처음 필요할 때 로드, 실패하면 recall 끔)"""
+        if self._encoder is None:
+            try:
+                from llm_core.query_encoder import get_query_encoder
+                self._encoder = get_query_encoder()
+            except Exception as e:
+                print(f"Conversation recall disabled (encoder load failed): {e}")
+                self.recall_enabled = False
+                return None
+        return np.asarray(self._encoder.encode_batch(texts), dtype=np.float32)
+
+    def _evict_locked(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - session.last_used <= self.ttl:
+                break
+            del self._sessions[session_id]
+            self.evicted += 1
+
+    def _touch_locked(self, session_id: str, session: _Session) -> _Session:
+        session.last_used = time.monotonic()
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _session(self, session_id: str, create: bool = False):
+        with self._lock:
+            self._evict_locked()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                return self._touch_locked(session_id, session)
+            if self._db_fn is None:
+                if not create:
+                    return None
+                session = self._touch_locked(session_id, _Session(self.max_turns))
+                self._evict_locked()
+                return session
+            loading = self._loading.get(session_id)
+            owner = loading is None
+            if owner:
+                loading = self._loading[session_id] = Future()
+        if not owner:
+            return loading.result()
+
+        # 메모리에 없는 세션: chat_conversations에서 1회 복원 (DB 조회는 잠금 밖에서)
+        try:
+            session, older = self._restore(session_id)
+            with self._lock:
+                self._touch_locked(session_id, session)
+                self._evict_locked()
+                if session.turns:
+                    self.restored += 1
+            if older:
+                self._submit(self._index_recall, session, older)
+            loading.set_result(session)
+            return session
+        except BaseException as e:
+            loading.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(session_id, None)
+
+    def _submit(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(_report_error)
+        return future
+
+    def flush(self, timeout: float = None):
+        """지금까지 넘긴 백그라운드 작업(저장, recall 임베딩)이 끝날 때까지 대기"""
+        self._executor.submit(lambda: None).result(timeout=timeout)
+
+    def _history_collection(self):
+        collection = self._db_fn().get_collection(HISTORY_COLLECTION)
+        if not self._index_ready:
+            collection.create_index([("sessionId", 1), ("timestamp", -1)])
+            self._index_ready = True
+        return collection
+
+    def _load_history(self, session_id: str) -> list:
+        """chat_conversations의 최근 턴 (오래된 순, 최대 max_turns + recall_max)"""
+        limit = self.max_turns + (self.recall_max if self.recall_enabled else 0)
+        if self._db_fn is None or limit <= 0:
+            return []
+        try:
+            docs = self._history_collection().find(
+                {"sessionId": session_id}, {"question": 1, "answer": 1, "_id": 0},
+            ).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+            return [(_clip(doc.get("question", "")), _clip(doc.get("answer", ""))) for doc in docs][::-1]
+        except Exception as e:
+            print(f"Conversation history load error: {e}")
+            return []
+
+    def _restore(self, session_id: str):
+        """(링 버퍼를 채운 세션, recall 인덱스로 보낼 이전 턴)"""
+        session = _Session(self.max_turns)
+        history = self._load_history(session_id)
+        older, recent = history[:-self.max_turns], history[-self.max_turns:]
+        session.turns.extend(recent)
+        return session, older
+
+    def _persist(self, document: dict):
+        try:
+            self._history_collection().insert_one(document)
+        except Exception as e:
+            print(f"Conversation history save error: {e}")
+
+    def _index_recall(self, session: _Session, turns: list):
+        """링 버퍼에서 밀려난 턴을 임베딩해서 recall 인덱스에 추가 (백그라운드)"""
+        if not self.recall_enabled or self.recall_max <= 0:
+            return
+        turns = turns[-self.recall_max:]
+        vectors = self._encode([f"{q}\n{a}" for q, a in turns])
+        if vectors is None:
+            return
+        with self._lock:
+            session.recall_turns.extend(turns)
+            if session.recall_vectors is not None:
+                vectors = np.vstack([session.recall_vectors, vectors])
+            overflow = len(session.recall_turns) - self.recall_max
+            for _ in range(max(0, overflow)):
+                session.recall_turns.popleft()
+            session.recall_vectors = vectors[max(0, overflow):]
+
+    def add(self, session_id: str, question: str, answer: str):
+        """대화 1턴 저장 (chat_conversations에 원문 기록, 링 버퍼가 차면 가장 오래된 턴은 recall 인덱스로)"""
+        if not session_id:
+            return
+        session = self._session(session_id, create=True)
+        if self._db_fn is not None:
+            self._submit(self._persist, {
+                "sessionId": session_id,
+                "question": question,
+                "answer": answer,
+                "timestamp": datetime.utcnow(),
+            })
+        with self._lock:
+            dropped = session.turns[0] if len(session.turns) == session.turns.maxlen else None
+            session.turns.append((_clip(question), _clip(answer)))
+        if dropped is not None:
+            self._submit(self._index_recall, session, [dropped])
+
+    def recent(self, session_id: str) -> list:
+        session = self._session(session_id) if session_id else None
+        if session is None:
+            return []
+        with self._lock:
+            return list(session.turns)
+
+    def recall(self, session_id: str, query: str, k: int = RECALL_K) -> list:
+        """같은 세션의 밀려난 턴 중 질문과 비슷한 k개 (오래된 순)"""
+        session = self._session(session_id) if session_id else None
+        if session is None or not self.recall_enabled or k <= 0:
+            return []
+        with self._lock:
+            turns, vectors = list(session.recall_turns), session.recall_vectors
+        if not turns:
+            return []
+        query_vector = self._encode([query])
+        if query_vector is None:
+            return []
+        scores = vectors @ query_vector[0]
+        rows = np.argsort(-scores)[:k]
+        return [turns[row] for row in sorted(rows)]
+
+    def context(self, session_id: str, query: str) -> str:
+        """프롬프트용 이전 대화 블록 (recall + 최근 턴, 비어 있으면 "")"""
+        turns = self.recall(session_id, query) + self.recent(session_id)
+        return "\n---\n".join(f"Q: {q}\nA: {a}" for q, a in turns)
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_locked()
+            return {
+                "sessions": len(self._sessions),
+                "turns": sum(len(s.turns) + len(s.recall_turns) for s in self._sessions.values()),
+                "evictedSessions": self.evicted,
+                "restoredSessions": self.restored,
+                "persist": self._db_fn is not None,
+                "maxTurns": self.max_turns,
+                "recall": self.recall_enabled,
+            }
+
+
+def _report_error(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Conversation memory background task failed: {future.exception()}")
+
+
+conversation_memory = ConversationMemory(db_fn=_default_db if PERSIST else None)
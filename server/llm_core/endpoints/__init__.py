@@ -0,0 +1,6 @@
+"""
+LLM 엔드포인트 모음
+- 각 모듈은 import 시 llm_core.registry에 엔드포인트를 등록
+- 어떤 포트에 어떤 엔드포인트를 올릴지는 llm_host.json에서 결정
+"""
+from llm_core.endpoints import chat, keyword, prediction, rag_insight, review, sns, strategy  # noqa: F401
@@ -0,0 +1,429 @@
+"""
+대시보드 챗봇 엔드포인트 (기존 llm_server_port7.py)
+- Text: EXAONE (호스트 엔진 공유)
+- Multimodal: Qwen2-VL-2B-Instruct (디바이스별 Lazy Loading)
+Endpoints: chat-text, chat-multimodal
+"""
+import base64
+import io
+import threading
+
+import torch
+from flask import request, jsonify
+from PIL import Image
+from transformers import Qwen2VLForConditionalGeneration, AutoProcessor, StoppingCriteriaList
+
+from llm_core.batching import SamplingParams
+from llm_core.context_snapshot import ContextProvider, ContextSnapshot, gather_context
+from llm_core.conversation_memory import conversation_memory
+from llm_core.keyword_dictionary import KeywordDictionary
+from llm_core.mongo import get_db
+from llm_core.registry import endpoint
+from llm_core.repetition import RepetitionStoppingCriteria
+from llm_core.runtime import current_engine, request_schedule
+from llm_core.scheduler import INTERACTIVE, QueueFullError
+from llm_core.streaming import open_stream_stage
+from llm_core.text import clean_text, remove_repetitions
+
+# ===== VLM Model (Lazy Loading) =====
+VLM_MODEL_NAME = "Qwen/Qwen2-VL-2B-Instruct"
+_vlm_models = {}
+_vlm_lock = threading.Lock()
+
+
+def load_vlm_model(device: str):
+    """Lazy load Qwen2-VL model when first multimodal request comes in"""
+    with _vlm_lock:
+        if device not in _vlm_models:
+            print(f"Loading VLM model: {VLM_MODEL_NAME} on {device}...")
+            vlm_processor = AutoProcessor.from_pretrained(VLM_MODEL_NAME, trust_remote_code=True)
+            vlm_model = Qwen2VLForConditionalGeneration.from_pretrained(
+                VLM_MODEL_NAME,
+                torch_dtype=torch.float16,
+                device_map=device,
+                trust_remote_code=True,
+            )
+            vlm_model.eval()
+            _vlm_models[device] = (vlm_model, vlm_processor)
+            print(f"VLM model loaded successfully on {device}!")
+        return _vlm_models[device]
+
+
+CHAT_SYSTEM_PROMPT = """당신은 AMORE CLUE 대시보드의 K-뷰티 트렌드 분석 AI 어시스턴트입니다.
+
+## 역할
+- 글로벌 K-뷰티(K-Beauty) 시장 트렌드 분석 전문가
+- 화장품 산업 데이터 기반 인사이트 제공
+- 아모레퍼시픽, LG생활건강 등 한국 화장품 기업의 글로벌 전략 자문 수준의 전문성
+
+## 데이터 소스
+당신에게 제공되는 [DB 데이터]는 실제 시장에서 수집된 데이터입니다:
+- 리더보드: 현재 트렌드 키워드 순위 및 점수
+- SNS 데이터: 인스타그램, 틱톡, 레딧 등 플랫폼별 버즈량
+- 리뷰 분석: 아마존 등 실제 소비자 리뷰 감성 분석
+- 트렌드 조합: 성분+제형+효과의 인기 조합
+
+## 답변 규칙
+1. 반드시 한국어로 답변하세요
+2. 제공된 [DB 데이터]를 핵심 근거로 활용하여 답변하세요
+3. 답변은 구조화하여 제공하세요 (소제목, 번호 매기기 등 활용)
+4. 구체적인 수치와 데이터를 인용하세요
+5. 답변은 간결하고 핵심적으로 작성하세요
+
+## 중요 금지사항
+- 같은 문장이나 표현을 반복하지 마세요
+- 동일한 정보를 다른 말로 반복하지 마세요
+- 한 번 언급한 내용은 다시 언급하지 마세요
+- 답변은 명확하고 간결하게 한 번만 작성하세요"""
+
+
+def register_chat_prefix(engine):
+    engine.register_prefix("chat-system", CHAT_SYSTEM_PROMPT)
+    dashboard_snapshot.start_watcher()
+    keyword_dictionary.start_watcher()
+
+
+VLM_SYSTEM_PROMPT = """당신은 AMORE CLUE 대시보드의 K-뷰티 이미지 분석 AI 어시스턴트입니다.
+
+## 역할
+- 글로벌 K-뷰티(K-Beauty) 이미지 분석 전문가
+- 화장품 제품, 패키지, 광고 이미지 시각적 분석
+- 트렌드 이미지에서 인사이트 도출
+
+## 이미지 분석 포인트
+- 제품 이미지: 패키지 디자인, 색상, 텍스처, 브랜딩 요소
+- 광고 이미지: 타겟 오디언스, 컬러 톤, 무드, 마케팅 메시지
+- 성분/텍스트 이미지: 성분 목록, 효능 표기, 인증 마크
+
+## 답변 규칙
+1. 반드시 한국어로 답변하세요
+2. 이미지에서 관찰한 내용을 구체적으로 설명하세요
+3. 답변은 구조화하여 제공하세요 (소제목, 번호 매기기 등)
+4. K-뷰티 산업 관점에서 분석하세요
+
+## 중요 금지사항
+- 같은 문장이나 표현을 반복하지 마세요
+- 동일한 정보를 다른 말로 반복하지 마세요
+- 한 번 언급한 내용은 다시 언급하지 마세요
+- 답변은 명확하고 간결하게 한 번만 작성하세요"""
+
+
+def generate_multimodal_response(user_message: str, image_base64: str, db_context: str) -> str:
+    """Qwen2-VL 기반 멀티모달 (이미지+텍스트) 응답 생성"""
+    from qwen_vl_utils import process_vision_info
+
+    # Lazy load VLM model
+    device = current_engine().device
+    vlm, processor = load_vlm_model(device)
+
+    # base64 → PIL Image
+    image_data = base64.b64decode(image_base64)
+    image = Image.open(io.BytesIO(image_data)).convert("RGB")
+
+    # 프롬프트 구성
+    context_block = ""
+    if db_context:
+        context_block = f"\n[현재 DB 데이터]\n{db_context}\n"
+
+    text_content = f"""{context_block}
+사용자 질문: {user_message}
+
+위 이미지를 분석하고 질문에 답변해주세요.
+중요: 같은 내용을 반복하지 말고, 한 번 언급한 내용은 다시 언급하지 마세요.""" if context_block else f"""{user_message}
+
+위 이미지를 분석하고 질문에 답변해주세요.
+중요: 같은 내용을 반복하지 말고, 한 번 언급한 내용은 다시 언급하지 마세요."""
+
+    messages = [
+        {"role": "system", "content": [{"type": "text", "text": VLM_SYSTEM_PROMPT}]},
+        {"role": "user", "content": [
+            {"type": "image", "image": image},
+            {"type": "text", "text": text_content},
+        ]},
+    ]
+
+    text = processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    image_inputs, video_inputs = process_vision_info(messages)
+    inputs = processor(
+        text=[text],
+        images=image_inputs,
+        videos=video_inputs,
+        return_tensors="pt",
+        padding=True,
+    ).to(device)
+
+    with torch.no_grad():
+        outputs = vlm.generate(
+            **inputs,
+            max_new_tokens=1024,
+            temperature=0.7,
+            top_p=0.85,
+            do_sample=True,
+            repetition_penalty=1.3,
+            no_repeat_ngram_size=4,
+            streamer=open_stream_stage(processor.tokenizer, skip_prompt=True),
+            stopping_criteria=StoppingCriteriaList([RepetitionStoppingCriteria(processor.tokenizer, inputs["input_ids"].shape[1])]),
+        )
+
+    generated = outputs[0][inputs["input_ids"].shape[1]:]
+    response = processor.decode(generated, skip_special_tokens=True)
+
+    # 후처리: 마크다운 제거 + 반복 문장 제거
+    response = clean_text(response)
+    response = remove_repetitions(response)
+
+    return response.strip()
+
+
+def leaderboard_context(db) -> list:
+    """리더보드 데이터 (상위 키워드, 국가별)"""
+    leaderboard = list(db.get_collection("leaderboard").find(
+        {},
+        {"keyword": 1, "score": 1, "trendLevel": 1, "itemType": 1, "country": 1, "category": 1, "_id": 0}
+    ).sort("score", -1).limit(20))
+
+    by_country = {}
+    for item in leaderboard:
+        country = item.get("country", "usa")
+        if country not in by_country:
+            by_country[country] = []
+        by_country[country].append(f"{item.get('keyword')}({item.get('trendLevel')}/{item.get('score')}점)")
+
+    parts = []
+    for country, keywords in by_country.items():
+        country_name = {"usa": "미국", "japan": "일본", "singapore": "싱가포르"}.get(country, country)
+        parts.append(f"[{country_name} 인기 키워드] {', '.join(keywords[:10])}")
+    return parts
+
+
+def trends_context(db) -> list:
+    """트렌드 조합 데이터"""
+    trends = list(db.get_collection("trends").find(
+        {},
+        {"combination": 1, "category": 1, "score": 1, "country": 1, "ingredients": 1, "effects": 1, "_id": 0}
+    ).sort("score", -1).limit(15))
+
+    if not trends:
+        return []
+    trend_list = [f"{t.get('combination')}({t.get('category')}/{t.get('score')}점)" for t in trends]
+    return [f"[인기 트렌드 조합 Top15] {', '.join(trend_list)}"]
+
+
+def sns_context(db) -> list:
+    """SNS 플랫폼 통계"""
+    sns_stats = list(db.get_collection("sns_platform_stats").find(
+        {},
+        {"keyword": 1, "platform": 1, "mentionCount": 1, "country": 1, "_id": 0}
+    ).sort("mentionCount", -1).limit(15))
+
+    if not sns_stats:
+        return []
+    sns_list = [f"{s.get('keyword')}({s.get('platform')}/{s.get('mentionCount')}건)" for s in sns_stats]
+    return [f"[SNS 인기 키워드] {', '.join(sns_list)}"]
+
+
+def review_context(db) -> list:
+    """리뷰 감성 통계 (키워드별)"""
+    review_keywords = list(db.get_collection("review_keywords").find(
+        {},
+        {"keyword": 1, "sentiment": 1, "count": 1, "country": 1, "_id": 0}
+    ).sort("count", -1).limit(20))
+
+    parts = []
+    positive = [r for r in review_keywords if r.get("sentiment") == "positive"]
+    negative = [r for r in review_keywords if r.get("sentiment") == "negative"]
+    if positive:
+        pos_list = [f"{r.get('keyword')}({r.get('count')}건)" for r in positive[:8]]
+        parts.append(f"[긍정 리뷰 키워드] {', '.join(pos_list)}")
+    if negative:
+        neg_list = [f"{r.get('keyword')}({r.get('count')}건)" for r in negative[:8]]
+        parts.append(f"[부정 리뷰 키워드] {', '.join(neg_list)}")
+    return parts
+
+
+# 서로 독립인 조회 → gather_context로 동시에 실행 (느린 조회는 시간 초과 시 제외)
+DASHBOARD_PROVIDERS = [
+    ContextProvider("Leaderboard", leaderboard_context),
+    ContextProvider("Trends", trends_context),
+    ContextProvider("SNS stats", sns_context),
+    ContextProvider("Review keywords", review_context),
+]
+
+
+def build_dashboard_context(db) -> str:
+    """질문과 무관한 대시보드 블록 - dashboard_snapshot이 TTL 동안 재사용"""
+    return "\n".join(gather_context(DASHBOARD_PROVIDERS, db))
+
+
+dashboard_snapshot = ContextSnapshot("chat", build_dashboard_context)
+
+
+keyword_dictionary = ContextSnapshot("keywords", KeywordDictionary.load)
+MAX_KEYWORD_MATCHES = 5
+
+
+def get_keyword_context(db, query: str) -> list:
+    """질문에 나온 키워드의 설명 (사전으로 키워드를 찾고 $in 1회 조회)"""
+    keywords = keyword_dictionary.get().find(query, limit=MAX_KEYWORD_MATCHES)
+    if not keywords:
+        return []
+    docs = {}
+    for doc in db.get_collection("keyword_descriptions").find(
+        {"keyword": {"$in": keywords}},
+        {"keyword": 1, "koreanName": 1, "description": 1, "_id": 0}
+    ):
+        docs.setdefault(doc["keyword"], doc)
+    return [
+        f"[키워드 정보: {kw}] {docs[kw].get('koreanName', '')}: {(docs[kw].get('description') or '')[:100]}"
+        for kw in keywords if kw in docs
+    ]
+
+
+def get_chat_db_context(query: str) -> str:
+    """챗봇용 종합 데이터 컨텍스트 (대시보드 스냅샷 + 질문별 키워드 설명을 동시에 조회)"""
+    try:
+        # 스냅샷은 보통 메모리에서 바로 반환 (최초 1회만 DB) → 호출 스레드, 키워드 설명은 풀에서 동시에
+        context_parts = gather_context([
+            ContextProvider("Dashboard snapshot", lambda db: [dashboard_snapshot.get()], inline=True),
+            ContextProvider("Keyword descriptions", lambda db: get_keyword_context(db, query)),
+        ], get_db())
+        return "\n".join(part for part in context_parts if part)
+
+    except Exception as e:
+        print(f"MongoDB context error: {e}")
+        return ""
+
+
+CHAT_GENERATION_PARAMS = SamplingParams(
+    temperature=0.7,
+    top_p=0.85,
+    top_k=50,
+    repetition_penalty=1.3,  # 반복 방지 강화 (1.1 → 1.3)
+    no_repeat_ngram_size=4,  # 4-gram 반복 금지
+    encoder_repetition_penalty=1.2,  # 인코더 반복 페널티
+    stop_on_repetition=True,  # 같은 문장이 반복되기 시작하면 생성 중단
+)
+
+
+def generate_chat_response(user_message: str, db_context: str, max_new_tokens: int = 1024, history: str = "") -> str:
+    """EXAONE 기반 챗봇 응답 생성 (반복 방지 강화, history: 같은 세션의 이전 대화)"""
+
+    # 이전 대화는 세션 메모리에서 턴 수/글자 수가 제한된 블록으로 받음
+    history_block = f"""[이전 대화]
+{history}
+
+""" if history else ""
+
+    # 컨텍스트 포함 프롬프트 구성
+    if db_context:
+        full_prompt = f"""{history_block}[DB 데이터 - 실제 시장 데이터 기반]
+{db_context}
+
+[사용자 질문]
+{user_message}
+
+위 DB 데이터를 참고하여 질문에 답변해주세요. 답변 시 구체적인 데이터를 인용하고, 같은 내용을 반복하지 마세요."""
+    else:
+        full_prompt = f"""{history_block}[사용자 질문]
+{user_message}
+
+K-뷰티 트렌드 전문가로서 답변해주세요. 답변은 간결하게 작성하고, 같은 내용을 반복하지 마세요."""
+
+    messages = [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": full_prompt}
+    ]
+
+    response = current_engine().generate(messages, max_new_tokens, CHAT_GENERATION_PARAMS, **request_schedule())
+
+    # 후처리: 마크다운 제거 + 반복 문장 제거
+    response = clean_text(response)
+    response = remove_repetitions(response)
+
+    return response.strip()
+
+
+@endpoint("chat-text", "/api/chat/text", on_mount=register_chat_prefix, priority=INTERACTIVE)
+def chat_text():
+    """텍스트 전용 챗봇 엔드포인트 (EXAONE)"""
+    try:
+        data = request.json
+        message = data.get("message", "").strip()
+        session_id = data.get("sessionId", "")
+
+        if not message:
+            return jsonify({"success": False, "error": "메시지가 비어있습니다."}), 400
+
+        # MongoDB에서 관련 데이터 컨텍스트 조회
+        db_context = get_chat_db_context(message)
+
+        # EXAONE 응답 생성 (sessionId가 있으면 같은 세션의 이전 대화 포함)
+        history = conversation_memory.context(session_id, message)
+        response = generate_chat_response(message, db_context, history=history)
+        conversation_memory.add(session_id, message, response)
+
+        return jsonify({
+            "success": True,
+            "response": response,
+            "sessionId": session_id,
+            "model": "EXAONE-3.5-7.8B-Instruct",
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Chat text error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("chat-multimodal", "/api/chat/multimodal", on_mount=register_chat_prefix, priority=INTERACTIVE)
+def chat_multimodal():
+    """멀티모달 (이미지+텍스트) 채팅 엔드포인트 (Qwen2-VL)"""
+    try:
+        data = request.json
+        message = data.get("message", "").strip()
+        image_base64 = data.get("image", "")
+        session_id = data.get("sessionId", "")
+
+        if not message and not image_base64:
+            return jsonify({"success": False, "error": "메시지 또는 이미지가 필요합니다."}), 400
+
+        # MongoDB에서 관련 데이터 컨텍스트 조회
+        db_context = get_chat_db_context(message or "이미지 분석")
+
+        if not image_base64:
+            # 이미지가 없으면 텍스트 전용 EXAONE으로 처리
+            history = conversation_memory.context(session_id, message)
+            response = generate_chat_response(message, db_context, history=history)
+            used_model = "EXAONE-3.5-7.8B-Instruct"
+        else:
+            # base64 헤더 제거 (data:image/...;base64, 부분)
+            if "," in image_base64:
+                image_base64 = image_base64.split(",", 1)[1]
+
+            # Qwen2-VL로 이미지 분석
+            response = generate_multimodal_response(
+                message or "이 이미지를 분석해주세요.",
+                image_base64,
+                db_context
+            )
+            used_model = "Qwen2-VL-2B-Instruct"
+
+        conversation_memory.add(session_id, message or "[이미지 분석]", response)
+
+        return jsonify({
+            "success": True,
+            "response": response,
+            "sessionId": session_id,
+            "model": used_model,
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Chat multimodal error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,387 @@
+"""
+향후 6-12개월 예측 엔드포인트 (기존 llm_server_port7.py)
+Endpoints: plc-prediction, category-prediction
+"""
+import re
+
+from flask import request, jsonify
+
+from llm_core.registry import endpoint
+from llm_core.response_cache import cached_response
+from llm_core.runtime import GENERATION_PARAMS, SYSTEM_PROMPT, generate_response
+from llm_core.scheduler import QueueFullError
+from llm_core.structured import with_schema
+from llm_core.text import clean_text
+
+
+PLC_FRAMEWORK_PROMPT = """당신은 뷰티 키워드 트렌드를 예측하는 시니어 애널리스트입니다.
+단순 PLC(Product Life Cycle) 이론만으로 판단하지 말고, 아래 3가지 프레임을 함께 사용해 복합적으로 예측하세요.
+
+[프레임 A: PLC 단계(기본)]
+- 도입기: 얼리어답터 중심, 낮은 인지도, 혁신 소비자 타겟
+- 성장기: 빠른 확산, SNS 바이럴, 시장 점유율 확대, 경쟁자 진입 시작
+- 성숙기: 대중화 완료, 성장률 둔화, 경쟁 심화, 안정적 수요
+- 쇠퇴기: 관심 감소, 새로운 트렌드로 대체, 니치 시장으로 축소
+
+[프레임 B: 확산/가속(Trend Diffusion & Momentum)]
+- 주요 키워드가 '단발성 버즈'인지 '루틴화/사용 맥락 확장'인지 구분
+- SNS 반응과 리테일 반응이 함께 움직이면 수요형(지속), SNS만 과열이면 버즈형(단기)
+- 인플루언서 주도 vs 일반 소비자 확산 여부 판단
+
+[프레임 C: 수요 안정성 + 리스크(Consumer Demand & Risk)]
+- 키워드가 상시 고민(장벽/진정/여드름/보습 등) 기반인지, 시즌/유행 기반인지 평가
+- 자극/불만/피로감(과각질/과자극) 이슈가 커지는지 고려
+- 경쟁/대체재 출현 속도를 고려 (급격한 성숙/하락 가능)
+- 가격대비 효과 인식 변화 추적"""
+
+
+CATEGORY_FRAMEWORK_PROMPT = """당신은 뷰티 카테고리 트렌드를 예측하는 시니어 애널리스트입니다.
+단순 PLC(Product Life Cycle) 이론만으로 판단하지 말고, 아래 3가지 프레임을 함께 사용해 복합적으로 예측하세요.
+
+[프레임 A: PLC 단계(기본)]
+- 도입기: 얼리어답터 중심 관심, 혁신적 키워드 등장
+- 성장기: 빠른 확산, SNS 바이럴, 시장 점유율 확대
+- 성숙기: 대중화 완료, 성장률 둔화, 안정적 수요
+- 쇠퇴기: 관심 감소, 새로운 트렌드로 대체
+
+[프레임 B: 확산/가속(Trend Diffusion & Momentum)]
+- 카테고리 내 주요 키워드들이 '단발성 버즈'인지 '루틴화/사용 맥락 확장'인지 구분
+- SNS 반응과 리테일 반응이 함께 움직이면 수요형(지속), SNS만 과열이면 버즈형(단기)
+- 카테고리 내 다양한 키워드의 트렌드 레벨 분포 고려 (Emerging 다수 vs Actionable/Mature 다수)
+
+[프레임 C: 수요 안정성 + 리스크(Consumer Demand & Risk)]
+- 카테고리가 상시 고민(장벽/진정/여드름/보습 등) 기반인지, 시즌/유행 기반인지 평가
+- 자극/불만/피로감(과각질/과자극) 이슈가 커지는지 고려
+- 경쟁/대체재 출현 속도를 고려 (급격한 성숙/하락 가능)
+- 규제 환경 변화(성분 규제, 클린뷰티 기준 등) 리스크 반영"""
+
+
+def register_framework_prefixes(engine):
+    """프레임워크 프롬프트까지 포함한 prefix KV cache 사전 계산 (요청마다 동일한 앞부분)"""
+    engine.register_prefix("plc-framework", SYSTEM_PROMPT, PLC_FRAMEWORK_PROMPT)
+    engine.register_prefix("category-framework", SYSTEM_PROMPT, CATEGORY_FRAMEWORK_PROMPT)
+
+
+# plc-prediction 응답 형식 고정 (structured.py의 "plc-prediction" 스키마)
+PLC_GENERATION_PARAMS = with_schema(GENERATION_PARAMS, "plc-prediction")
+
+
+@endpoint("plc-prediction", "/api/llm/plc-prediction", on_mount=register_framework_prefixes)
+@cached_response("plc-prediction/v2", PLC_GENERATION_PARAMS)
+def plc_prediction():
+    """다중 프레임워크 기반 향후 6-12개월 예측 (PLC + Trend Diffusion + Consumer Demand)"""
+    try:
+        data = request.json
+        keyword = data.get("keyword", "")
+        trend_level = data.get("trendLevel", "Actionable")
+        current_score = data.get("currentScore", 75)
+        sns_growth = data.get("snsGrowth", 30)
+        retail_signal = data.get("retailSignal", 70)
+        category = data.get("category", "Skincare")
+
+        prompt = f"""{PLC_FRAMEWORK_PROMPT}
+
+[키워드 데이터]
+- 키워드: {keyword}
+- 트렌드 레벨: {trend_level}
+- 현재 종합 점수: {current_score}/100
+- SNS 성장률: {sns_growth}%
+- 리테일 신호 강도: {retail_signal}%
+- 카테고리: {category}
+
+판정 규칙(반드시 준수):
+1) 점수 하나로 단계 결정 금지 - 키워드 특성, 확산/리테일 균형, 리스크 모두 반영
+2) 월별점수는 항상 단조 증가/감소 금지 - 변곡점/피크/안정화 구간을 현실적으로 반영
+3) SNS만 높고 Retail 낮으면 버즈 소멸 리스크, 둘 다 높으면 지속 성장 가능성 높음
+
+다음 형식으로 정확히 답변해주세요:
+
+[현재단계] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[6개월예측] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[12개월예측] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[월별점수] 현재부터 12개월 후까지 13개의 예측 점수를 쉼표로 구분 (0-100 범위)
+
+[성장드라이버]
+• 현재 성장을 이끄는 핵심 요인 1
+• 현재 성장을 이끄는 핵심 요인 2
+
+[하락리스크]
+• 잠재적 하락/소멸 리스크 1
+• 잠재적 하락/소멸 리스크 2
+
+[시나리오]
+• 긍정 시나리오: 조건 충족 시 예상 결과
+• 부정 시나리오: 리스크 발생 시 예상 결과
+
+[종합의견] 1-2문장으로 최종 종합 의견"""
+
+        response = generate_response(prompt, max_new_tokens=800, params=PLC_GENERATION_PARAMS)
+
+        current_phase = "성장기"
+        prediction_6m = "성숙기"
+        prediction_12m = "성숙기"
+        monthly_scores = []
+        growth_drivers = []
+        decline_risks = []
+        scenarios = []
+        summary = ""
+
+        lines = response.split("\n")
+        current_section = None
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if any(kw in line for kw in ["[현재단계]", "현재단계:", "현재 단계"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        current_phase = phase
+                        break
+            elif any(kw in line for kw in ["[6개월예측]", "6개월예측:", "6개월 예측"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        prediction_6m = phase
+                        break
+            elif any(kw in line for kw in ["[12개월예측]", "12개월예측:", "12개월 예측"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        prediction_12m = phase
+                        break
+            elif any(kw in line for kw in ["[월별점수]", "월별점수:", "월별 점수"]):
+                numbers = re.findall(r'\d+(?:\.\d+)?', line.split("]")[-1] if "]" in line else line.split(":")[-1])
+                monthly_scores = [min(100, max(0, float(n))) for n in numbers[:13]]
+                current_section = "scores"
+            elif any(kw in line for kw in ["[성장드라이버]", "성장드라이버:", "성장 드라이버"]):
+                current_section = "drivers"
+            elif any(kw in line for kw in ["[하락리스크]", "하락리스크:", "하락 리스크"]):
+                current_section = "risks"
+            elif line.startswith(("[시나리오]", "시나리오:")):  # "• 긍정 시나리오: ..." 줄은 항목
+                current_section = "scenarios"
+            elif any(kw in line for kw in ["[종합의견]", "종합의견:", "종합 의견"]):
+                current_section = "summary"
+                rest = re.sub(r'^\[종합의견\]|^종합의견:|^\[종합 의견\]', '', line).strip()
+                if rest and len(rest) > 5:
+                    summary = rest
+            elif current_section == "scores" and not monthly_scores:
+                numbers = re.findall(r'\d+(?:\.\d+)?', line)
+                if numbers:
+                    monthly_scores = [min(100, max(0, float(n))) for n in numbers[:13]]
+            elif current_section == "drivers":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    growth_drivers.append(clean_line)
+            elif current_section == "risks":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    decline_risks.append(clean_line)
+            elif current_section == "scenarios":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    scenarios.append(clean_line)
+            elif current_section == "summary":
+                if line and len(line) > 5:
+                    summary += " " + line
+
+        if len(monthly_scores) < 13:
+            base = current_score
+            phase_map = {"도입기": "growth", "성장기": "peak", "성숙기": "stable", "쇠퇴기": "decline"}
+            trend = phase_map.get(current_phase, "stable")
+
+            monthly_scores = [base]
+            for i in range(1, 13):
+                if trend == "growth":
+                    delta = 2.5 + (i * 0.3)
+                elif trend == "peak":
+                    delta = 1.5 - (i * 0.2) if i < 6 else -0.5
+                elif trend == "stable":
+                    delta = 0.5 - (i * 0.1)
+                else:
+                    delta = -1.5 - (i * 0.3)
+                monthly_scores.append(min(100, max(10, monthly_scores[-1] + delta)))
+
+        if not summary:
+            summary = f"{keyword}는 현재 {current_phase} 단계에 있으며, 6개월 후 {prediction_6m}, 12개월 후 {prediction_12m} 단계로 진행될 것으로 예측됩니다."
+
+        return jsonify({
+            "success": True,
+            "currentPhase": current_phase,
+            "prediction6m": prediction_6m,
+            "prediction12m": prediction_12m,
+            "monthlyScores": monthly_scores[:13],
+            "growthDrivers": growth_drivers[:3],
+            "declineRisks": decline_risks[:3],
+            "scenarios": scenarios[:2],
+            "summary": clean_text(summary),
+            "explanation": clean_text(summary),  # 기존 호환성 유지
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in plc_prediction: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("category-prediction", "/api/llm/category-prediction", on_mount=register_framework_prefixes)
+def category_prediction():
+    """카테고리 전체의 다중 프레임워크 기반 향후 6-12개월 예측"""
+    try:
+        data = request.json
+        country = data.get("country", "usa")
+        category = data.get("category", "Skincare")
+        top_keywords = data.get("topKeywords", [])
+        avg_score = data.get("avgScore", 70)
+
+        country_names = {
+            "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+            "malaysia": "말레이시아", "indonesia": "인도네시아"
+        }
+        country_name = country_names.get(country, "해외")
+
+        keywords_summary = ""
+        if top_keywords:
+            keywords_summary = ", ".join([f"{k.get('keyword', '')}({k.get('score', 0)}점)" for k in top_keywords[:10]])
+
+        prompt = f"""{CATEGORY_FRAMEWORK_PROMPT}
+
+[카테고리 데이터]
+- 국가: {country_name}
+- 카테고리: {category}
+- 카테고리 평균 점수: {avg_score}/100
+- 주요 키워드: {keywords_summary}
+
+판정 규칙(반드시 준수):
+1) 점수 하나로 단계 결정 금지 - 키워드 구성, 확산/리테일 균형, 리스크 반영
+2) 월별점수는 항상 단조 증가/감소 금지 - 변곡/피크 가능성 반영
+3) 국가별 시장 특성(미국=성분주의, 일본=텍스처/기능, 동남아=기초스킨케어) 반영
+
+다음 형식으로 정확히 답변해주세요:
+
+[현재단계] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[6개월예측] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[12개월예측] 도입기/성장기/성숙기/쇠퇴기 중 하나
+[월별점수] 현재부터 12개월 후까지 13개의 예측 점수를 쉼표로 구분 (0-100 범위)
+
+[성장드라이버]
+• 현재 성장을 이끄는 핵심 요인 1
+• 현재 성장을 이끄는 핵심 요인 2
+
+[하락리스크]
+• 잠재적 하락/소멸 리스크 1
+• 잠재적 하락/소멸 리스크 2
+
+[시나리오]
+• 긍정 시나리오: 조건 충족 시 예상 결과
+• 부정 시나리오: 리스크 발생 시 예상 결과
+
+[종합의견] 1-2문장으로 최종 종합 의견"""
+
+        response = generate_response(prompt, max_new_tokens=800)
+
+        current_phase = "성장기"
+        prediction_6m = "성숙기"
+        prediction_12m = "성숙기"
+        monthly_scores = []
+        growth_drivers = []
+        decline_risks = []
+        scenarios = []
+        summary = ""
+
+        lines = response.split("\n")
+        current_section = None
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if any(kw in line for kw in ["[현재단계]", "현재단계:", "현재 단계"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        current_phase = phase
+                        break
+            elif any(kw in line for kw in ["[6개월예측]", "6개월예측:", "6개월 예측"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        prediction_6m = phase
+                        break
+            elif any(kw in line for kw in ["[12개월예측]", "12개월예측:", "12개월 예측"]):
+                for phase in ["도입기", "성장기", "성숙기", "쇠퇴기"]:
+                    if phase in line:
+                        prediction_12m = phase
+                        break
+            elif any(kw in line for kw in ["[월별점수]", "월별점수:", "월별 점수"]):
+                numbers = re.findall(r'\d+(?:\.\d+)?', line.split("]")[-1] if "]" in line else line.split(":")[-1])
+                monthly_scores = [min(100, max(0, float(n))) for n in numbers[:13]]
+                current_section = "scores"
+            elif any(kw in line for kw in ["[성장드라이버]", "성장드라이버:", "성장 드라이버"]):
+                current_section = "drivers"
+            elif any(kw in line for kw in ["[하락리스크]", "하락리스크:", "하락 리스크"]):
+                current_section = "risks"
+            elif any(kw in line for kw in ["[시나리오]", "시나리오:"]):
+                current_section = "scenarios"
+            elif any(kw in line for kw in ["[종합의견]", "종합의견:", "종합 의견"]):
+                current_section = "summary"
+                rest = re.sub(r'^\[종합의견\]|^종합의견:|^\[종합 의견\]', '', line).strip()
+                if rest and len(rest) > 5:
+                    summary = rest
+            elif current_section == "scores" and not monthly_scores:
+                numbers = re.findall(r'\d+(?:\.\d+)?', line)
+                if numbers:
+                    monthly_scores = [min(100, max(0, float(n))) for n in numbers[:13]]
+            elif current_section == "drivers":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    growth_drivers.append(clean_line)
+            elif current_section == "risks":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    decline_risks.append(clean_line)
+            elif current_section == "scenarios":
+                clean_line = line.lstrip("•-·* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    scenarios.append(clean_line)
+            elif current_section == "summary":
+                if line and len(line) > 5:
+                    summary += " " + line
+
+        if len(monthly_scores) < 13:
+            base = avg_score
+            phase_map = {"도입기": "growth", "성장기": "peak", "성숙기": "stable", "쇠퇴기": "decline"}
+            trend = phase_map.get(current_phase, "stable")
+
+            monthly_scores = [base]
+            for i in range(1, 13):
+                if trend == "growth":
+                    delta = 2.0 + (i * 0.25)
+                elif trend == "peak":
+                    delta = 1.2 - (i * 0.15) if i < 6 else -0.3
+                elif trend == "stable":
+                    delta = 0.3 - (i * 0.05)
+                else:
+                    delta = -1.2 - (i * 0.2)
+                monthly_scores.append(min(100, max(10, monthly_scores[-1] + delta)))
+
+        if not summary:
+            summary = f"{country_name} {category} 카테고리는 현재 {current_phase} 단계에 있으며, 6개월 후 {prediction_6m}, 12개월 후 {prediction_12m} 단계로 진행될 것으로 예측됩니다."
+
+        return jsonify({
+            "success": True,
+            "currentPhase": current_phase,
+            "prediction6m": prediction_6m,
+            "prediction12m": prediction_12m,
+            "monthlyScores": monthly_scores[:13],
+            "growthDrivers": growth_drivers[:3],
+            "declineRisks": decline_risks[:3],
+            "scenarios": scenarios[:2],
+            "summary": clean_text(summary),
+            "explanation": clean_text(summary),  # 기존 호환성 유지
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in category_prediction: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
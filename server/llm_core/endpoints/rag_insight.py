@@ -0,0 +1,400 @@
+"""
+RAG 기반 인사이트 엔드포인트 (기존 llm_server_port7.py)
+Endpoints: rag-insight, rag-search, rag-reload
+- rag-reload는 관리용: LLM_ADMIN_TOKEN이 설정되어 있으면 X-Admin-Token 헤더가 일치해야 하고,
+  없으면 서버 로컬(127.0.0.1/::1) 요청만 허용
+"""
+import hmac
+import os
+
+from flask import request, jsonify
+
+from llm_core import rag
+from llm_core.registry import endpoint
+from llm_core.runtime import generate_response
+from llm_core.scheduler import QueueFullError
+from llm_core.text import clean_text
+
+
+COUNTRY_NAMES = {
+    "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+    "malaysia": "말레이시아", "indonesia": "인도네시아"
+}
+MAX_BATCH_QUERIES = 16
+ADMIN_TOKEN = os.environ.get("LLM_ADMIN_TOKEN", "")
+LOCAL_ADDRS = {"127.0.0.1", "::1", "::ffff:127.0.0.1"}
+
+
+def load_rag(engine):
+    rag.load_rag_index()
+
+
+def build_query_text(data: dict) -> str:
+    """RAG 쿼리 구성: keyword + category + country + topKeywords (rag-insight / rag-search 공통)"""
+    keyword = data.get("keyword", "")
+    category = data.get("category", "Skincare")
+    country_name = COUNTRY_NAMES.get(data.get("country", "usa"), "해외")
+    top_keywords = data.get("topKeywords", [])
+
+    query_parts = []
+    if keyword:
+        query_parts.append(keyword)
+    if category:
+        query_parts.append(category)
+    if country_name:
+        query_parts.append(country_name)
+    if top_keywords:
+        query_parts.extend([k.get("keyword", "") for k in top_keywords[:5]])
+    return " ".join(filter(None, query_parts))
+
+
+@endpoint("rag-search", "/api/llm/rag-search", on_mount=load_rag)
+def rag_search():
+    """RAG 검색만 여러 건 한 번에 (페이지의 marketing/npd/overseas 등) - 인코더 1회 + 행렬곱 1회
+
+    {"queries": [{"query": "..."} 또는 rag-insight와 같은 keyword/category/country/topKeywords, "type", "topK"}]}
+    """
+    try:
+        data = request.json or {}
+        queries = data.get("queries", [])
+        if not isinstance(queries, list) or not queries:
+            return jsonify({"success": False, "error": "queries must be a non-empty list"}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({"success": False, "error": f"too many queries (max {MAX_BATCH_QUERIES})"}), 400
+
+        batch = []
+        for i, q in enumerate(queries):
+            if not isinstance(q, dict):
+                return jsonify({"success": False, "error": f"queries[{i}] must be an object"}), 400
+            try:
+                top_k = int(q.get("topK", 3))
+                text = q.get("query") or build_query_text(q)
+            except (AttributeError, TypeError, ValueError):
+                return jsonify({"success": False, "error": f"queries[{i}]: topK must be an integer, "
+                                                           "query/keyword/category/country strings"}), 400
+            if not isinstance(text, str) or not text.strip():
+                return jsonify({"success": False, "error": f"queries[{i}] needs query or keyword/category"}), 400
+            batch.append({"query": text, "type": str(q.get("type", "marketing")), "topK": max(1, min(top_k, 20))})
+        results = rag.search_rag_batch(batch)
+        return jsonify({
+            "success": True,
+            "ragAvailable": rag.RAG_AVAILABLE,
+            "results": [{"query": q["query"], "type": q["type"], "results": r} for q, r in zip(batch, results)],
+        })
+    except Exception as e:
+        print(f"Error in rag_search: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def is_admin_request() -> bool:
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+    return request.remote_addr in LOCAL_ADDRS
+
+
+@endpoint("rag-reload", "/api/llm/rag-reload", on_mount=load_rag)
+def rag_reload():
+    """새로 게시된 RAG 인덱스 버전으로 즉시 교체 (감시 주기를 기다리지 않음, {"force": true}면 같은 버전도 다시 열기)"""
+    if not is_admin_request():
+        return jsonify({"success": False, "error": "rag-reload is restricted to localhost or X-Admin-Token"}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        result = rag.reload_rag_index(force=bool(data.get("force", False)))
+        return jsonify({"success": "error" not in result, **result, "ragIndex": rag.index_status()})
+    except Exception as e:
+        print(f"Error in rag_reload: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("rag-insight", "/api/llm/rag-insight", on_mount=load_rag)
+def rag_insight():
+    """RAG 기반 맞춤형 인사이트 생성 - 벡터 검색 + EXAONE 인사이트"""
+    try:
+        data = request.json
+        scope = data.get("scope", "category")
+        insight_type = data.get("type", "marketing")
+        keyword = data.get("keyword", "")
+        category = data.get("category", "Skincare")
+        country = data.get("country", "usa")
+        top_keywords = data.get("topKeywords", [])
+        positive_reviews = data.get("positiveReviews", [])
+        negative_reviews = data.get("negativeReviews", [])
+
+        country_name = COUNTRY_NAMES.get(country, "해외")
+
+        type_names = {
+            "marketing": "마케팅 캠페인",
+            "npd": "신제품 기획(BM)",
+            "overseas": "해외 진출 전략"
+        }
+        type_name = type_names.get(insight_type, "마케팅 캠페인")
+
+        keywords_text = ""
+        if top_keywords:
+            keywords_text = ", ".join([k.get("keyword", "") for k in top_keywords[:10]])
+
+        # ===== Vector Search (새 임베딩 기반) =====
+        rag_text = ""
+        rag_sources = []
+        if rag.RAG_AVAILABLE:
+            # 쿼리 구성: keyword + category + country + topKeywords (rag-search로 미리 검색했으면 캐시 적중)
+            query_text = build_query_text(data)
+
+            # RAG 검색
+            search_results = rag.search_rag(query_text, insight_type, top_k=3)
+
+            if search_results:
+                rag_text = "\n\n[시장 참고 사례 - 실제 마케팅 성공 사례 및 시장 신호 데이터]\n"
+                for i, result in enumerate(search_results, 1):
+                    doc_type = "마케팅 성공 사례" if result['type'] == 'marketing_case' else "시장 신호"
+                    rag_sources.append({
+                        "id": result['id'],
+                        "brand": result['brand'],
+                        "product": result['product'],
+                        "type": doc_type
+                    })
+
+                    rag_text += f"\n사례 {i}: [{doc_type}] {result['brand']} - {result['product']}\n"
+                    rag_text += f"  국가: {result['country']} | 카테고리: {result['category']}\n"
+
+                    if result['type'] == 'marketing_case':
+                        if result.get('key_message'):
+                            rag_text += f"  핵심 메시지: {result['key_message']}\n"
+                        if result.get('channel'):
+                            rag_text += f"  채널: {result['channel']}\n"
+                        if result.get('why_it_worked'):
+                            rag_text += f"  성공 요인: {result['why_it_worked']}\n"
+                        if result.get('evidence_snippet'):
+                            rag_text += f"  근거: {result['evidence_snippet']}\n"
+                    else:  # market_signal
+                        if result.get('signal_type'):
+                            rag_text += f"  신호 유형: {result['signal_type']} ({result.get('signal_strength', '')})\n"
+                        if result.get('evidence_summary'):
+                            rag_text += f"  근거: {result['evidence_summary']}\n"
+
+                print(f"  RAG: Found {len(search_results)} relevant cases for '{query_text[:50]}...'")
+
+        if scope == "keyword":
+            target_desc = f'"{keyword}" 키워드'
+        else:
+            target_desc = f'{category} 카테고리 전체 (주요 키워드: {keywords_text})'
+
+        # 목적별 프롬프트 - Query 1: 섹션 1, 2, 3만 생성 (모든 유형 동일 구조)
+        if insight_type == "marketing":
+            purpose_instruction = """다음 형식으로 마케팅 캠페인 인사이트를 작성해주세요. 반드시 아래 3개 섹션을 포함해야 합니다:
+
+**1. 타겟 오디언스 분석**
+• **핵심 타겟층:** 주요 타겟 고객군의 특성과 니즈를 구체적으로 설명
+• **타겟 인사이트:** 참고 사례를 바탕으로 한 효과적인 타겟팅 전략 제안
+
+**2. 채널 및 콘텐츠 전략**
+• **추천 채널:** 가장 효과적인 마케팅 채널 (SNS, 인플루언서, 리테일 등)
+• **콘텐츠 방향:** 참고 사례의 성공 전략을 반영한 콘텐츠 유형 및 바이럴 포인트
+
+**3. 핵심 메시지 및 비주얼 컨셉**
+• **핵심 메시지:** 타겟에게 어필할 수 있는 캠페인 슬로건/메시지
+• **비주얼 방향:** 패키징, 분위기, 색감 등 비주얼 컨셉 제안
+
+위 3개 섹션만 작성하세요. 각 섹션 제목과 하위 카테고리는 반드시 **굵은 글씨**로 표시하세요."""
+
+        elif insight_type == "npd":
+            purpose_instruction = """다음 형식으로 신제품 기획(BM) 인사이트를 작성해주세요. 반드시 아래 3개 섹션을 포함해야 합니다:
+
+**1. 성분 배합 제안**
+• **핵심 성분 조합:** 참고 사례의 과학적 배합 인사이트를 바탕으로, 현재 트렌드에 맞는 유망 핵심 성분 조합
+• **과학적 근거:** 성분 조합의 시너지 효과와 피부 과학적 메커니즘 설명
+
+**2. 제형 컨셉 및 텍스처**
+• **차별화 제형:** 참고 사례의 제형 혁신을 바탕으로, 소비자 선호도에 맞는 차별화된 제형/텍스처
+• **전달 시스템:** 성분 효능 극대화를 위한 혁신적 전달 기술 제안
+
+**3. USP 및 포지셔닝**
+• **차별화 포인트:** 참고 사례의 시장 반응을 바탕으로, 경쟁 제품 대비 명확한 차별화 요소
+• **시장 포지셔닝:** 타겟 가격대, 프리미엄 vs 매스 전략, 타겟 유통 채널
+
+위 3개 섹션만 작성하세요. 각 섹션 제목과 하위 카테고리는 반드시 **굵은 글씨**로 표시하세요."""
+
+        else:  # overseas
+            purpose_instruction = """다음 형식으로 해외 진출 전략 인사이트를 작성해주세요. 반드시 아래 3개 섹션을 포함해야 합니다:
+
+**1. 시장 진입 전략**
+• **진입 방식:** 참고 사례의 실제 시장 데이터를 바탕으로, 해당 시장의 최적 진입 전략(유통, 타이밍)
+• **포지셔닝:** 해당 국가 시장에서의 최적 브랜드/제품 포지셔닝 방향
+
+**2. 현지 소비자 분석**
+• **타겟 선호도:** 참고 사례의 소비자 인사이트를 바탕으로, 타겟 시장의 제품/성분 선호도
+• **문화적 특성:** 구매 패턴, 뷰티 루틴, 문화적 금기사항 등 고려 사항
+
+**3. 유통 및 가격 전략**
+• **유통 채널:** 참고 사례의 성공/실패를 바탕으로, 적합한 유통 채널 (온라인/오프라인/멀티)
+• **가격 포지셔닝:** 현지 시장 대비 최적 가격대와 구체적 가격 범위 제안
+
+위 3개 섹션만 작성하세요. 각 섹션 제목과 하위 카테고리는 반드시 **굵은 글씨**로 표시하세요."""
+
+        # 리뷰 데이터 섹션 구성
+        review_section = ""
+        if positive_reviews or negative_reviews:
+            review_section = "\n[고객 리뷰 분석 - 실제 소비자 목소리]\n"
+            if positive_reviews:
+                review_section += f"• 긍정 리뷰 주요 키워드: {', '.join(positive_reviews[:6])}\n"
+            if negative_reviews:
+                review_section += f"• 부정 리뷰 주요 키워드 (개선 필요): {', '.join(negative_reviews[:6])}\n"
+            review_section += "※ 특히 부정 리뷰에서 언급된 불만 사항을 해결하는 방향으로 전략을 제안해주세요.\n"
+
+        prompt = f"""다음은 {country_name} 시장의 {target_desc}에 대한 {type_name} 인사이트 요청입니다.
+
+[분석 대상]
+- 국가: {country_name}
+- 카테고리: {category}
+- 분석 범위: {scope} ({keyword if scope == 'keyword' else '카테고리 전체'})
+- 주요 트렌드 키워드: {keywords_text}
+{review_section}{rag_text}
+
+위의 실제 시장 참고 사례와 고객 리뷰 데이터를 핵심 근거로 활용하여, 당신의 K-뷰티 시장 전문 지식과 결합해 실행 가능한 인사이트를 제공해주세요.
+반드시 참고 사례의 구체적인 데이터와 성과를 인용하고, 고객 리뷰에서 도출된 개선점을 반영하여 인사이트의 실용성을 높여주세요.
+
+{purpose_instruction}"""
+
+        response = generate_response(prompt, max_new_tokens=1200)
+
+        content = clean_text(response) if response else f"{country_name} {category} 시장에 대한 {type_name} 인사이트입니다."
+
+        # ===== 모든 타입: Query 2 - 과거 성공 사례 분석 (4번) =====
+        query2_section = ""
+        if rag_sources:
+            print(f"  [{insight_type.upper()}] Query 2: Generating past success cases...")
+
+            # 타입별 사례 분석 관점 설정
+            if insight_type == "marketing":
+                case_focus = "마케팅 성공 전략"
+                case_aspects = """• <성과지표> 해당 사례의 구체적인 성공 수치 (매출 증가율, 판매량, 인지도 상승 등)
+• <핵심전략> 이 사례에서 배울 수 있는 핵심 마케팅 전략
+• <적용방안> {target_desc}에 이 전략을 어떻게 적용할 수 있는지"""
+            elif insight_type == "npd":
+                case_focus = "제품 혁신 사례"
+                case_aspects = """• <성분혁신> 해당 제품의 핵심 성분 조합과 과학적 효능
+• <제형기술> 이 사례에서 사용된 혁신적 제형/텍스처 기술
+• <적용방안> {target_desc} 신제품 개발에 이 혁신을 어떻게 적용할 수 있는지"""
+            else:  # overseas
+                case_focus = "해외 진출 사례"
+                case_aspects = """• <진출성과> 해당 사례의 해외 시장 진출 성과 (매출, 점유율, 인지도 등)
+• <성공요인> 이 사례의 현지화/진입 전략 핵심 성공 요인
+• <적용방안> {target_desc}의 해외 진출에 이 전략을 어떻게 적용할 수 있는지"""
+
+            case_aspects = case_aspects.format(target_desc=target_desc)
+
+            query2_prompt = f"""당신은 K-뷰티 {type_name} 전문가입니다.
+아래 실제 {case_focus}들을 분석해주세요.
+
+[분석 대상]
+- 국가: {country_name}
+- 카테고리: {category}
+- 주요 키워드: {keywords_text}
+
+{rag_text}
+
+다음 형식으로 정확히 작성해주세요:
+
+**4. 과거 성공 사례 분석**
+
+**4-1. [브랜드명 - 제품명]**
+{case_aspects}
+
+**4-2. [브랜드명 - 제품명]**
+{case_aspects}
+
+**4-3. [브랜드명 - 제품명]**
+{case_aspects}
+
+반드시 위 형식을 준수하세요. 4-1, 4-2, 4-3 제목은 **굵은 글씨**로 표시하세요.
+Agent Insight는 작성하지 마세요."""
+
+            query2_response = generate_response(query2_prompt, max_new_tokens=800)
+            if query2_response:
+                query2_section = "\n\n" + query2_response.strip()
+                print(f"  [{insight_type.upper()}] Query 2 completed successfully")
+
+        # ===== 모든 타입: Query 3 - Agent Insight (종합 전략 요약) =====
+        agent_insight_content = ""
+        print(f"  [{insight_type.upper()}] Query 3: Generating Agent Insight summary...", flush=True)
+
+        # 이전 쿼리 결과를 캐시로 사용 (1~4번 내용)
+        cached_analysis = content.strip()
+        if query2_section:
+            cached_analysis += query2_section
+
+        # 타입별 Agent Insight 프롬프트 설정
+        if insight_type == "marketing":
+            insight_intro = f"{country_name} {category} 시장에서 {target_desc}을 위한 최종 마케팅 전략입니다."
+            insight_items = """**핵심 타겟** 집중해야 할 타겟층 (1문장)
+**추천 채널** 최우선 마케팅 채널 (1문장)
+**핵심 메시지** 캠페인 핵심 메시지/컨셉 (1문장)
+**벤치마크** 과거 성공 사례에서 배운 핵심 포인트 (1문장)
+**실행 액션** 즉시 실행 가능한 액션 (1문장)"""
+            summary_context = "타겟 오디언스, 채널 전략, 핵심 메시지, 과거 성공 사례"
+        elif insight_type == "npd":
+            insight_intro = f"{country_name} {category} 시장에서 {target_desc}을 위한 신제품 기획 방향입니다."
+            insight_items = """**핵심 성분** 최우선 적용할 성분 조합 (1문장)
+**제형 컨셉** 차별화된 제형/텍스처 방향 (1문장)
+**USP** 경쟁 대비 핵심 차별화 포인트 (1문장)
+**벤치마크** 과거 혁신 사례에서 배운 핵심 포인트 (1문장)
+**실행 액션** 즉시 실행 가능한 R&D 액션 (1문장)"""
+            summary_context = "성분 배합, 제형 컨셉, USP 포지셔닝, 과거 혁신 사례"
+        else:  # overseas
+            insight_intro = f"{country_name} {category} 시장에서 {target_desc}을 위한 해외 진출 전략입니다."
+            insight_items = """**진입 전략** 최적 시장 진입 방식 (1문장)
+**타겟 소비자** 집중해야 할 현지 타겟층 (1문장)
+**유통 채널** 최우선 유통 채널 전략 (1문장)
+**벤치마크** 과거 진출 사례에서 배운 핵심 포인트 (1문장)
+**실행 액션** 즉시 실행 가능한 현지화 액션 (1문장)"""
+            summary_context = "시장 진입, 현지 소비자, 유통/가격 전략, 과거 진출 사례"
+
+        query3_prompt = f"""당신은 K-뷰티 {type_name} 수석 컨설턴트입니다.
+
+[분석 대상]
+- 국가: {country_name}
+- 카테고리: {category}
+- 타겟: {target_desc}
+
+[이전 분석 내용 요약]
+{cached_analysis}
+
+위 분석 내용({summary_context})을 종합하여 최종 전략을 간결하게 요약해주세요.
+
+다음 형식으로 정확히 작성해주세요 (5-6문장 이내로 핵심만):
+
+{insight_intro}
+
+{insight_items}
+
+간결하고 실행 가능한 형태로 작성하세요. 각 항목은 **항목명** 형식으로 시작하고 콜론(:)은 넣지 마세요."""
+
+        query3_response = generate_response(query3_prompt, max_new_tokens=400)
+        if query3_response:
+            agent_insight_content = query3_response.strip()
+            print(f"  [{insight_type.upper()}] Query 3 (Agent Insight) completed: {len(agent_insight_content)} chars", flush=True)
+        else:
+            print(f"  [{insight_type.upper()}] Query 3 FAILED - no response!", flush=True)
+
+        # 콘텐츠 조합 - 모든 유형에서 동일한 구조: Query 1(1,2,3번) + Query 2(4번) + Agent Insight는 별도
+        content = content.strip() + query2_section
+
+        return jsonify({
+            "success": True,
+            "content": content,
+            "agentInsight": agent_insight_content,  # 모든 유형에서 Agent Insight 반환
+            "scope": scope,
+            "type": insight_type,
+            "keyword": keyword,
+            "category": category,
+            "country": country,
+            "ragSources": rag_sources,
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in rag_insight: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": str(e)}), 500
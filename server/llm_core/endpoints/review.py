@@ -0,0 +1,230 @@
+"""
+리뷰 분석 엔드포인트
+- review-summary: 기존 llm_server_port6.py
+- classify-review, summarize-reviews: 기존 llm_server_gpu6.py (scripts/의 배치 분류/요약 작업용)
+"""
+import re
+from functools import partial
+
+from flask import request, jsonify
+
+from llm_core.batching import SamplingParams
+from llm_core.registry import endpoint
+from llm_core.runtime import generate_response
+from llm_core.scheduler import BATCH, QueueFullError
+from llm_core.structured import with_schema
+from llm_core.text import clean_text as _clean_text
+
+clean_text = partial(_clean_text, convert_bullets=False)
+
+# 배치 분류/요약 스크립트용 샘플링 설정 (기존 gpu6 서버 값)
+BATCH_GENERATION_PARAMS = SamplingParams(
+    temperature=0.7,
+    top_p=0.9,
+    top_k=50,  # gpu6은 top_k 미지정 → model.generate 기본값 50과 동일
+    repetition_penalty=1.1,
+)
+
+# classify-review 요청의 "schema" 값으로 선택 가능한 출력 형식
+CLASSIFY_SCHEMAS = ("review-classification",)
+
+
+@endpoint("review-summary", "/api/llm/review-summary")
+def review_summary():
+    """리뷰 AI 분석 요약 생성"""
+    try:
+        data = request.json
+        keyword = data.get("keyword", "")
+        country = data.get("country", "usa")
+        positive_keywords = data.get("positiveKeywords", [])
+        negative_keywords = data.get("negativeKeywords", [])
+        positive_count = data.get("positiveCount", 0)
+        negative_count = data.get("negativeCount", 0)
+        is_combination = data.get("isCombination", False)
+
+        country_names = {
+            "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+            "malaysia": "말레이시아", "indonesia": "인도네시아"
+        }
+        country_name = country_names.get(country, "해외")
+
+        pos_list = ", ".join([f"{k['keyword']}({k['count']}건)" for k in positive_keywords[:8]])
+        neg_list = ", ".join([f"{k['keyword']}({k['count']}건)" for k in negative_keywords[:8]])
+
+        total = positive_count + negative_count
+        pos_ratio = round(positive_count / total * 100, 1) if total > 0 else 50
+
+        item_type = "꿀조합(성분+제형+효과 조합) 키워드" if is_combination else "트렌드 키워드"
+
+        prompt = f"""다음은 {country_name} 시장에서 "{keyword}" {item_type}에 대한 소비자 리뷰 분석 데이터입니다.
+
+[리뷰 데이터 현황]
+- 전체 리뷰 수: {total}건
+- 긍정 리뷰: {positive_count}건 ({pos_ratio}%)
+- 부정 리뷰: {negative_count}건 ({round(100 - pos_ratio, 1)}%)
+- 긍정 리뷰 주요 키워드: {pos_list}
+- 부정 리뷰 주요 키워드: {neg_list}
+
+위 데이터를 바탕으로 가독성 좋은 형식으로 분석해주세요. 반드시 아래 형식을 정확히 따라주세요:
+
+[소비자반응]
+• 긍정 요인: 긍정 키워드 데이터를 바탕으로 소비자들이 만족하는 핵심 포인트 2-3가지를 구체적 수치와 함께 설명
+• 부정 요인: 부정 키워드 데이터를 바탕으로 소비자들이 불만족하는 포인트 1-2가지를 구체적 수치와 함께 설명
+
+[핵심인사이트]
+1. 첫 번째 인사이트 (데이터 근거 포함)
+2. 두 번째 인사이트 (데이터 근거 포함)
+3. 세 번째 인사이트 (데이터 근거 포함)
+
+[시장전망]
+{country_name} 시장에서 "{keyword}" 키워드의 향후 전망과 K-뷰티 브랜드 관점에서의 기회/주의점을 2-3문장으로 요약
+
+[키워드] 핵심 인사이트 키워드 4개를 쉼표로 구분 (각 2-6자)"""
+
+        response = generate_response(prompt, max_new_tokens=1500)
+        response = clean_text(response)
+
+        consumer_response = ""
+        insight_list = []
+        market_outlook = ""
+        keywords = []
+        sentiment_ratio = pos_ratio / 100
+
+        lines = response.split("\n")
+        current_section = None
+        consumer_lines = []
+        insight_lines = []
+        outlook_lines = []
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if any(kw in line for kw in ["[소비자반응]", "소비자반응:", "소비자 반응"]):
+                current_section = "consumer"
+                continue
+            elif any(kw in line for kw in ["[핵심인사이트]", "핵심인사이트:", "핵심 인사이트"]):
+                current_section = "insights"
+                continue
+            elif any(kw in line for kw in ["[시장전망]", "시장전망:", "시장 전망"]):
+                current_section = "outlook"
+                continue
+            elif any(kw in line for kw in ["[키워드]", "키워드:"]):
+                rest = re.sub(r'^\[키워드\]|^키워드:', '', line).strip()
+                if rest:
+                    keywords = [k.strip() for k in rest.split(",") if k.strip()][:5]
+                current_section = None
+                continue
+
+            if current_section == "consumer":
+                consumer_lines.append(line)
+            elif current_section == "insights":
+                clean_line = line.lstrip("0123456789.-•→·)#* ").strip()
+                if clean_line and len(clean_line) > 5:
+                    insight_lines.append(clean_line)
+            elif current_section == "outlook":
+                outlook_lines.append(line)
+
+        consumer_response = "\n".join(consumer_lines) if consumer_lines else ""
+        insight_list = insight_lines[:4] if insight_lines else []
+        market_outlook = " ".join(outlook_lines) if outlook_lines else ""
+
+        summary_parts = []
+        if consumer_response:
+            summary_parts.append(f"소비자 반응\n{consumer_response}")
+        if insight_list:
+            insights_text = "\n".join([f"{i+1}. {ins}" for i, ins in enumerate(insight_list)])
+            summary_parts.append(f"핵심 인사이트\n{insights_text}")
+        if market_outlook:
+            summary_parts.append(f"시장 전망\n{clean_text(market_outlook)}")
+
+        summary = "\n\n".join(summary_parts) if summary_parts else ""
+
+        if not summary:
+            summary = f"소비자 반응\n긍정 비율 {pos_ratio}%로 전반적으로 호의적인 반응\n주요 긍정 키워드: {pos_list[:100]}\n\n핵심 인사이트\n1. {keyword}에 대한 소비자 관심도 상승\n2. 리뷰 데이터 기반 시장 잠재력 확인\n\n시장 전망\n{country_name} 시장에서 {keyword} 키워드의 성장 가능성이 높습니다."
+        if not keywords:
+            keywords = ["효과 우수", "보습력", "가성비", "만족도"]
+
+        return jsonify({
+            "success": True,
+            "summary": summary,
+            "insights": keywords,
+            "sentimentRatio": sentiment_ratio,
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in review_summary: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("classify-review", "/api/llm/classify-review", priority=BATCH)
+def classify_review():
+    """리뷰 분류 (sentiment + reviewType)"""
+    try:
+        data = request.json
+        prompt = data.get("prompt", "")
+        max_tokens = data.get("max_tokens", 200)
+        schema = data.get("schema")
+
+        if not prompt:
+            return jsonify({"success": False, "error": "prompt required"}), 400
+        if schema and schema not in CLASSIFY_SCHEMAS:
+            return jsonify({"success": False, "error": f"unknown schema: {schema}"}), 400
+
+        params = with_schema(BATCH_GENERATION_PARAMS, schema) if schema else BATCH_GENERATION_PARAMS
+        response = generate_response(prompt, max_new_tokens=max_tokens, params=params)
+
+        return jsonify({
+            "success": True,
+            "response": clean_text(response),
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in classify_review: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("summarize-reviews", "/api/llm/summarize-reviews", priority=BATCH)
+def summarize_reviews():
+    """리뷰 유형별 요약 생성"""
+    try:
+        data = request.json
+        review_type = data.get("reviewType", "효과")
+        sentiment = data.get("sentiment", "positive")
+        reviews = data.get("reviews", [])
+
+        if not reviews:
+            return jsonify({"success": False, "error": "reviews required"}), 400
+
+        sentiment_kr = "긍정적" if sentiment == "positive" else "부정적"
+        reviews_text = "\n".join([f"- {r[:200]}" for r in reviews[:5]])
+
+        prompt = f"""다음은 화장품에 대한 "{review_type}" 관련 {sentiment_kr} 리뷰들입니다.
+
+리뷰 샘플:
+{reviews_text}
+
+위 리뷰들의 공통된 특징과 소비자 의견을 2-3문장으로 요약해주세요.
+- 소비자들이 {review_type}에 대해 어떻게 평가하는지
+- 주요 장점 또는 단점
+- 전반적인 만족도"""
+
+        response = generate_response(prompt, max_new_tokens=300, params=BATCH_GENERATION_PARAMS)
+
+        return jsonify({
+            "success": True,
+            "summary": clean_text(response),
+            "reviewType": review_type,
+            "sentiment": sentiment,
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in summarize_reviews: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,414 @@
+"""
+SNS/화이트스페이스 제품 분석 엔드포인트 (기존 llm_server_port5.py)
+Endpoints: sns-analysis, whitespace-product
+"""
+import re
+
+from flask import request, jsonify
+
+from llm_core.registry import endpoint
+from llm_core.runtime import generate_response
+from llm_core.scheduler import QueueFullError
+from llm_core.stage_graph import Stage, run_stages
+from llm_core.text import clean_text
+
+
+@endpoint("sns-analysis", "/api/llm/sns-analysis")
+def sns_analysis():
+    """Retail/SNS 인기 키워드 AI 분석 생성 - Multi-Query 방식"""
+    try:
+        data = request.json
+        country = data.get("country", "usa")
+        category = data.get("category", "Skincare")
+        platforms = data.get("platforms", [])
+
+        country_names = {
+            "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+            "malaysia": "말레이시아", "indonesia": "인도네시아"
+        }
+        country_name = country_names.get(country, "해외")
+
+        # 플랫폼별 키워드를 Retail/SNS로 분리
+        retail_platforms = []
+        sns_platforms = []
+        retail_names = ["Amazon", "Sephora", "Ulta", "Olive Young", "Watsons", "Guardian", "Shopee", "Lazada", "Rakuten", "Qoo10", "@cosme", "Cosme"]
+        sns_names = ["Instagram", "TikTok", "YouTube", "Twitter", "Facebook", "Pinterest", "Reddit", "Threads"]
+
+        for p in platforms[:8]:
+            platform_name = p.get('platform', '')
+            keywords_list = p.get("keywords", [])[:5]
+            keywords_str = ", ".join([f"{k['name']}({k['value']}점)" for k in keywords_list])
+            platform_data = f"- {platform_name}: {keywords_str}"
+
+            if any(rn.lower() in platform_name.lower() for rn in retail_names):
+                retail_platforms.append(platform_data)
+            else:
+                sns_platforms.append(platform_data)
+
+        retail_info = "\n".join(retail_platforms) if retail_platforms else "- 데이터 없음"
+        sns_info = "\n".join(sns_platforms) if sns_platforms else "- 데이터 없음"
+
+        # 공통 출력 규칙
+        output_rules = """
+[출력 규칙]
+- 반드시 한국어로 작성
+- 텍스트와 숫자 중심으로 구체적으로 작성
+- 특수기호, 이모지, 박스 문자 사용 금지
+- 구분이 필요하면 1. 2. 3. 또는 - 로 표시
+- 각 문장은 완성된 형태로 작성"""
+
+        print(f"  Multi-Query SNS Analysis: Starting for {country_name} {category}...")
+
+        # ===== Sub Query 1: Retail 채널 분석 =====
+        prompt_retail = f"""다음은 {country_name} 시장 {category} 카테고리의 Retail 채널 인기 키워드 데이터입니다.
+
+[Retail 채널 데이터]
+{retail_info}
+
+위 데이터를 바탕으로 Retail 채널 분석을 작성해주세요.
+
+[Retail 채널 분석]
+
+1. 주요 트렌드
+- 상위 키워드와 점수를 근거로 현재 트렌드 설명 (2-3문장)
+
+2. 소비자 특성
+- Retail 구매자들의 관심사와 구매 패턴 (1-2문장)
+
+3. 수치 기반 인사이트
+- 키워드별 점수 차이가 의미하는 바 (1-2문장)
+{output_rules}"""
+
+        # ===== Sub Query 2: SNS 채널 분석 =====
+        prompt_sns = f"""다음은 {country_name} 시장 {category} 카테고리의 SNS 채널 인기 키워드 데이터입니다.
+
+[SNS 채널 데이터]
+{sns_info}
+
+위 데이터를 바탕으로 SNS 채널 분석을 작성해주세요.
+
+[SNS 채널 분석]
+
+1. 주요 트렌드
+- 상위 키워드와 점수를 근거로 현재 바이럴 트렌드 설명 (2-3문장)
+
+2. 바이럴 포인트
+- SNS에서 화제가 되는 요소와 콘텐츠 유형 (1-2문장)
+
+3. 수치 기반 인사이트
+- 플랫폼별 키워드 점수가 의미하는 바 (1-2문장)
+{output_rules}"""
+
+        # ===== Sub Query 3: 핵심 인사이트 (retail, sns 결과 필요) =====
+        def prompt_insights(sub_results):
+            return f"""다음은 {country_name} {category} 시장의 Retail과 SNS 채널 분석 결과입니다.
+
+[Retail 채널 분석]
+{sub_results.get('retail', '')}
+
+[SNS 채널 분석]
+{sub_results.get('sns', '')}
+
+위 분석을 종합하여 핵심 인사이트 3가지를 도출해주세요.
+
+[핵심 인사이트]
+
+1. (Retail과 SNS 공통 트렌드 - 수치 근거 포함)
+
+2. (Retail 채널 고유 인사이트 - 수치 근거 포함)
+
+3. (SNS 채널 고유 인사이트 - 수치 근거 포함)
+{output_rules}"""
+
+        # ===== Sub Query 4: 전략 제안 (retail, sns, insights 결과 필요) =====
+        def prompt_strategy(sub_results):
+            return f"""다음은 {country_name} {category} 시장 분석 결과입니다.
+
+[Retail 채널 분석]
+{sub_results.get('retail', '')}
+
+[SNS 채널 분석]
+{sub_results.get('sns', '')}
+
+[핵심 인사이트]
+{sub_results.get('insights', '')}
+
+위 분석을 바탕으로 K-뷰티 브랜드를 위한 채널별 전략을 제안해주세요.
+
+중요: 반드시 아래 3개 섹션 제목을 그대로 사용하고, 각 섹션 아래에 구체적인 실행 방안을 작성하세요.
+
+[RETAIL]
+Amazon, Sephora 등 리테일 채널에서의 마케팅/제품 전략 (2-3문장)
+
+[SNS]
+YouTube, Instagram, TikTok 등 SNS 채널에서의 콘텐츠/바이럴 전략 (2-3문장)
+
+[INTEGRATED]
+Retail과 SNS 채널을 연계한 통합 옴니채널 전략 (1-2문장)
+
+{output_rules}"""
+
+        # Retail/SNS는 서로 독립이므로 한 배치로 동시에 생성 → insights → strategy
+        sub_results = run_stages([
+            Stage("retail", lambda _: prompt_retail, max_new_tokens=400),
+            Stage("sns", lambda _: prompt_sns, max_new_tokens=400),
+            Stage("insights", prompt_insights, depends_on=("retail", "sns"), max_new_tokens=400),
+            Stage("strategy", prompt_strategy, depends_on=("retail", "sns", "insights"), max_new_tokens=400),
+        ])
+
+        print("  Multi-Query 완료: 결과 정리 중...")
+
+        # ===== 결과 파싱 및 정리 =====
+        retail_analysis = clean_text(sub_results.get('retail', ''))
+        sns_analysis_text = clean_text(sub_results.get('sns', ''))
+
+        # 인사이트 파싱
+        insights_raw = sub_results.get('insights', '')
+        insights = []
+        for line in insights_raw.split('\n'):
+            line = line.strip()
+            if line and len(line) > 10:
+                clean_line = line.lstrip("0123456789.-•→·)#* ").strip()
+                if clean_line and len(clean_line) > 10:
+                    insights.append(clean_text(clean_line))
+        insights = insights[:5]
+
+        # 전략 파싱 - [RETAIL], [SNS], [INTEGRATED] 태그 기반
+        strategy_raw = sub_results.get('strategy', '')
+        recommendations = []
+        current_section = None
+        section_contents = {'retail': [], 'sns': [], 'integrated': []}
+
+        for line in strategy_raw.split('\n'):
+            line = line.strip()
+            if not line or len(line) < 3:
+                continue
+
+            # 섹션 태그 감지
+            if '[RETAIL]' in line.upper() or (line.upper().startswith('RETAIL') and len(line) < 20):
+                current_section = 'retail'
+                continue
+            elif '[SNS]' in line.upper() or (line.upper().startswith('SNS') and len(line) < 15):
+                current_section = 'sns'
+                continue
+            elif '[INTEGRATED]' in line.upper() or ('통합' in line and '전략' in line) or ('연계' in line and '전략' in line):
+                current_section = 'integrated'
+                continue
+
+            # 내용 수집
+            clean_line = line.lstrip("0123456789.-•→·)#*[] ").strip()
+            if clean_line and len(clean_line) > 10 and current_section:
+                section_contents[current_section].append(clean_text(clean_line))
+            elif clean_line and len(clean_line) > 10 and not current_section:
+                # 섹션 없이 바로 내용이 오면 SNS 관련 키워드 확인
+                is_sns = any(kw in clean_line for kw in ['YouTube', '유튜브', 'Instagram', '인스타그램', 'TikTok', '틱톡', 'SNS', '콘텐츠', '인플루언서', '바이럴'])
+                is_retail = any(kw in clean_line for kw in ['Amazon', '아마존', 'Sephora', '세포라', '리테일', 'Retail', '매장', '쇼핑'])
+                if is_sns and not is_retail:
+                    section_contents['sns'].append(clean_text(clean_line))
+                elif is_retail and not is_sns:
+                    section_contents['retail'].append(clean_text(clean_line))
+                else:
+                    section_contents['integrated'].append(clean_text(clean_line))
+
+        # 섹션별로 결과 생성
+        if section_contents['retail']:
+            content = ' '.join(section_contents['retail'][:2])
+            recommendations.append(f"[RETAIL] {content}")
+        if section_contents['sns']:
+            content = ' '.join(section_contents['sns'][:2])
+            recommendations.append(f"[SNS] {content}")
+        if section_contents['integrated']:
+            content = ' '.join(section_contents['integrated'][:2])
+            recommendations.append(f"[INTEGRATED] {content}")
+
+        # 섹션이 비어있으면 원본에서 직접 추출
+        if not recommendations:
+            for line in strategy_raw.split('\n'):
+                clean_line = line.strip().lstrip("0123456789.-•→·)#*[] ").strip()
+                if clean_line and len(clean_line) > 20:
+                    recommendations.append(clean_text(clean_line))
+                    if len(recommendations) >= 3:
+                        break
+
+        # Fallback
+        if not retail_analysis or len(retail_analysis) < 20:
+            retail_analysis = f"{country_name} Retail 채널에서는 검증된 효과와 브랜드 신뢰도가 구매 결정에 중요한 역할을 합니다."
+        if not sns_analysis_text or len(sns_analysis_text) < 20:
+            sns_analysis_text = f"{country_name} SNS 채널에서는 트렌디한 성분과 비주얼이 바이럴 확산에 핵심입니다."
+        if not insights:
+            insights = [
+                f"{category} 카테고리 Retail/SNS 공통 성장 트렌드 확인",
+                "Retail에서는 기능성 성분 키워드가 상위권 유지",
+                "SNS에서는 비주얼/텍스처 관련 키워드 급상승"
+            ]
+        if not recommendations:
+            recommendations = [
+                "Retail: 검증된 효능 강조 마케팅 전략",
+                "SNS: 트렌디 성분 활용 바이럴 콘텐츠 제작",
+                "통합: Retail 후기를 SNS 콘텐츠로 재활용"
+            ]
+
+        # 요약 텍스트 생성
+        summary = f"Retail 분석: {retail_analysis[:150]}...\n\nSNS 분석: {sns_analysis_text[:150]}..."
+
+        return jsonify({
+            "success": True,
+            "summary": summary,
+            "retailAnalysis": retail_analysis,
+            "snsAnalysis": sns_analysis_text,
+            "insights": insights,
+            "recommendations": recommendations,
+            "multiQuery": True,
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in sns_analysis: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@endpoint("whitespace-product", "/api/llm/whitespace-product")
+def whitespace_product():
+    """WhiteSpace 제품 비교 AI 분석 + Agent Insight"""
+    try:
+        data = request.json
+        overseas = data.get("overseasProduct", {})
+        domestic = data.get("domesticProduct", {})
+        country = data.get("country", "usa")
+        category = data.get("category", "Skincare")
+
+        country_names = {
+            "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+            "malaysia": "말레이시아", "indonesia": "인도네시아"
+        }
+        country_name = country_names.get(country, "해외")
+
+        prompt = f"""다음은 {country_name} 인기 해외 제품과 한국 인기 제품의 비교 분석 요청입니다.
+
+[해외 제품 정보]
+- 제품명: {overseas.get('name', '')}
+- 브랜드: {overseas.get('brand', '')}
+- 카테고리: {category}
+- 가격: {overseas.get('price', '')}
+- 평점: {overseas.get('rating', '')}
+- 리뷰수: {overseas.get('reviewCount', '')}
+
+[한국 제품 정보]
+- 제품명: {domestic.get('name', '')}
+- 브랜드: {domestic.get('brand', '')}
+- 카테고리: {category}
+- 가격: {domestic.get('price', '')}
+- 평점: {domestic.get('rating', '')}
+- 리뷰수: {domestic.get('reviewCount', '')}
+
+다음 형식으로 정확히 답변해주세요:
+
+[해외제품요약]
+{overseas.get('name', '')} 제품의 특성, 강점, 소비자 선호 포인트를 3-4문장으로 요약해주세요.
+
+[한국제품요약]
+{domestic.get('name', '')} 제품의 특성, 강점, 소비자 선호 포인트를 3-4문장으로 요약해주세요.
+
+[차별화포인트]
+한국 제품에는 없고 해외 제품에만 있는 차별화된 소구 포인트를 4-5개 제시해주세요. 각 포인트는 구체적이고 실행 가능한 인사이트여야 합니다.
+
+[종합요약]
+위 차별화 포인트를 종합하여 K-뷰티 브랜드가 해외 제품의 장점을 어떻게 활용할 수 있는지 2-3문장으로 요약해주세요."""
+
+        response = generate_response(prompt, max_new_tokens=1200)
+
+        # Parse response
+        overseas_summary = ""
+        domestic_summary = ""
+        diff_points = []
+        overall_summary = ""
+        current_section = None
+        overseas_lines = []
+        domestic_lines = []
+        summary_lines = []
+
+        lines = response.split("\n")
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if any(kw in line for kw in ["[해외제품요약]", "해외제품요약:", "해외 제품 요약"]):
+                current_section = "overseas"
+                rest = re.sub(r'^\[해외\s*제품\s*요약\]|^해외\s*제품\s*요약:', '', line).strip()
+                if rest and len(rest) > 5:
+                    overseas_lines.append(rest)
+            elif any(kw in line for kw in ["[한국제품요약]", "한국제품요약:", "한국 제품 요약"]):
+                current_section = "domestic"
+                rest = re.sub(r'^\[한국\s*제품\s*요약\]|^한국\s*제품\s*요약:', '', line).strip()
+                if rest and len(rest) > 5:
+                    domestic_lines.append(rest)
+            elif any(kw in line for kw in ["[차별화포인트]", "차별화포인트:", "차별화 포인트"]):
+                current_section = "diff"
+                rest = re.sub(r'^\[차별화\s*포인트\]|^차별화\s*포인트:', '', line).strip()
+                if rest and len(rest) > 3:
+                    diff_points.append(clean_text(rest))
+            elif any(kw in line for kw in ["[종합요약]", "종합요약:", "종합 요약"]):
+                current_section = "summary"
+                rest = re.sub(r'^\[종합\s*요약\]|^종합\s*요약:', '', line).strip()
+                if rest and len(rest) > 5:
+                    summary_lines.append(rest)
+            elif current_section:
+                clean_line = line.lstrip("0123456789.-•→·)#* ").strip()
+                if clean_line and len(clean_line) > 3:
+                    if current_section == "overseas":
+                        overseas_lines.append(clean_line)
+                    elif current_section == "domestic":
+                        domestic_lines.append(clean_line)
+                    elif current_section == "diff":
+                        diff_points.append(clean_text(clean_line))
+                    elif current_section == "summary":
+                        summary_lines.append(clean_line)
+
+        overseas_summary = clean_text(" ".join(overseas_lines)) if overseas_lines else ""
+        domestic_summary = clean_text(" ".join(domestic_lines)) if domestic_lines else ""
+        overall_summary = clean_text(" ".join(summary_lines)) if summary_lines else ""
+
+        # Strip leftover section headers from content
+        def strip_headers(text):
+            return re.sub(r'^\[[\w\s]+\]\s*', '', text).strip()
+
+        overseas_summary = strip_headers(overseas_summary)
+        domestic_summary = strip_headers(domestic_summary)
+        overall_summary = strip_headers(overall_summary)
+        diff_points = [strip_headers(p) for p in diff_points if not re.match(r'^\[[\w\s]+\]$', p.strip())]
+
+        # Fallbacks
+        if not overseas_summary:
+            overseas_summary = f"{overseas.get('name', '해외 제품')}은(는) {overseas.get('brand', '')}의 대표 제품으로, {country_name} {category} 시장에서 높은 인기를 얻고 있습니다. 해외 소비자들에게 검증된 성분과 제형으로 안정적인 효과를 제공합니다."
+        if not domestic_summary:
+            domestic_summary = f"{domestic.get('name', '한국 제품')}은(는) {domestic.get('brand', '')}의 인기 제품으로, 한국 시장에서 강력한 입지를 구축하고 있습니다. 국내 소비자들의 피부 특성에 맞춘 맞춤형 포뮬레이션으로 높은 평가를 받고 있습니다."
+        if not diff_points:
+            diff_points = [
+                f"{country_name} 소비자가 선호하는 고효능 활성 성분 배합",
+                "해외 시장 특화 제형 기술 적용",
+                f"{country_name} 현지 피부 고민에 최적화된 솔루션",
+                "글로벌 클린뷰티 트렌드 반영한 성분 구성"
+            ]
+        if not overall_summary:
+            overall_summary = f"해외 제품의 차별화된 소구 포인트를 K-뷰티의 기술력과 결합하면, {country_name} 시장에서 경쟁 우위를 확보할 수 있는 기회가 있습니다."
+
+        return jsonify({
+            "success": True,
+            "overseasSummary": overseas_summary,
+            "domesticSummary": domestic_summary,
+            "agentInsight": {
+                "title": "Agent Insight: 해외 제품의 차별화 소구 포인트",
+                "points": diff_points[:5],
+                "summary": overall_summary,
+            }
+        })
+
+    except QueueFullError:
+        raise
+    except Exception as e:
+        print(f"Error in whitespace_product: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,190 @@
+"""
+멀티 엔드포인트 LLM 호스트
+- 설정 파일(llm_host.json)의 servers 목록대로 포트별 Flask 앱을 만들고 지정한 엔드포인트만 마운트
+- 같은 device를 쓰는 포트들은 모델/엔진 1개를 공유 (디바이스당 1회 로드)
+- 포트 번호/경로는 기존 llm_server_port4~7.py와 동일하므로 Node의 LLM_SERVER_PORT* 라우팅은 그대로 동작
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+from flask import Flask, request, jsonify
+from werkzeug.serving import make_server
+
+from email_notify import send_notification
+import llm_core.endpoints  # noqa: F401 - 엔드포인트 모듈 import 시 레지스트리에 등록됨
+from llm_core import rag
+from llm_core.conversation_memory import conversation_memory
+from llm_core.endpoints import chat
+from llm_core.mongo import mongo_health
+from llm_core.registry import get_endpoint
+from llm_core.response_cache import response_cache
+from llm_core.runtime import DEADLINE_ENVIRON_KEY, MODEL_NAME, PRIORITY_ENVIRON_KEY, generation_flights, load_engine
+from llm_core.scheduler import QueueFullError
+from llm_core.streaming import enable_sse_streaming
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG_PATH = os.environ.get("LLM_HOST_CONFIG", os.path.join(SERVER_DIR, "llm_host.json"))
+
+_mounted_hooks = set()
+
+
+def load_config(path: str = None) -> dict:
+    with open(path or DEFAULT_CONFIG_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _run_on_mount(spec, engine):
+    """엔드포인트 초기화 훅은 (훅, 엔진) 조합당 1번만 실행"""
+    if spec.on_mount is None:
+        return
+    key = (spec.on_mount, id(engine))
+    if key in _mounted_hooks:
+        return
+    _mounted_hooks.add(key)
+    spec.on_mount(engine)
+
+
+def queue_full_response(e: QueueFullError):
+    response = jsonify({"success": False, "error": str(e), "retryAfter": e.retry_after})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
+
+def create_app(server_cfg: dict, engine, model_name: str = MODEL_NAME) -> Flask:
+    """포트 1개에 해당하는 Flask 앱 생성"""
+    port = server_cfg["port"]
+    endpoint_names = server_cfg["endpoints"]
+
+    app = Flask(f"llm_host_{port}")
+    app.extensions["llm_engine"] = engine
+    app.config["LLM_PORT"] = port
+    app.config["LLM_ENDPOINTS"] = list(endpoint_names)
+    app.config["LLM_MODEL"] = model_name
+    priorities = {name: get_endpoint(name).priority for name in endpoint_names}
+
+    # 스케줄러 클래스/deadline 지정 + 대기열이 가득 차면 생성 전에 바로 429
+    @app.before_request
+    def admit_request():
+        priority = priorities.get(request.endpoint)
+        if priority is None:
+            return None
+        request.environ[PRIORITY_ENVIRON_KEY] = priority
+        timeout = request.headers.get("X-Request-Timeout", "")
+        if timeout:
+            try:
+                request.environ[DEADLINE_ENVIRON_KEY] = time.time() + float(timeout)
+            except ValueError:
+                pass
+        try:
+            engine.check_admission(priority)
+        except QueueFullError as e:
+            return queue_full_response(e)
+        return None
+
+    # 사전 확인 뒤에 대기열이 찬 경우, multi-stage 요청의 2번째 이후 submit → view가 다시 던진 QueueFullError
+    app.register_error_handler(QueueFullError, queue_full_response)
+
+    # 이메일 알림 - 모든 POST 요청 감지
+    @app.before_request
+    def notify_on_request():
+        if request.method == "POST" and "/api/llm/" in request.path:
+            endpoint = request.path.replace("/api/llm/", "")
+            send_notification(endpoint, f"port{port}", "AI 분석 요청")
+
+    for name in endpoint_names:
+        spec = get_endpoint(name)
+        app.add_url_rule(spec.rule, endpoint=spec.name, view_func=spec.view, methods=list(spec.methods))
+        _run_on_mount(spec, engine)
+
+    def health_check():
+        """Health check endpoint"""
+        status = {
+            "status": "ok",
+            "model": model_name,
+            "device": engine.device,
+            "port": port,
+            "endpoints": endpoint_names,
+            "batching": engine.stats(),
+            "responseCache": response_cache.stats(),
+            "singleFlight": generation_flights.stats(),
+        }
+        if "rag-insight" in endpoint_names:
+            status["ragIndex"] = rag.index_status()
+            status["ragQueryCache"] = rag.query_embedding_cache.stats()
+        if "chat-text" in endpoint_names:
+            status["mongodb"] = mongo_health()
+            status["chatContext"] = chat.dashboard_snapshot.stats()
+            status["keywordDictionary"] = chat.keyword_dictionary.stats()
+            status["conversationMemory"] = conversation_memory.stats()
+        return jsonify(status)
+
+    app.add_url_rule("/api/llm/health", endpoint="health_check", view_func=health_check, methods=["GET"])
+    app.add_url_rule("/health", endpoint="health", view_func=health_check, methods=["GET"])
+
+    # ?stream=1 / Accept: text/event-stream 요청은 SSE로 토큰 스트리밍
+    enable_sse_streaming(app)
+    return app
+
+
+def build_apps(config: dict, ports=None) -> list:
+    """설정에 따라 (포트, 앱) 목록 생성 - 모델은 디바이스별로 한 번만 로드"""
+    model_name = config.get("model", MODEL_NAME)
+    device_options = config.get("devices", {})
+
+    cache_cfg = config.get("responseCache", {})
+    response_cache.configure(
+        ttl=cache_cfg.get("ttlSeconds"),
+        max_entries=cache_cfg.get("maxEntries"),
+        disk_dir=cache_cfg.get("diskDir") or None,  # 비어 있으면 LLM_RESPONSE_CACHE_DIR 사용
+    )
+
+    apps = []
+    for server_cfg in config["servers"]:
+        if ports and server_cfg["port"] not in ports:
+            continue
+        device = server_cfg["device"]
+        options = device_options.get(device, {})
+        engine = load_engine(
+            device,
+            model_name=model_name,
+            max_retries=options.get("maxRetries", 2),
+            retry_delay=options.get("retryDelay", 2.0),
+        )
+        apps.append((server_cfg["port"], create_app(server_cfg, engine, model_name)))
+    return apps
+
+
+def serve(config: dict, ports=None, host: str = "0.0.0.0"):
+    apps = build_apps(config, ports)
+    if not apps:
+        raise SystemExit(f"No servers configured for ports: {ports}")
+
+    servers = []
+    threads = []
+    for port, app in apps:
+        server = make_server(host, port, app, threaded=True)
+        servers.append((port, server))
+        print(f"  Serving port {port}: {', '.join(app.config['LLM_ENDPOINTS'])}")
+        thread = threading.Thread(target=server.serve_forever, name=f"llm-host-{port}", daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        for _, server in servers:
+            server.shutdown()
+
+
+def main(argv=None, ports=None):
+    parser = argparse.ArgumentParser(description="AMORE CLUE multi-endpoint LLM host")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="llm_host.json 경로")
+    parser.add_argument("--ports", type=int, nargs="*", help="일부 포트만 실행 (기본: 설정의 전체 포트)")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    serve(config, ports=ports or args.ports)
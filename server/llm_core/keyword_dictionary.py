@@ -0,0 +1,114 @@
+"""
+키워드 사전 (keyword_descriptions의 keyword + koreanName → Aho-Corasick 오토마톤)
+- 질문을 한 번 훑어서 사전에 있는 키워드를 모두 찾음 (질문 단어마다 $regex 컬렉션 스캔 대신)
+  예) "스네일 뮤신이랑 retinol 같이 써도 돼?" → ["snail mucin", "retinol"]
+- 영문 키워드는 단어 경계에서만 일치 (oil ≠ toilet), 한글 이름은 조사가 붙어도 일치 (레티놀이랑)
+- 겹치면 먼저 시작하는 것, 같은 위치면 긴 것 우선 (snail mucin > snail)
+- 찾은 키워드의 설명은 {"keyword": {"$in": [...]}} 1회 조회 (keyword 인덱스 사용)
+- 사전은 ContextSnapshot으로 캐시 → LLM_CONTEXT_TTL 만료 또는 대시보드 갱신 신호(워크플로우, 키워드 설명 스크립트) 때 다시 로드
+"""
+from collections import deque
+
+DESCRIPTION_COLLECTION = "keyword_descriptions"
+MIN_PATTERN_LENGTH = 2
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class AhoCorasick:
+    """패턴(소문자) → 값, 텍스트 한 번 순회로 모든 일치 위치 반환"""
+
+    def __init__(self, patterns: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # 상태 → [(패턴 길이, 값, 패턴)]
+        for pattern, value in patterns.items():
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), value, pattern))
+
+        # BFS로 실패 링크 (가장 긴 접미사 상태) 연결
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0  # 루트의 자식은 루트로
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self.size = len(patterns)
+
+    def __len__(self):
+        return self.size
+
+    def iter_matches(self, text: str):
+        """(시작, 끝, 값, 패턴) - text는 소문자로 넘김"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value, pattern in self._out[state]:
+                yield i + 1 - length, i + 1, value, pattern
+
+
+class KeywordDictionary:
+    def __init__(self, entries):
+        """entries: [(keyword, koreanName)]"""
+        patterns = {}
+        for keyword, korean_name in entries:
+            for name in (keyword, korean_name):
+                name = " ".join(str(name or "").lower().split())
+                if len(name) >= MIN_PATTERN_LENGTH:
+                    patterns.setdefault(name, keyword)
+        self.automaton = AhoCorasick(patterns)
+
+    def __len__(self):
+        return len(self.automaton)
+
+    @classmethod
+    def load(cls, db):
+        """keyword_descriptions 전체의 keyword/koreanName으로 사전 생성"""
+        collection = db.get_collection(DESCRIPTION_COLLECTION)
+        try:
+            collection.create_index("keyword")
+        except Exception as e:
+            print(f"keyword index check failed: {e}")
+        docs = collection.find({"keyword": {"$type": "string"}}, {"keyword": 1, "koreanName": 1, "_id": 0})
+        return cls((doc["keyword"], doc.get("koreanName")) for doc in docs)
+
+    def find(self, text: str, limit: int = None) -> list:
+        """질문에 나온 키워드 (등장 순서, 중복 제거)"""
+        text = " ".join(str(text).lower().split())
+        matches = []
+        for start, end, keyword, pattern in self.automaton.iter_matches(text):
+            # 영문 패턴은 앞뒤가 영문/숫자가 아니어야 함 (단어 중간 일치 제외)
+            if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if _is_word_char(pattern[-1]) and end < len(text) and _is_word_char(text[end]):
+                continue
+            matches.append((start, -(end - start), end, keyword))
+
+        keywords, covered = [], 0
+        for start, _, end, keyword in sorted(matches):
+            if start < covered:
+                continue
+            covered = end
+            if keyword not in keywords:
+                keywords.append(keyword)
+                if limit and len(keywords) >= limit:
+                    break
+        return keywords
@@ -0,0 +1,162 @@
+"""
+RAG 키워드(BM25) 검색 + 벡터 검색 결과 융합
+- 브랜드/제품명(TIRTIR, Reedle Shot, COSRX 등)은 MiniLM 임베딩보다 단어 일치가 정확
+- text, brand, product, tags 필드로 역색인(BM25) 구축 (brand/product 가중치 2) → rag_index 디렉터리에 함께 저장
+  - bm25_terms.json (단어 → id), bm25_indptr.npy / bm25_docs.npy / bm25_tf.npy (CSR posting),
+    bm25_idf.npy, bm25_doclen.npy, manifest.json의 "bm25" 항목
+  - 인덱스 빌드(rag_build.build_incremental, rag_index.convert_json_index)가 게시 전에 함께 생성
+  - 서버는 읽기만 함: BM25가 없는 인덱스는 벡터 검색만 사용
+- 벡터 top-N과 BM25 top-N을 reciprocal rank fusion으로 합침
+
+기존 인덱스에 BM25 추가: python -m llm_core.lexical <index_dir> (현재 버전을 복사한 새 버전에 빌드 후 게시)
+"""
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+
+from llm_core.rag_index import (
+    METADATA_FILE, RagIndex, publish_index_version, restage_index_version, set_manifest_entry, top_k_rows,
+)
+
+# 필드별 가중치 (단어 빈도에 곱함) - text에도 브랜드/제품명이 있지만 이름 일치를 더 강하게
+BM25_FIELDS = {"text": 1, "brand": 2, "product": 2, "tags": 1}
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+TERMS_FILE = "bm25_terms.json"
+INDPTR_FILE = "bm25_indptr.npy"
+DOCS_FILE = "bm25_docs.npy"
+TF_FILE = "bm25_tf.npy"
+IDF_FILE = "bm25_idf.npy"
+DOCLEN_FILE = "bm25_doclen.npy"
+
+_TOKEN = re.compile(r"[a-z0-9]+|[가-힣]+")
+
+
+def tokenize(text: str) -> list:
+    """영문/숫자 단어 + 한글 2-gram (조사가 붙어도 매칭: 리들샷을 → 리들, 들샷, 샷을)"""
+    tokens = []
+    for token in _TOKEN.findall(str(text).lower()):
+        if len(token) > 2 and "가" <= token[0] <= "힣":
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def build_bm25(index_dir: str, fields=BM25_FIELDS) -> dict:
+    """metadata.jsonl을 한 줄씩 읽어 BM25 역색인 저장"""
+    terms = {}
+    postings = []  # term id -> [(row, tf)]
+    doclen = []
+    with open(os.path.join(index_dir, METADATA_FILE), "r", encoding="utf-8") as f:
+        for row, line in enumerate(f):
+            doc = json.loads(line)
+            counts = Counter()
+            for field, weight in fields.items():
+                for term in tokenize(doc.get(field, "")):
+                    counts[term] += weight
+            doclen.append(sum(counts.values()))
+            for term, tf in counts.items():
+                term_id = terms.setdefault(term, len(terms))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((row, tf))
+
+    n = len(doclen)
+    indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(p) for p in postings])
+    docs = np.fromiter((row for p in postings for row, _ in p), dtype=np.int32, count=int(indptr[-1]))
+    tf = np.fromiter((count for p in postings for _, count in p), dtype=np.float32, count=int(indptr[-1]))
+    df = np.diff(indptr).astype(np.float32)
+    idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    with open(os.path.join(index_dir, TERMS_FILE), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    np.save(os.path.join(index_dir, INDPTR_FILE), indptr)
+    np.save(os.path.join(index_dir, DOCS_FILE), docs)
+    np.save(os.path.join(index_dir, TF_FILE), tf)
+    np.save(os.path.join(index_dir, IDF_FILE), idf)
+    np.save(os.path.join(index_dir, DOCLEN_FILE), np.asarray(doclen, dtype=np.float32))
+
+    info = {"fields": dict(fields), "terms": len(terms), "avgdl": float(np.mean(doclen)) if doclen else 0.0}
+    set_manifest_entry(index_dir, "bm25", info)
+    return info
+
+
+def rebuild_bm25(index_dir: str) -> dict:
+    """게시된 인덱스에 BM25 추가/재빌드 (새 버전으로 복사 → 빌드 → 게시)"""
+    version_dir = restage_index_version(index_dir)
+    info = build_bm25(version_dir)
+    publish_index_version(index_dir, version_dir)
+    return info
+
+
+class BM25Search:
+    def __init__(self, index: RagIndex):
+        self.index = index
+        d = index.index_dir
+        with open(os.path.join(d, TERMS_FILE), "r", encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self.indptr = np.load(os.path.join(d, INDPTR_FILE))
+        self.docs = np.load(os.path.join(d, DOCS_FILE), mmap_mode="r")
+        self.tf = np.load(os.path.join(d, TF_FILE), mmap_mode="r")
+        self.idf = np.load(os.path.join(d, IDF_FILE))
+        doclen = np.load(os.path.join(d, DOCLEN_FILE))
+        avgdl = float(doclen.mean()) if len(doclen) else 1.0
+        # 문서 길이 정규화 항 미리 계산: k1 * (1 - b + b * dl / avgdl)
+        self.norm = (BM25_K1 * (1 - BM25_B + BM25_B * doclen / max(avgdl, 1e-9))).astype(np.float32)
+
+    def search(self, query_text: str, k: int, doc_types=None):
+        """BM25 상위 k개 (행 번호, 점수) - 일치 단어가 없으면 빈 결과"""
+        term_ids = {self.terms[t] for t in tokenize(query_text) if t in self.terms}
+        if not term_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = np.zeros(len(self.index), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            rows = np.asarray(self.docs[start:end])
+            tf = np.asarray(self.tf[start:end])
+            scores[rows] += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + self.norm[rows])
+
+        rows = np.flatnonzero(scores)
+        if doc_types:
+            type_ids = [self.index.types.index(t) for t in doc_types if t in self.index.types]
+            if type_ids:
+                rows = rows[np.isin(self.index.type_ids[rows], type_ids)]
+        return top_k_rows(scores, k, rows)
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K) -> list:
+    """여러 순위 목록(행 번호 배열)을 RRF 점수 순으로 합친 행 번호 목록"""
+    fused = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            row = int(row)
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused, key=lambda row: -fused[row])
+
+
+def load_bm25(index: RagIndex):
+    """BM25 검색기 (인덱스에 없거나 읽기 실패 시 None → 벡터 검색만, 인덱스 디렉터리에 쓰지 않음)"""
+    if "bm25" not in index.manifest:
+        print(f"WARNING: no BM25 index in {index.index_dir}, using vector search only "
+              f"(add with: python -m llm_core.lexical <index_dir>)")
+        return None
+    try:
+        return BM25Search(index)
+    except Exception as e:
+        print(f"WARNING: BM25 index unavailable, using vector search only: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python -m llm_core.lexical <index_dir>")
+    print(rebuild_bm25(sys.argv[1]))
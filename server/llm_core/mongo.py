@@ -0,0 +1,75 @@
+"""
+MongoDB 공용 클라이언트 (프로세스당 1개, 커넥션 풀)
+- get_mongo_client(): 처음 호출할 때 생성하고 이후 재사용 → 요청마다 TCP/TLS 핸드셰이크와 서버 선택을 반복하지 않음
+- get_db(name): 기본 DB는 MONGODB_DATABASE (amore)
+- fork 안전: 생성한 PID와 현재 PID가 다르면(fork된 자식) 부모 클라이언트를 쓰지 않고 새로 생성
+- 설정 (환경 변수, ms 단위):
+  MONGODB_URI (기본 mongodb://localhost:27017, Atlas는 mongodb+srv://...)
+  MONGODB_MAX_POOL_SIZE (20), MONGODB_MIN_POOL_SIZE (0), MONGODB_MAX_IDLE_MS (60000)
+  MONGODB_SERVER_SELECTION_MS (3000), MONGODB_CONNECT_TIMEOUT_MS (3000), MONGODB_SOCKET_TIMEOUT_MS (10000)
+  MONGODB_HEARTBEAT_MS (10000): 드라이버가 백그라운드에서 서버 상태를 확인하는 주기
+- mongo_health(): ping 지연시간 + 풀 설정 (health 엔드포인트용)
+- 로컬 mongod(mongodb://localhost:27017)로도 그대로 동작
+"""
+import os
+import threading
+import time
+
+from pymongo import MongoClient
+
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+MONGODB_DATABASE = os.environ.get("MONGODB_DATABASE", "amore")
+
+POOL_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("MONGODB_MAX_POOL_SIZE", "20")),
+    "minPoolSize": int(os.environ.get("MONGODB_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.environ.get("MONGODB_MAX_IDLE_MS", "60000")),
+    "serverSelectionTimeoutMS": int(os.environ.get("MONGODB_SERVER_SELECTION_MS", "3000")),
+    "connectTimeoutMS": int(os.environ.get("MONGODB_CONNECT_TIMEOUT_MS", "3000")),
+    "socketTimeoutMS": int(os.environ.get("MONGODB_SOCKET_TIMEOUT_MS", "10000")),
+    "heartbeatFrequencyMS": int(os.environ.get("MONGODB_HEARTBEAT_MS", "10000")),
+}
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+
+def get_mongo_client(uri: str = None) -> MongoClient:
+    """프로세스 공용 MongoClient (lazy, fork 후 자식은 새로 생성)"""
+    global _client, _client_pid
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid:
+        return client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            # fork된 자식에서는 부모의 소켓/모니터 스레드를 물려받은 클라이언트를 닫지 않고 버림
+            _client = MongoClient(uri or MONGODB_URI, connect=False, appname=f"amore-clue-{pid}", **POOL_OPTIONS)
+            _client_pid = pid
+        return _client
+
+
+def get_db(name: str = None):
+    return get_mongo_client()[name or MONGODB_DATABASE]
+
+
+def mongo_health() -> dict:
+    """ping으로 연결 확인 (실패해도 예외 대신 상태로 반환)"""
+    start = time.perf_counter()
+    try:
+        get_mongo_client().admin.command("ping")
+        return {"status": "connected", "pingMs": round((time.perf_counter() - start) * 1000, 1),
+                "maxPoolSize": POOL_OPTIONS["maxPoolSize"]}
+    except Exception as e:
+        return {"status": "disconnected", "error": str(e)}
+
+
+def close_mongo_client():
+    """종료 시 정리 (같은 프로세스에서 만든 클라이언트만)"""
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
@@ -0,0 +1,97 @@
+"""
+정적 프롬프트 prefix KV cache
+- SYSTEM_PROMPT / CHAT_SYSTEM_PROMPT 및 엔드포인트 공통 프레임워크 블록의 past_key_values를 미리 계산해 보관
+- prefill 시 프롬프트 토큰과 가장 길게 일치하는 prefix의 KV를 재사용하고 나머지 토큰만 인코딩
+- 최대 LLM_PREFIX_CACHE_MAX개(기본 8) 보관, 넘으면 가장 오래 안 쓴 prefix부터 삭제 (같은 이름으로 다시 등록하면 교체)
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import torch
+
+# chat template 안에서 user content가 시작되는 위치를 찾기 위한 표식
+PREFIX_SENTINEL = "<<<AMORE_PREFIX_END>>>"
+MIN_MATCH_TOKENS = 16  # 이보다 짧게 일치하면 재사용하지 않음
+MAX_ENTRIES = int(os.environ.get("LLM_PREFIX_CACHE_MAX", "8"))
+
+
+@dataclass(eq=False)
+class _PrefixEntry:
+    name: str
+    ids: torch.Tensor  # (L,) on device
+    kv: tuple  # ((k, v), ...) 각 텐서 (1, H, L, D)
+
+
+def render_prefix_text(tokenizer, system_prompt: str, user_prefix: str = "") -> str:
+    """system + (user content 앞부분)까지의 chat template 텍스트 생성"""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prefix + PREFIX_SENTINEL},
+    ]
+    text = tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    return text.split(PREFIX_SENTINEL, 1)[0]
+
+
+class PrefixCache:
+    """이름별 prefix KV 저장소 + 최장 일치 prefix 검색"""
+
+    def __init__(self, min_match_tokens: int = MIN_MATCH_TOKENS, max_entries: int = MAX_ENTRIES):
+        self.min_match_tokens = min_match_tokens
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # name → _PrefixEntry (오래 안 쓴 순)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+        self.evictions = 0
+
+    def add(self, name: str, ids: torch.Tensor, kv: tuple):
+        with self._lock:
+            self._entries.pop(name, None)
+            self._entries[name] = _PrefixEntry(name=name, ids=ids.view(-1), kv=kv)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, prompt_ids: torch.Tensor):
+        """프롬프트와 가장 길게 일치하는 prefix의 (일치 길이, KV) 반환. 없으면 (0, None)"""
+        prompt = prompt_ids.view(-1)
+        # 마지막 토큰은 logits 계산을 위해 항상 새로 인코딩
+        limit = prompt.shape[0] - 1
+
+        best_len, best_entry = 0, None
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            n = min(entry.ids.shape[0], limit)
+            if n <= best_len:
+                continue
+            mismatch = (entry.ids[:n] != prompt[:n]).nonzero()
+            matched = int(mismatch[0]) if mismatch.numel() else n
+            if matched > best_len:
+                best_len, best_entry = matched, entry
+
+        if best_entry is None or best_len < self.min_match_tokens:
+            self.misses += 1
+            return 0, None
+
+        self.hits += 1
+        self.reused_tokens += best_len
+        with self._lock:
+            if best_entry.name in self._entries:
+                self._entries.move_to_end(best_entry.name)
+        kv = tuple((k[:, :, :best_len, :], v[:, :, :best_len, :]) for k, v in best_entry.kv)
+        return best_len, kv
+
+    def stats(self) -> dict:
+        with self._lock:
+            prefixes = {name: int(entry.ids.shape[0]) for name, entry in self._entries.items()}
+        return {
+            "prefixes": prefixes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reusedTokens": self.reused_tokens,
+            "evictions": self.evictions,
+        }
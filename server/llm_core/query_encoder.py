@@ -0,0 +1,157 @@
+"""
+RAG 쿼리 임베딩 인코더 (CPU)
+- torch: 기존과 동일한 fp32 PyTorch (기본)
+- int8: torch dynamic quantization (Linear 레이어 int8, 추가 의존성 없음)
+- onnx: ONNX Runtime 세션 (onnxruntime 필요, LLM_RAG_ONNX_PATH 또는 기본 경로의 export 결과 사용)
+- 선택: LLM_RAG_ENCODER=torch|int8|onnx, 스레드 수: LLM_RAG_ENCODER_THREADS
+- 쿼리는 짧으므로 max_length를 128로 제한 (문서 임베딩은 빌드 스크립트에서 512)
+- get_query_encoder: 모델별로 프로세스에 1개만 로드 (RAG 검색과 conversation_memory가 공유)
+
+export: python -m llm_core.query_encoder export [out.onnx] [--no-quantize]
+검증: python scripts/validate_query_encoder.py (fp32 대비 cosine 일치도), pytest tests/test_query_encoder.py (모델이 로컬 캐시에 있을 때)
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_ONNX_PATH = os.path.join(SERVER_DIR, "rag_data", "query_encoder.onnx")
+
+ENCODER_BACKEND = os.environ.get("LLM_RAG_ENCODER", "torch")
+ENCODER_THREADS = int(os.environ.get("LLM_RAG_ENCODER_THREADS", "0"))  # 0이면 라이브러리 기본값
+ONNX_PATH = os.environ.get("LLM_RAG_ONNX_PATH", DEFAULT_ONNX_PATH)
+QUERY_MAX_LENGTH = 128
+
+# int8/ONNX 인코더가 fp32 torch 기준과 만족해야 하는 최소 cosine (scripts/validate_query_encoder.py, tests/test_query_encoder.py)
+AGREEMENT_THRESHOLD = 0.99
+# rag-insight 쿼리 형태 (keyword + category + country + topKeywords)
+VALIDATION_QUERIES = [
+    "레티놀 Skincare usa 레티놀 세럼 나이아신아마이드",
+    "시카 크림 Skincare japan 진정 민감성",
+    "쿠션 파운데이션 Makeup singapore 커버력 지속력",
+    "립 틴트 Makeup japan 글로시 MLBB",
+    "두피 케어 샴푸 Hair usa 탈모 비오틴",
+    "선크림 Skincare malaysia 톤업 무기자차",
+    "히알루론산 앰플 Skincare indonesia 보습 수분",
+    "일본 시장에서 VT 리들샷 마케팅",
+]
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def mean_pooling(token_embeddings, attention_mask):
+    """Mean pooling (numpy) 후 L2 정규화"""
+    mask = attention_mask[..., None].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+class TorchQueryEncoder:
+    """PyTorch 인코더 (quantize=True면 dynamic int8)"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, quantize: bool = False, threads: int = ENCODER_THREADS):
+        self.name = "int8" if quantize else "torch"
+        self.model_name = model_name
+        if threads:
+            # torch 스레드 수는 프로세스 전역 설정 (LLM 생성은 GPU라 영향 적음)
+            torch.set_num_threads(threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+        model.eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def encode_batch(self, texts: list) -> np.ndarray:
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=QUERY_MAX_LENGTH, return_tensors="pt")
+        with torch.inference_mode():
+            output = self.model(**encoded)
+        return mean_pooling(output[0].float().numpy(), encoded["attention_mask"].numpy())
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.encode_batch([text])[0]
+
+
+class OnnxQueryEncoder:
+    """ONNX Runtime 인코더 (export_onnx로 만든 모델)"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, onnx_path: str = ONNX_PATH, threads: int = ENCODER_THREADS):
+        import onnxruntime as ort
+
+        self.name = "onnx"
+        self.model_name = model_name
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    def encode_batch(self, texts: list) -> np.ndarray:
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=QUERY_MAX_LENGTH, return_tensors="np")
+        feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+        return mean_pooling(token_embeddings, encoded["attention_mask"])
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.encode_batch([text])[0]
+
+
+def export_onnx(model_name: str = DEFAULT_MODEL_NAME, out_path: str = DEFAULT_ONNX_PATH, quantize: bool = True) -> str:
+    """HF 인코더 → ONNX (quantize=True면 onnxruntime dynamic int8)"""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    sample = tokenizer(["쿼리 예시 query"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    fp32_path = os.path.splitext(out_path)[0] + ".fp32.onnx" if quantize else out_path
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        model, tuple(sample[name] for name in input_names), fp32_path,
+        input_names=input_names, output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes, opset_version=17,
+    )
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(fp32_path, out_path, weight_type=QuantType.QInt8)
+    return out_path
+
+
+def load_query_encoder(model_name: str = DEFAULT_MODEL_NAME, backend: str = ENCODER_BACKEND):
+    """설정된 인코더 로드 (실패 시 fp32 torch로)"""
+    try:
+        if backend == "onnx":
+            return OnnxQueryEncoder(model_name)
+        if backend == "int8":
+            return TorchQueryEncoder(model_name, quantize=True)
+    except Exception as e:
+        print(f"WARNING: query encoder '{backend}' unavailable, using fp32 torch: {e}")
+    return TorchQueryEncoder(model_name)
+
+
+def get_query_encoder(model_name: str = DEFAULT_MODEL_NAME):
+    """프로세스 공용 인코더 (모델별 1회 로드)"""
+    with _encoders_lock:
+        if model_name not in _encoders:
+            _encoders[model_name] = load_query_encoder(model_name)
+        return _encoders[model_name]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "export":
+        raise SystemExit("usage: python -m llm_core.query_encoder export [out.onnx] [--no-quantize]")
+    args = [a for a in sys.argv[2:] if not a.startswith("--")]
+    path = export_onnx(out_path=args[0] if args else DEFAULT_ONNX_PATH, quantize="--no-quantize" not in sys.argv)
+    print(f"ONNX query encoder written: {path}")
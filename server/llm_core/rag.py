@@ -0,0 +1,274 @@
+"""
+RAG 검색 (마케팅 사례 + 시장 신호 임베딩)
+- llm_server_port7.py에 있던 임베딩 로드/검색 로직을 호스트 공용 모듈로 분리
+- 인덱스는 rag-insight 엔드포인트가 마운트될 때 load_rag_index()로 로드
+- 인덱스는 rag_data/rag_index/ (rag_index.py 포맷, 임베딩 mmap + 메타데이터 행 단위 읽기)
+  없고 기존 rag_embeddings.json만 있으면 처음 로드할 때 1회 변환
+- 검색은 인덱스에 빌드된 ANN 백엔드(ann.py: exact/ivf/hnsw)로 수행
+- 쿼리 임베딩은 정규화한 쿼리 문자열 기준 LRU 캐시 (반복 쿼리는 인코더 실행 생략)
+- 여러 쿼리는 search_rag_batch: 캐시에 없는 쿼리만 패딩 배치 1회로 인코딩, exact 검색은 행렬곱 1회
+- 쿼리 인코더는 query_encoder.py (fp32 torch / int8 / ONNX Runtime, LLM_RAG_ENCODER), conversation_memory와 같은 인스턴스 공유
+- 벡터 검색 + BM25 키워드 검색(lexical.py)을 RRF로 융합 (브랜드/제품명 매칭 보완, LLM_RAG_HYBRID=0이면 벡터만)
+- 핫 리로드: rag_index 링크가 새 버전(rag_index.<version>/)을 가리키면 백그라운드에서 열어 교체
+  - 감시 주기 LLM_RAG_RELOAD_INTERVAL초 (기본 30, 0이면 감시 안 함), 즉시 교체는 POST /api/llm/rag-reload (로컬 또는 X-Admin-Token)
+  - 인덱스/ANN/BM25를 한 세대(RagGeneration)로 묶어 참조 하나만 교체 → 검색 중인 요청은 이전 세대를 끝까지 사용
+  - 현재 버전은 /api/llm/health의 ragIndex
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from llm_core.ann import load_ann, search_many
+from llm_core.lexical import load_bm25, reciprocal_rank_fusion
+from llm_core.query_encoder import DEFAULT_MODEL_NAME, get_query_encoder
+from llm_core.rag_index import RagIndex, convert_json_index, index_exists
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAG_INDEX_DIR = os.path.join(SERVER_DIR, 'rag_data', 'rag_index')
+LEGACY_JSON_PATH = os.path.join(SERVER_DIR, 'rag_data', 'rag_embeddings.json')
+QUERY_CACHE_SIZE = int(os.environ.get("LLM_RAG_QUERY_CACHE_SIZE", "1024"))
+HYBRID_SEARCH = os.environ.get("LLM_RAG_HYBRID", "1") != "0"
+HYBRID_CANDIDATES = 20  # 융합 전 벡터/BM25 각각 가져올 후보 수
+RELOAD_INTERVAL = float(os.environ.get("LLM_RAG_RELOAD_INTERVAL", "30"))
+
+# insight_type별 검색 설정
+# - doc_types: 검색 대상 문서 type (없으면 전체 문서)
+# - nprobe / ef: ANN 탐색 폭 (ivf / hnsw, 클수록 정확하고 느림)
+INSIGHT_SEARCH = {
+    "marketing": {"doc_types": ("marketing_case",), "nprobe": 8, "ef": 64},
+    "npd": {"doc_types": None, "nprobe": 8, "ef": 64},
+    "overseas": {"doc_types": None, "nprobe": 16, "ef": 128},
+}
+DEFAULT_SEARCH = {"doc_types": None, "nprobe": 8, "ef": 64}
+
+RAG_AVAILABLE = False
+live = None  # 현재 RagGeneration
+query_encoder = None
+_reload_lock = threading.Lock()
+_watcher = None
+
+
+class RagGeneration:
+    """한 버전의 인덱스 + 검색기 (열린 뒤에는 바뀌지 않음)"""
+
+    def __init__(self, index_dir: str):
+        # 링크를 풀어서 열어야 이후 링크가 바뀌어도 이 세대는 같은 파일을 봄
+        self.path = os.path.realpath(index_dir)
+        self.index = RagIndex(self.path)
+        self.search = load_ann(self.index)
+        self.lexical = load_bm25(self.index) if HYBRID_SEARCH else None
+        self.version = self.index.manifest.get("version") or os.path.basename(self.path)
+        self.loaded_at = time.time()
+
+    def status(self) -> dict:
+        return {
+            "version": self.version,
+            "documents": len(self.index),
+            "search": self.search.name + ("+bm25" if self.lexical else ""),
+            "loadedAt": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+        }
+
+
+class QueryEmbeddingCache:
+    """정규화된 쿼리 문자열 → 단위 벡터 LRU"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query_text: str) -> str:
+        return " ".join(str(query_text).split())
+
+    def get(self, key: str):
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding):
+        embedding.flags.writeable = False  # 캐시된 벡터를 호출 측에서 수정하지 못하게
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+def get_query_embeddings(query_texts) -> np.ndarray:
+    """여러 쿼리 텍스트의 임베딩 (B, D) - 캐시에 없는 쿼리만 한 번의 배치로 인코딩"""
+    keys = [query_embedding_cache.normalize(text) for text in query_texts]
+    found = {}
+    for key in keys:
+        if key not in found:
+            found[key] = query_embedding_cache.get(key)
+
+    missing = [key for key, embedding in found.items() if embedding is None]
+    if missing:
+        for key, embedding in zip(missing, query_encoder.encode_batch(missing)):
+            embedding = np.asarray(embedding, dtype=np.float32)
+            query_embedding_cache.put(key, embedding)
+            found[key] = embedding
+    return np.stack([found[key] for key in keys])
+
+
+def get_query_embedding(query_text):
+    """쿼리 텍스트의 임베딩 생성"""
+    if query_encoder is None:
+        return None
+    return get_query_embeddings([query_text])[0]
+
+
+def _result_dict(doc: dict, similarity) -> dict:
+    return {
+        'id': doc['id'],
+        'type': doc['type'],
+        'country': doc.get('country', ''),
+        'brand': doc.get('brand', ''),
+        'product': doc.get('product', ''),
+        'category': doc.get('category', ''),
+        'text': doc.get('text', ''),
+        'similarity': float(similarity),
+        # 마케팅 사례 추가 정보
+        'why_it_worked': doc.get('why_it_worked', ''),
+        'evidence_snippet': doc.get('evidence_snippet', ''),
+        'key_message': doc.get('key_message', ''),
+        'channel': doc.get('channel', ''),
+        # 시장 신호 추가 정보
+        'signal_type': doc.get('signal_type', ''),
+        'signal_strength': doc.get('signal_strength', ''),
+        'evidence_summary': doc.get('evidence_summary', ''),
+    }
+
+
+def search_rag_batch(queries) -> list:
+    """여러 RAG 검색을 한 번에 - queries: [{"query", "type", "topK"}] → 쿼리별 결과 목록"""
+    generation = live  # 요청 중 리로드되어도 같은 세대로 끝까지 검색
+    if not RAG_AVAILABLE or generation is None or query_encoder is None or not queries:
+        return [[] for _ in queries]
+
+    texts = [str(q.get("query", "")) for q in queries]
+    top_ks = [int(q.get("topK", 3)) for q in queries]
+    # insight_type별 필터: marketing은 marketing_case, npd/overseas는 둘 다
+    options_list = [INSIGHT_SEARCH.get(q.get("type", "marketing"), DEFAULT_SEARCH) for q in queries]
+    embeddings = get_query_embeddings(texts)
+
+    # 하이브리드면 벡터/BM25 후보를 넉넉히 가져와 RRF로 합친 뒤 similarity는 코사인 값으로 표시
+    fetch = [max(k, HYBRID_CANDIDATES) if generation.lexical is not None else k for k in top_ks]
+    hits = search_many(generation.search, embeddings, fetch, options_list)
+
+    results = []
+    for i, (rows, similarities) in enumerate(hits):
+        if generation.lexical is not None:
+            lexical_rows, _ = generation.lexical.search(texts[i], fetch[i], doc_types=options_list[i]["doc_types"])
+            rows = reciprocal_rank_fusion([rows, lexical_rows])[:top_ks[i]]
+            similarities = generation.index.scores_for(rows, embeddings[i])
+        # 상위 K개 문서 메타데이터만 읽음
+        results.append([_result_dict(generation.index.document(row), sim) for row, sim in zip(rows, similarities)])
+    return results
+
+
+def search_rag(query_text, insight_type="marketing", top_k=3):
+    """RAG 검색 - 유사한 문서 반환"""
+    return search_rag_batch([{"query": query_text, "type": insight_type, "topK": top_k}])[0]
+
+
+def reload_rag_index(index_dir: str = RAG_INDEX_DIR, force: bool = False) -> dict:
+    """index_dir이 가리키는 버전이 바뀌었으면 새 세대를 열어 교체 (열기는 락 안에서, 검색은 막지 않음)"""
+    global RAG_AVAILABLE, live, query_encoder
+
+    with _reload_lock:
+        current = live
+        if not index_exists(index_dir):
+            return {"reloaded": False, "version": current.version if current else None, "error": "index not found"}
+        if current is not None and not force and os.path.realpath(index_dir) == current.path:
+            return {"reloaded": False, "version": current.version}
+
+        generation = RagGeneration(index_dir)
+        model_name = generation.index.model or DEFAULT_MODEL_NAME
+        if query_encoder is None or query_encoder.model_name != model_name:
+            # 임베딩 모델이 바뀐 경우만 인코더 교체 + 캐시된 쿼리 벡터 폐기
+            query_encoder = get_query_encoder(model_name)
+            query_embedding_cache.clear()
+
+        live = generation  # 참조 교체 (이전 세대는 사용 중인 요청이 끝나면 GC)
+        RAG_AVAILABLE = True
+        print(f"RAG index {'reloaded' if current else 'loaded'}: version {generation.version}, "
+              f"{len(generation.index)} documents, {generation.index.dimension}D "
+              f"({generation.index.embeddings.dtype}, mmap, {generation.status()['search']} search, {query_encoder.name} encoder)")
+        return {"reloaded": True, "version": generation.version, "previousVersion": current.version if current else None}
+
+
+def _watch_index(index_dir: str, interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            current = live
+            if index_exists(index_dir) and (current is None or os.path.realpath(index_dir) != current.path):
+                reload_rag_index(index_dir)
+        except Exception as e:
+            print(f"WARNING: RAG index reload failed: {e}")
+
+
+def start_index_watcher(index_dir: str = RAG_INDEX_DIR, interval: float = RELOAD_INTERVAL):
+    """rag_index 링크 변경 감시 스레드 (프로세스당 1개)"""
+    global _watcher
+    if interval <= 0 or _watcher is not None:
+        return
+    _watcher = threading.Thread(target=_watch_index, args=(index_dir, interval), name="rag-index-watcher", daemon=True)
+    _watcher.start()
+
+
+def index_status() -> dict:
+    generation = live
+    if generation is None:
+        return {"version": None}
+    return generation.status()
+
+
+def load_rag_index(index_dir: str = RAG_INDEX_DIR) -> bool:
+    """RAG 인덱스/쿼리 인코더 로드 (rag-insight 최초 마운트 시 1회) + 새 버전 감시 시작"""
+    if RAG_AVAILABLE:
+        return True
+
+    print(f"Loading RAG index from: {index_dir}")
+    try:
+        if not index_exists(index_dir) and os.path.exists(LEGACY_JSON_PATH):
+            print(f"Converting legacy RAG embeddings: {LEGACY_JSON_PATH}")
+            convert_json_index(LEGACY_JSON_PATH, index_dir)
+
+        if index_exists(index_dir):
+            reload_rag_index(index_dir)
+        else:
+            print(f"WARNING: RAG index not found: {index_dir}")
+    except Exception as e:
+        print(f"WARNING: RAG not available: {e}")
+    # 시작 시 인덱스가 없거나 실패해도 새 버전이 게시되면 감시 스레드가 로드
+    start_index_watcher(index_dir)
+    return RAG_AVAILABLE
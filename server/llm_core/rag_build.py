@@ -0,0 +1,109 @@
+"""
+RAG 인덱스 증분 빌드
+- 문서 텍스트(+임베딩 모델)의 sha256(content_hash)이 기존 인덱스에 있으면 저장된 벡터 재사용
+- 새 문서/수정된 문서만 모아서 배치 임베딩 → 스프레드시트 몇 줄 수정 시 재빌드가 수 초
+- 원본 엑셀 파일 해시를 manifest "sources"에 기록 → 변경이 없으면 엑셀 파싱/모델 로드 없이 종료
+- 새 버전 디렉터리에 임베딩/ANN/BM25를 모두 쓴 뒤 rag_index 링크를 원자적으로 교체
+  (서버는 빌드 중인 인덱스를 보지 않음)
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from llm_core.ann import build_ann
+from llm_core.lexical import build_bm25
+from llm_core.rag_index import (
+    MANIFEST_FILE, METADATA_FILE, RagIndex, content_hash, index_exists,
+    publish_index_version, stage_index_version, version_of, write_rag_index,
+)
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_digests(paths) -> dict:
+    """원본 파일명 → sha256"""
+    return {os.path.basename(path): file_digest(path) for path in paths}
+
+
+def sources_unchanged(index_dir: str, paths, model: str) -> bool:
+    """현재 인덱스가 같은 모델 + 같은 원본 파일로 빌드됐는지"""
+    if not index_exists(index_dir):
+        return False
+    with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest.get("model") == model and manifest.get("sources") == source_digests(paths)
+
+
+def previous_embeddings(index_dir: str, model: str, dtype: str, wanted: set) -> dict:
+    """기존 인덱스에서 wanted 해시에 해당하는 벡터 (모델/dtype이 다르면 재사용 안 함)"""
+    if not index_exists(index_dir):
+        return {}
+    index = RagIndex(index_dir)
+    try:
+        if index.model != model or index.manifest.get("dtype") != dtype:
+            return {}
+        rows = {}
+        with open(os.path.join(index_dir, METADATA_FILE), "r", encoding="utf-8") as f:
+            for row, line in enumerate(f):
+                doc = json.loads(line)
+                # content_hash가 없는 이전 포맷은 text로 계산
+                h = doc.get("content_hash") or content_hash(doc.get("text", ""), model)
+                if h in wanted and h not in rows:
+                    rows[h] = row
+        if not rows:
+            return {}
+        order = sorted(rows.values())
+        vectors = np.asarray(index.embeddings[order], dtype=np.float32)
+        by_row = dict(zip(order, vectors))
+        return {h: by_row[row] for h, row in rows.items()}
+    finally:
+        index.close()
+
+
+def build_incremental(index_dir: str, records: list, embed_fn, model: str, dtype: str = "float16",
+                      ann_backend: str = "ivf", sources: dict = None) -> dict:
+    """records(각각 "text" 포함)로 새 인덱스 버전 빌드 후 게시
+
+    embed_fn(texts) → (len(texts), D) 정규화 임베딩. 바뀐 문서가 없으면 호출하지 않음.
+    """
+    if not records:
+        raise ValueError("no documents to index")
+    hashes = [content_hash(record.get("text", ""), model) for record in records]
+    reused = previous_embeddings(index_dir, model, dtype, set(hashes))
+
+    missing = list(dict.fromkeys(h for h in hashes if h not in reused))
+    missing_set = set(missing)
+    if missing:
+        text_by_hash = {h: record.get("text", "") for h, record in zip(hashes, records)}
+        vectors = np.asarray(embed_fn([text_by_hash[h] for h in missing]), dtype=np.float32)
+        reused.update(zip(missing, vectors))
+
+    for record, h in zip(records, hashes):
+        record["content_hash"] = h
+    embeddings = np.stack([reused[h] for h in hashes])
+
+    version_dir = stage_index_version(index_dir)
+    extra = {"version": version_of(version_dir)}
+    if sources is not None:
+        extra["sources"] = sources
+    write_rag_index(version_dir, records, embeddings, model, dtype, extra=extra)
+    ann_info = build_ann(version_dir, ann_backend)
+    bm25_info = build_bm25(version_dir)
+    publish_index_version(index_dir, version_dir)
+
+    return {
+        "version": extra["version"],
+        "total": len(records),
+        "reused": sum(1 for h in hashes if h not in missing_set),
+        "embedded": len(missing),
+        "ann": ann_info,
+        "bm25": bm25_info,
+    }
@@ -0,0 +1,263 @@
+"""
+RAG 벡터 인덱스 디스크 포맷
+- rag_data/rag_index/ 디렉터리 하나가 인덱스 1개
+  - manifest.json: model, dimension, dtype, total_documents, types
+  - embeddings.npy: (N, D) float16/float32 행렬 → np.load(mmap_mode="r")로 열어 필요한 페이지만 읽음
+  - type_ids.npy: 문서별 type 번호 (manifest types의 인덱스)
+  - metadata.jsonl + metadata_offsets.npy: 임베딩을 뺀 문서 메타데이터, 행 번호로 해당 줄만 읽음
+    (content_hash: 텍스트+모델 해시 → 증분 빌드 시 임베딩 재사용, llm_core.rag_build)
+- type별 행 번호 배열은 열 때 1회 계산 → 검색은 numpy 벡터 연산 + argpartition top-k
+- 서버 시작 시 JSON 파싱/배열 변환이 없으므로 문서 수가 늘어도 시작 시간과 RSS가 거의 일정
+- 배포는 버전 디렉터리(rag_index.<version>/)에 쓴 뒤 rag_index 심볼릭 링크를 원자적으로 교체
+  (서버가 읽는 중인 이전 버전은 KEEP_VERSIONS개까지 남겨 둠)
+  - 게시된 버전 디렉터리는 읽기 전용: ANN/BM25만 다시 만들 때도 restage_index_version()으로 복사한 새 버전에 빌드
+  - manifest.json은 임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 이전/새 내용 중 하나만 봄)
+
+기존 rag_embeddings.json 변환:
+    python -m llm_core.rag_index rag_data/rag_embeddings.json rag_data/rag_index
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+TYPE_IDS_FILE = "type_ids.npy"
+METADATA_FILE = "metadata.jsonl"
+OFFSETS_FILE = "metadata_offsets.npy"
+
+KEEP_VERSIONS = 3
+
+# 유사도 계산 시 한 번에 float32로 올리는 행 수 (float16 인덱스의 임시 메모리 상한)
+SCORE_CHUNK_ROWS = 8192
+
+
+def _json_default(value):
+    """pandas/numpy 스칼라 → 파이썬 기본 타입"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def content_hash(text: str, model: str = "") -> str:
+    """임베딩 재사용 판단용 해시 (문서 텍스트 + 임베딩 모델)"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def write_rag_index(index_dir: str, records: list, embeddings, model: str, dtype: str = "float16",
+                    extra: dict = None) -> str:
+    """문서 메타데이터(records)와 임베딩 행렬을 인덱스 디렉터리로 저장 (extra는 manifest에 추가)"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or embeddings.shape[0] != len(records):
+        raise ValueError(f"embeddings shape {embeddings.shape} does not match {len(records)} records")
+
+    os.makedirs(index_dir, exist_ok=True)
+    types = sorted({record.get("type", "") for record in records})
+    type_index = {name: i for i, name in enumerate(types)}
+
+    offsets = [0]
+    with open(os.path.join(index_dir, METADATA_FILE), "wb") as f:
+        for record in records:
+            meta = {k: v for k, v in record.items() if k != "embedding"}
+            line = json.dumps(meta, ensure_ascii=False, default=_json_default).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    np.save(os.path.join(index_dir, OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+    np.save(os.path.join(index_dir, TYPE_IDS_FILE),
+            np.asarray([type_index[record.get("type", "")] for record in records], dtype=np.int16))
+    np.save(os.path.join(index_dir, EMBEDDINGS_FILE), embeddings.astype(dtype))
+
+    write_manifest(index_dir, {
+        "model": model,
+        "dimension": int(embeddings.shape[1]),
+        "dtype": dtype,
+        "total_documents": len(records),
+        "types": types,
+        **(extra or {}),
+    })
+    return index_dir
+
+
+def read_manifest(index_dir: str) -> dict:
+    with open(os.path.join(index_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(index_dir: str, manifest: dict):
+    """manifest.json 원자적 교체 (임시 파일 → os.replace)"""
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def set_manifest_entry(index_dir: str, key: str, value):
+    """manifest의 항목 하나 추가/교체 (ANN, BM25 빌드 정보)"""
+    manifest = read_manifest(index_dir)
+    manifest[key] = value
+    write_manifest(index_dir, manifest)
+
+
+def stage_index_version(index_dir: str) -> str:
+    """새 버전을 쓸 디렉터리 (rag_index.<version>) - publish 전까지 서버는 보지 않음"""
+    version = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    path = f"{index_dir}.{version}"
+    os.makedirs(path)
+    return path
+
+
+def restage_index_version(index_dir: str) -> str:
+    """게시된 현재 버전을 새 버전 디렉터리로 복사 (ANN/BM25만 다시 빌드할 때, 서버가 읽는 파일은 그대로 둠)"""
+    source = os.path.realpath(index_dir)
+    version_dir = stage_index_version(index_dir)
+    for name in os.listdir(source):
+        path = os.path.join(source, name)
+        if os.path.isfile(path):
+            shutil.copy2(path, version_dir)
+    set_manifest_entry(version_dir, "version", version_of(version_dir))
+    return version_dir
+
+
+def version_of(version_dir: str) -> str:
+    """rag_index.20260101-120000-123 → 20260101-120000-123"""
+    return os.path.basename(version_dir).rsplit(".", 1)[-1]
+
+
+def publish_index_version(index_dir: str, version_dir: str, keep: int = KEEP_VERSIONS) -> str:
+    """index_dir 심볼릭 링크를 version_dir로 원자적으로 교체하고 오래된 버전 정리"""
+    if os.path.isdir(index_dir) and not os.path.islink(index_dir):
+        # 버전 관리 이전의 일반 디렉터리는 한 번만 옆으로 옮김
+        legacy = f"{index_dir}.legacy"
+        shutil.rmtree(legacy, ignore_errors=True)
+        os.rename(index_dir, legacy)
+
+    tmp_link = f"{index_dir}.link-{os.getpid()}"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.basename(version_dir), tmp_link)
+    os.replace(tmp_link, index_dir)
+
+    parent, prefix = os.path.dirname(os.path.abspath(index_dir)), os.path.basename(index_dir) + "."
+    versions = sorted(
+        name for name in os.listdir(parent)
+        if name.startswith(prefix) and name[len(prefix):][:1].isdigit()
+        and os.path.isdir(os.path.join(parent, name)) and not os.path.islink(os.path.join(parent, name))
+    )
+    # 현재 버전 + 최근 keep-1개만 남김 (이전 버전을 mmap 중인 서버가 reload할 시간)
+    older = [name for name in versions if name != os.path.basename(version_dir)]
+    for name in older[:max(0, len(older) - (keep - 1))]:
+        shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    return version_dir
+
+
+def convert_json_index(json_path: str, index_dir: str, dtype: str = "float16") -> str:
+    """기존 rag_embeddings.json → 인덱스 디렉터리 (1회 마이그레이션용)"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    documents = data["documents"]
+    model = data.get("model", "")
+    embeddings = np.asarray([doc["embedding"] for doc in documents], dtype=np.float32)
+    for doc in documents:
+        doc["content_hash"] = content_hash(doc.get("text", ""), model)
+    from llm_core.lexical import build_bm25  # lexical이 이 모듈을 import
+
+    version_dir = stage_index_version(index_dir)
+    write_rag_index(version_dir, documents, embeddings, model, dtype, extra={"version": version_of(version_dir)})
+    build_bm25(version_dir)
+    return publish_index_version(index_dir, version_dir)
+
+
+def top_k_rows(scores: np.ndarray, k: int, rows: np.ndarray = None):
+    """점수 상위 k개의 (행 번호, 점수) - 전체 정렬 대신 argpartition (O(n))"""
+    candidates = scores if rows is None else scores[rows]
+    k = min(k, len(candidates))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    part = np.argpartition(-candidates, k - 1)[:k]
+    order = part[np.argsort(-candidates[part], kind="stable")]
+    winners = order if rows is None else rows[order]
+    return winners, candidates[order]
+
+
+def index_exists(index_dir: str) -> bool:
+    return os.path.exists(os.path.join(index_dir, MANIFEST_FILE))
+
+
+class RagIndex:
+    """mmap으로 연 임베딩 행렬 + 행 번호로 읽는 메타데이터"""
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self.manifest = read_manifest(index_dir)
+        self.model = self.manifest.get("model", "")
+        self.dimension = self.manifest["dimension"]
+        self.types = self.manifest["types"]
+        self.embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        self.type_ids = np.load(os.path.join(index_dir, TYPE_IDS_FILE), mmap_mode="r")
+        self._offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+        self._meta_fd = os.open(os.path.join(index_dir, METADATA_FILE), os.O_RDONLY)
+        type_ids = np.asarray(self.type_ids)
+        self.type_rows = {name: np.flatnonzero(type_ids == i) for i, name in enumerate(self.types)}
+
+    def __len__(self):
+        return self.embeddings.shape[0]
+
+    def rows_for_types(self, types) -> np.ndarray:
+        """해당 type 문서들의 행 번호 (오름차순)"""
+        arrays = [self.type_rows[name] for name in types if name in self.type_rows]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return arrays[0] if len(arrays) == 1 else np.sort(np.concatenate(arrays))
+
+    def scores(self, query_embedding) -> np.ndarray:
+        """전체 문서와의 내적 (정규화된 임베딩이므로 코사인 유사도)"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if self.embeddings.dtype == np.float32:
+            return self.embeddings @ query
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = self.embeddings[start:start + SCORE_CHUNK_ROWS]
+            out[start:start + len(chunk)] = chunk.astype(np.float32) @ query
+        return out
+
+    def scores_batch(self, query_embeddings) -> np.ndarray:
+        """여러 쿼리와 전체 문서의 내적 (B, N) - 임베딩 행렬을 한 번만 훑는 행렬곱"""
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(-1, self.dimension)
+        out = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            chunk = np.asarray(self.embeddings[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            out[:, start:start + len(chunk)] = queries @ chunk.T
+        return out
+
+    def scores_for(self, rows, query_embedding) -> np.ndarray:
+        """지정한 행들과의 내적"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return np.asarray(self.embeddings[rows], dtype=np.float32) @ np.asarray(query_embedding, dtype=np.float32)
+
+    def document(self, row: int) -> dict:
+        """row번째 문서 메타데이터 (해당 줄만 읽음, 스레드 안전)"""
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(os.pread(self._meta_fd, end - start, start))
+
+    def close(self):
+        if getattr(self, "_meta_fd", None) is not None:
+            os.close(self._meta_fd)
+            self._meta_fd = None
+
+    def __del__(self):
+        # 핫 리로드로 교체된 세대는 참조가 사라질 때 닫힘
+        self.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        raise SystemExit("usage: python -m llm_core.rag_index <rag_embeddings.json> <index_dir> [float16|float32]")
+    out = convert_json_index(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "float16")
+    print(f"RAG index written: {out}")
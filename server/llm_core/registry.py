@@ -0,0 +1,38 @@
+"""
+엔드포인트 레지스트리
+- 각 엔드포인트 모듈이 @endpoint 로 자신을 등록하고, 호스트가 설정에 따라 원하는 조합만 마운트
+- on_mount: 엔드포인트가 특정 엔진(GPU)에 처음 마운트될 때 1회 실행 (prefix 등록, 인덱스 로드 등)
+- priority: 스케줄러 요청 클래스 (interactive / dashboard / batch)
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from llm_core.scheduler import DASHBOARD
+
+ENDPOINTS = {}
+
+
+@dataclass
+class EndpointSpec:
+    name: str
+    rule: str
+    view: Callable
+    methods: tuple = ("POST",)
+    on_mount: Optional[Callable] = None
+    priority: str = DASHBOARD
+
+
+def endpoint(name: str, rule: str, methods=("POST",), on_mount: Optional[Callable] = None, priority: str = DASHBOARD):
+    """엔드포인트 등록 데코레이터 (name은 설정 파일에서 쓰는 이름)"""
+    def decorator(view):
+        if name in ENDPOINTS:
+            raise ValueError(f"Duplicate endpoint name: {name}")
+        ENDPOINTS[name] = EndpointSpec(name=name, rule=rule, view=view, methods=tuple(methods), on_mount=on_mount, priority=priority)
+        return view
+    return decorator
+
+
+def get_endpoint(name: str) -> EndpointSpec:
+    if name not in ENDPOINTS:
+        raise KeyError(f"Unknown endpoint '{name}'. Available: {', '.join(sorted(ENDPOINTS))}")
+    return ENDPOINTS[name]
@@ -0,0 +1,125 @@
+"""
+반복 감지 조기 종료
+- 생성 중인 텍스트를 줄/문장 단위로 끊어 remove_repetitions와 같은 정규화로 비교
+- 이미 나온 줄/문장이 max_repeats번 다시 나오면 루프에 빠진 것으로 보고 생성 중단
+  (남은 반복 조각은 기존처럼 remove_repetitions가 후처리에서 제거)
+- 문장 끝/줄바꿈 없이 구절만 반복되는 루프는 단어 n-gram으로 감지
+  - 최근 NGRAM_WINDOW개 n-gram(NGRAM_WORDS 단어씩, 단어도 같은 정규화) 중 하나가 max_repeats번 넘게 다시 나오면 중단
+- RepetitionDetector: 토큰 단위 feed (batching 엔진용)
+- RepetitionStoppingCriteria: model.generate(stopping_criteria=...)용 래퍼 (VLM 등)
+"""
+import re
+from collections import Counter, deque
+
+import torch
+from transformers import StoppingCriteria
+
+from llm_core.text import normalize_for_repetition
+
+# 줄바꿈 또는 문장 끝(. ! ? 뒤 공백) - remove_repetitions와 같은 분리 기준
+_BOUNDARY = re.compile(r'(\n|(?<=[.!?])\s+)')
+
+MIN_LINE_CHARS = 10  # remove_repetitions: 짧은 줄은 무시
+MIN_SENTENCE_CHARS = 20
+NGRAM_WORDS = 6
+NGRAM_WINDOW = 200  # 최근 n-gram 개수 (이보다 오래된 n-gram은 카운트에서 뺌)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class RepetitionDetector:
+    def __init__(self, tokenizer, max_repeats: int = 2, ngram_words: int = NGRAM_WORDS, ngram_window: int = NGRAM_WINDOW):
+        self.tokenizer = tokenizer
+        self.max_repeats = max_repeats
+        self.repeats = 0
+        self._seen = set()
+        self._window = []  # 마지막 경계 이후 토큰
+        self._carry = ""  # 마지막 경계 이후 아직 끝나지 않은 텍스트
+
+        self.ngram_words = ngram_words
+        self.ngram_loop = False
+        self._word_window = []  # 마지막 공백 이후 토큰
+        self._word_carry = ""  # 마지막 공백 이후 아직 끝나지 않은 단어
+        self._words = deque(maxlen=max(1, ngram_words))  # 최근 정규화 단어
+        self._ngrams = deque()  # 최근 ngram_window개 n-gram (오래된 순)
+        self._ngram_window = ngram_window
+        self._ngram_counts = Counter()
+
+    @property
+    def looping(self) -> bool:
+        return self.repeats >= self.max_repeats or self.ngram_loop
+
+    def feed(self, token_id: int) -> bool:
+        """토큰 1개 추가 후 반복 루프 여부 반환"""
+        self._feed_words(token_id)
+        self._window.append(token_id)
+        text = self._carry + self.tokenizer.decode(self._window, skip_special_tokens=True)
+        if text.endswith("�"):
+            # 멀티바이트(한글) 토큰이 아직 완성되지 않음
+            return self.looping
+
+        parts = _BOUNDARY.split(text)
+        if len(parts) < 3:
+            return self.looping
+
+        # parts: [unit, sep, unit, sep, ..., 미완성 unit]
+        for unit, sep in zip(parts[:-1:2], parts[1:-1:2]):
+            self._check(unit, MIN_LINE_CHARS if "\n" in sep else MIN_SENTENCE_CHARS)
+        self._carry = parts[-1]
+        self._window = []
+        return self.looping
+
+    def _check(self, unit: str, min_chars: int):
+        normalized = normalize_for_repetition(unit)
+        if not normalized or len(normalized) <= min_chars:
+            return
+        if normalized in self._seen:
+            self.repeats += 1
+        else:
+            self._seen.add(normalized)
+
+    def _feed_words(self, token_id: int):
+        """공백으로 끝난 단어를 n-gram 카운터에 추가"""
+        if self.ngram_words <= 0:
+            return
+        self._word_window.append(token_id)
+        text = self._word_carry + self.tokenizer.decode(self._word_window, skip_special_tokens=True)
+        if text.endswith("�"):
+            return
+        words = _WHITESPACE.split(text)
+        if len(words) < 2:
+            return
+        self._word_carry = words[-1]
+        self._word_window = []
+        for word in words[:-1]:
+            self._add_word(normalize_for_repetition(word))
+
+    def _add_word(self, word: str):
+        if not word:
+            return
+        self._words.append(word)
+        if len(self._words) < self.ngram_words:
+            return
+        ngram = tuple(self._words)
+        self._ngrams.append(ngram)
+        self._ngram_counts[ngram] += 1
+        if len(self._ngrams) > self._ngram_window:
+            old = self._ngrams.popleft()
+            self._ngram_counts[old] -= 1
+            if not self._ngram_counts[old]:
+                del self._ngram_counts[old]
+        if self._ngram_counts[ngram] - 1 > self.max_repeats:
+            self.ngram_loop = True
+
+
+class RepetitionStoppingCriteria(StoppingCriteria):
+    """HF generate용 (batch 1 기준, prompt_len 이후 토큰만 검사)"""
+
+    def __init__(self, tokenizer, prompt_len: int, max_repeats: int = 2):
+        self.detector = RepetitionDetector(tokenizer, max_repeats)
+        self._consumed = prompt_len
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs):
+        for token_id in input_ids[0, self._consumed:].tolist():
+            self.detector.feed(token_id)
+        self._consumed = input_ids.shape[1]
+        return torch.full((input_ids.shape[0],), self.detector.looping, dtype=torch.bool, device=input_ids.device)
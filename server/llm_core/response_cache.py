@@ -0,0 +1,222 @@
+"""
+LLM 분석 응답 캐시
+- 같은 키워드/국가/카테고리로 반복 호출되는 분석 엔드포인트의 JSON 응답을 재사용
+- 키: sha256(엔드포인트 경로, 정규화된 payload, 프롬프트 템플릿 버전, 모델, 생성 파라미터)
+- 1차: 프로세스 내 LRU + TTL, 2차(선택): diskDir 설정 시 디스크 JSON 파일
+- 요청 헤더 Cache-Control: no-cache 이면 캐시 조회 없이 새로 생성 (결과는 다시 저장)
+- 응답 헤더 X-Cache: HIT / MISS / BYPASS
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+DEFAULT_TTL = int(os.environ.get("LLM_RESPONSE_CACHE_TTL", str(6 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("LLM_RESPONSE_CACHE_SIZE", "512"))
+DEFAULT_DISK_DIR = os.environ.get("LLM_RESPONSE_CACHE_DIR", "")
+
+
+def normalize_payload(value):
+    """키 계산용 payload 정규화 (문자열 공백 정리, None 값 제거, dict 키 정렬은 json.dumps에서)"""
+    if isinstance(value, dict):
+        return {str(k): normalize_payload(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_payload(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def make_cache_key(endpoint: str, payload, template_version: str, model: str = "", params=None) -> str:
+    if is_dataclass(params):
+        params = asdict(params)
+    material = json.dumps({
+        "endpoint": endpoint,
+        "payload": normalize_payload(payload),
+        "template": template_version,
+        "model": model,
+        "params": params,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """TTL + LRU 응답 캐시 (선택적으로 디스크 tier)"""
+
+    def __init__(self, ttl: int = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: str = DEFAULT_DISK_DIR):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self.configure(ttl, max_entries, disk_dir)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def configure(self, ttl: int = None, max_entries: int = None, disk_dir: str = None):
+        with self._lock:
+            if ttl is not None:
+                self.ttl = int(ttl)
+            if max_entries is not None:
+                self.max_entries = int(max_entries)
+            if disk_dir is not None:
+                self.disk_dir = disk_dir
+                if disk_dir:
+                    os.makedirs(disk_dir, exist_ok=True)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"WARNING: response cache read failed ({path}): {e}")
+            return None
+        if entry.get("expiresAt", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["expiresAt"], entry["payload"]
+
+    def _write_disk(self, key: str, expires_at: float, payload):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expiresAt": expires_at, "payload": payload}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"WARNING: response cache write failed ({path}): {e}")
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, *entry)
+        return entry[1]
+
+    def _put_memory(self, key: str, expires_at: float, payload):
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, payload):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._put_memory(key, expires_at, payload)
+        self._write_disk(key, expires_at, payload)
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "ttlSeconds": self.ttl,
+                "disk": bool(self.disk_dir),
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cacheable_payload(rv):
+    """성공 응답(200, success != False)일 때만 JSON 본문 반환"""
+    status = 200
+    if isinstance(rv, tuple):
+        rv, status = rv[0], rv[1]
+    if status != 200 or getattr(rv, "status_code", 200) != 200:
+        return None
+    payload = rv.get_json(silent=True) if hasattr(rv, "get_json") else None
+    if not isinstance(payload, dict) or payload.get("success") is False:
+        return None
+    return payload
+
+
+def wants_no_cache() -> bool:
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+
+def cached_response(template_version: str, params=None):
+    """분석 엔드포인트 view의 JSON 응답 캐시 데코레이터
+
+    template_version: 프롬프트 템플릿을 바꾸면 올려서 기존 캐시 무효화
+    params: 해당 엔드포인트가 쓰는 SamplingParams (키에 포함)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = make_cache_key(
+                request.path,
+                request.get_json(silent=True),
+                template_version,
+                current_app.config.get("LLM_MODEL", ""),
+                params,
+            )
+
+            if wants_no_cache():
+                response_cache.record_bypass()
+                cache_status = "BYPASS"
+            else:
+                payload = response_cache.get(key)
+                if payload is not None:
+                    response = jsonify(payload)
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+                cache_status = "MISS"
+
+            rv = view(*args, **kwargs)
+            payload = _cacheable_payload(rv)
+            if payload is not None:
+                response_cache.put(key, payload)
+            response = rv[0] if isinstance(rv, tuple) else rv
+            if hasattr(response, "headers"):
+                response.headers["X-Cache"] = cache_status
+            return rv
+
+        return wrapper
+    return decorator
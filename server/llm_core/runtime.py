@@ -0,0 +1,145 @@
+"""
+모델/엔진 런타임
+- EXAONE 모델은 디바이스당 1번만 로드하고, 같은 디바이스를 쓰는 모든 포트/엔드포인트가 엔진을 공유
+- 엔드포인트 코드는 generate_response()만 호출 (현재 요청이 마운트된 앱의 엔진 사용)
+- 설정의 device(cuda:4 등)는 물리 GPU 번호, CUDA_VISIBLE_DEVICES가 설정되어 있으면 보이는 GPU 안의 번호로 변환
+  (예: CUDA_VISIBLE_DEVICES=4 python llm_server_port4.py → cuda:4가 cuda:0으로 로드)
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict
+
+import torch
+from flask import current_app, has_request_context, request
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from llm_core.batching import ContinuousBatchingEngine, SamplingParams
+from llm_core.scheduler import DASHBOARD
+from llm_core.single_flight import SingleFlight
+from llm_core.streaming import open_stream_stage, stream_active
+
+MODEL_NAME = "LGAI-EXAONE/EXAONE-3.5-7.8B-Instruct"
+
+SYSTEM_PROMPT = """당신은 글로벌 K-뷰티(K-Beauty) 시장 분석 및 화장품 산업 트렌드 전문가입니다.
+아모레퍼시픽, LG생활건강 등 한국 화장품 기업의 글로벌 전략을 자문하는 수준의 전문성을 갖추고 있습니다.
+주어진 데이터를 바탕으로 심층적이고 전문적인 분석을 제공하되, 데이터에 나타나지 않는 시장 맥락, 소비자 심리, 산업 동향까지 종합적으로 고려하여 풍부한 인사이트를 제공합니다.
+반드시 한국어로만 답변하세요."""
+
+# 기존 llm_server_port5~7.py 설정 (port4 엔드포인트는 endpoints/keyword.py, gpu6 배치 작업은 endpoints/review.py 설정 유지)
+# llm_server_gpu5/6/7.py(temperature 0.7, repetition_penalty 1.1)로 5005~5007을 띄우던 환경도 이 값으로 바뀜
+GENERATION_PARAMS = SamplingParams(
+    temperature=0.75,  # 0.7 → 0.75 (수치 안정성)
+    top_p=0.9,
+    top_k=50,  # 추가: 샘플링 풀 제한
+    repetition_penalty=1.05,  # 1.1 → 1.05 (inf/nan 방지)
+)
+
+_engines = {}
+_tokenizers = {}
+_load_lock = threading.Lock()
+
+# 동시에 들어온 동일 생성 요청 병합 (여러 분석가가 같은 키워드 페이지를 열 때)
+generation_flights = SingleFlight()
+
+
+def visible_device(device: str) -> str:
+    """물리 GPU 번호(cuda:N) → CUDA_VISIBLE_DEVICES 안의 번호 (목록에 없거나 변수가 없으면 그대로)"""
+    visible = [d.strip() for d in os.environ.get("CUDA_VISIBLE_DEVICES", "").split(",") if d.strip()]
+    kind, _, index = device.partition(":")
+    if kind != "cuda" or not visible or index not in visible:
+        return device
+    return f"cuda:{visible.index(index)}"
+
+
+def load_engine(device: str, model_name: str = MODEL_NAME, max_retries: int = 2, retry_delay: float = 2.0) -> ContinuousBatchingEngine:
+    """디바이스별 엔진 반환 (최초 호출 시에만 모델 로드)"""
+    device = visible_device(device)
+    with _load_lock:
+        if device in _engines:
+            return _engines[device]
+
+        if model_name not in _tokenizers:
+            _tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+        tokenizer = _tokenizers[model_name]
+
+        print(f"Loading model: {model_name} on {device}...")
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.bfloat16,  # float16 → bfloat16 (수치 안정성 개선)
+            device_map=device,
+            trust_remote_code=True,
+        )
+        model.eval()
+        print(f"Model loaded successfully on {device}!")
+
+        engine = ContinuousBatchingEngine(model, tokenizer, device, max_retries=max_retries, retry_delay=retry_delay)
+        # 시스템 프롬프트 prefix KV cache 사전 계산 (모든 엔드포인트 공통)
+        engine.register_prefix("system", SYSTEM_PROMPT)
+        _engines[device] = engine
+        return engine
+
+
+def loaded_engines() -> dict:
+    return dict(_engines)
+
+
+def current_engine() -> ContinuousBatchingEngine:
+    """현재 요청을 처리 중인 앱에 연결된 엔진"""
+    return current_app.extensions["llm_engine"]
+
+
+# 호스트 before_request가 요청 environ에 기록 (SSE 스레드에서도 그대로 보임)
+PRIORITY_ENVIRON_KEY = "llm.priority"
+DEADLINE_ENVIRON_KEY = "llm.deadline"
+
+
+def request_schedule() -> dict:
+    """현재 요청의 스케줄러 클래스/deadline (engine.submit/generate 인자)"""
+    if not has_request_context():
+        return {}
+    return {
+        "priority": request.environ.get(PRIORITY_ENVIRON_KEY, DASHBOARD),
+        "deadline": request.environ.get(DEADLINE_ENVIRON_KEY),
+    }
+
+
+def build_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def generation_key(device: str, messages: list, max_new_tokens: int, params: SamplingParams) -> str:
+    material = json.dumps({
+        "device": device,
+        "messages": messages,
+        "maxNewTokens": max_new_tokens,
+        "params": asdict(params),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def generate_response(prompt: str, max_new_tokens: int = 1024, params: SamplingParams = None) -> str:
+    """Generate a response from the LLM (continuous batching 엔진 경유, 동일 요청은 single-flight 병합)"""
+    messages = build_messages(prompt)
+    params = params or GENERATION_PARAMS
+    engine = current_engine()
+
+    # SSE 요청은 자기 토큰 스트림이 필요하므로 병합하지 않음
+    schedule = request_schedule()
+    if stream_active():
+        return engine.generate(messages, max_new_tokens, params, **schedule)
+
+    key = generation_key(engine.device, messages, max_new_tokens, params)
+    return generation_flights.do(key, lambda: engine.generate(messages, max_new_tokens, params, **schedule))
+
+
+def submit_response(prompt: str, max_new_tokens: int = 1024, params: SamplingParams = None):
+    """generate_response의 비동기 버전 - 엔진 Future 반환 (여러 프롬프트를 한 배치로 보낼 때)"""
+    engine = current_engine()
+    streamer = open_stream_stage(engine.tokenizer)
+    return engine.submit(build_messages(prompt), max_new_tokens, params or GENERATION_PARAMS, streamer=streamer,
+                         **request_schedule())
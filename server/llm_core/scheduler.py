@@ -0,0 +1,162 @@
+"""
+우선순위 대기열 스케줄러 (continuous batching 엔진의 대기 큐)
+- 요청 클래스: interactive(챗봇) > dashboard(대시보드 분석) > batch(scripts/ 배치 분류/요약)
+- 클래스별 가중치로 공정 분배 (가상 시간이 가장 작은 클래스부터 배치에 합류)
+- 클래스별 최대 동시 실행 수(배치 점유율) 제한 → batch 작업이 배치를 모두 차지하지 않음
+- 예약 슬롯: interactive는 LLM_INTERACTIVE_RESERVED_SLOTS개(기본 1) 슬롯을 항상 비워 둠
+  (다른 클래스는 예약분을 뺀 슬롯까지만 합류, 선점이 없으므로 배치가 dashboard/batch로 가득 차지 않게 함)
+  배치 크기가 1이면 예약 없음
+- 클래스별 대기열 상한 초과 시 QueueFullError (호스트에서 429 + Retry-After)
+- 요청별 deadline까지 배치에 합류하지 못하면 timeout 처리
+"""
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+INTERACTIVE = "interactive"
+DASHBOARD = "dashboard"
+BATCH = "batch"
+
+
+@dataclass
+class PriorityClass:
+    name: str
+    weight: float  # 공정 분배 가중치 (클수록 자주 합류)
+    max_waiting: int  # 대기열 상한 (초과 시 429)
+    max_share: float  # 배치에서 동시에 차지할 수 있는 최대 비율
+    deadline: float  # 기본 대기 한도 (초)
+    reserved: int = 0  # 다른 클래스가 쓸 수 없는 슬롯 수
+
+
+DEFAULT_CLASSES = {
+    INTERACTIVE: PriorityClass(INTERACTIVE, weight=8, max_waiting=int(os.environ.get("LLM_QUEUE_INTERACTIVE", "32")), max_share=1.0, deadline=60,
+                               reserved=int(os.environ.get("LLM_INTERACTIVE_RESERVED_SLOTS", "1"))),
+    DASHBOARD: PriorityClass(DASHBOARD, weight=3, max_waiting=int(os.environ.get("LLM_QUEUE_DASHBOARD", "64")), max_share=0.75, deadline=120),  # 기존 semaphore timeout과 동일
+    BATCH: PriorityClass(BATCH, weight=1, max_waiting=int(os.environ.get("LLM_QUEUE_BATCH", "16")), max_share=0.5, deadline=600),
+}
+
+
+class QueueFullError(RuntimeError):
+    """대기열이 가득 참 - retry_after초 후 재시도 권장"""
+
+    def __init__(self, priority: str, retry_after: int):
+        super().__init__(f"Server busy: {priority} queue is full. Retry after {retry_after}s.")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class PriorityScheduler:
+    """엔진 대기 시퀀스 관리 (엔진의 _cond 잠금 안에서만 호출)"""
+
+    def __init__(self, max_batch_size: int, classes: dict = None):
+        self.classes = classes or DEFAULT_CLASSES
+        self.max_batch_size = max_batch_size
+        self._queues = {name: deque() for name in self.classes}
+        self._retries = deque()  # CUDA 에러 재시도 요청 (클래스와 무관하게 먼저)
+        self._vtime = {name: 0.0 for name in self.classes}
+        self._clock = 0.0
+        self.avg_service_time = 10.0  # 요청 1건 처리 시간 추정치 (EMA, 초)
+        self.rejected = {name: 0 for name in self.classes}
+        self.expired = {name: 0 for name in self.classes}
+
+    def __len__(self):
+        return len(self._retries) + sum(len(q) for q in self._queues.values())
+
+    def resolve(self, priority: str) -> str:
+        return priority if priority in self.classes else DASHBOARD
+
+    def default_deadline(self, priority: str, now: float = None) -> float:
+        return (now or time.time()) + self.classes[self.resolve(priority)].deadline
+
+    def max_active(self, priority: str) -> int:
+        return max(1, int(self.max_batch_size * self.classes[priority].max_share))
+
+    def reserved(self, priority: str) -> int:
+        return max(0, min(self.classes[priority].reserved, self.max_batch_size - 1))
+
+    def _has_free_slot(self, priority: str, active_counts: dict) -> bool:
+        """다른 클래스의 예약 슬롯 중 아직 안 쓴 것을 빼고도 빈 슬롯이 있는지"""
+        held = sum(
+            max(0, self.reserved(name) - active_counts.get(name, 0)) for name in self.classes if name != priority
+        )
+        return sum(active_counts.values()) + held < self.max_batch_size
+
+    def retry_after(self, priority: str) -> int:
+        """현재 대기열 기준 예상 대기 시간 (초)"""
+        priority = self.resolve(priority)
+        weight = self.classes[priority].weight
+        ahead = len(self._retries) + sum(
+            len(queue) for name, queue in self._queues.items() if self.classes[name].weight >= weight
+        )
+        rounds = (ahead + 1) / self.max_active(priority)
+        return max(1, math.ceil(rounds * self.avg_service_time))
+
+    def check_admission(self, priority: str):
+        """대기열이 가득 찼으면 QueueFullError"""
+        priority = self.resolve(priority)
+        if len(self._queues[priority]) >= self.classes[priority].max_waiting:
+            self.rejected[priority] += 1
+            raise QueueFullError(priority, self.retry_after(priority))
+
+    def push(self, seq):
+        priority = self.resolve(seq.priority)
+        self.check_admission(priority)
+        queue = self._queues[priority]
+        if not queue:
+            # 쉬고 있던 클래스가 밀린 몫을 한꺼번에 가져가지 않도록 현재 시각으로 맞춤
+            self._vtime[priority] = max(self._vtime[priority], self._clock)
+        queue.append(seq)
+
+    def push_retry(self, seq):
+        self._retries.append(seq)
+
+    def pop_next(self, active_counts: dict):
+        """배치에 합류할 다음 시퀀스 (없으면 None)"""
+        if self._retries:
+            return self._retries.popleft()
+
+        candidates = [
+            name for name, queue in self._queues.items()
+            if queue and active_counts.get(name, 0) < self.max_active(name) and self._has_free_slot(name, active_counts)
+        ]
+        if not candidates:
+            return None
+        name = min(candidates, key=lambda n: (self._vtime[n], -self.classes[n].weight))
+        self._clock = self._vtime[name]
+        self._vtime[name] += 1.0 / self.classes[name].weight
+        return self._queues[name].popleft()
+
+    def expire(self, now: float) -> list:
+        """취소되었거나 deadline이 지난 대기 요청 제거 후 만료된 시퀀스 목록 반환"""
+        expired = []
+        for name, queue in self._queues.items():
+            alive = deque()
+            for seq in queue:
+                if seq.future.cancelled():
+                    continue
+                if seq.deadline is not None and now > seq.deadline:
+                    self.expired[name] += 1
+                    expired.append(seq)
+                    continue
+                alive.append(seq)
+            self._queues[name] = alive
+        return expired
+
+    def record_service_time(self, seconds: float):
+        self.avg_service_time = 0.9 * self.avg_service_time + 0.1 * seconds
+
+    def stats(self, active_counts: dict) -> dict:
+        return {
+            name: {
+                "waiting": len(self._queues[name]),
+                "active": active_counts.get(name, 0),
+                "maxActive": self.max_active(name),
+                "reserved": self.reserved(name),
+                "maxWaiting": cls.max_waiting,
+                "rejected": self.rejected[name],
+                "expired": self.expired[name],
+            }
+            for name, cls in self.classes.items()
+        }
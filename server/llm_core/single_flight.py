@@ -0,0 +1,48 @@
+"""
+동일 요청 single-flight 병합
+- 같은 키의 생성이 이미 진행 중이면 새로 GPU에 올리지 않고 그 결과를 함께 받음
+- 진행 중인 호출만 병합 (완료된 결과 재사용은 response_cache 담당)
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: str, fn):
+        """key에 대해 fn()을 1번만 실행하고, 동시에 들어온 호출은 같은 결과(또는 예외)를 받음"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "inFlight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.followers,
+            }
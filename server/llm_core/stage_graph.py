@@ -0,0 +1,51 @@
+"""
+Multi-query 프롬프트 단계 실행기
+- 단계(Stage)마다 의존하는 단계 이름을 지정하면, 의존성이 없는 단계들은 한꺼번에 엔진에 제출(같은 배치로 디코딩)
+- 의존 단계는 입력이 모두 준비되는 즉시 제출
+  예) sns-analysis: [retail, sns] 동시 → insights → strategy  (4번 순차 생성 → 3라운드)
+"""
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from llm_core.batching import SamplingParams
+from llm_core.runtime import submit_response
+
+
+@dataclass
+class Stage:
+    name: str
+    build_prompt: Callable[[dict], str]  # 앞 단계 결과 dict(name -> text)를 받아 프롬프트 생성
+    depends_on: tuple = ()
+    max_new_tokens: int = 1024
+    params: Optional[SamplingParams] = None
+
+
+def run_stages(stages: list, submit=submit_response) -> dict:
+    """의존성 그래프 순서대로 단계 실행 후 {name: 생성 결과} 반환"""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {missing}")
+
+    results = {}
+    pending = {}  # future -> stage name
+    remaining = list(stages)
+
+    while remaining or pending:
+        ready = [stage for stage in remaining if all(dep in results for dep in stage.depends_on)]
+        for stage in ready:
+            remaining.remove(stage)
+            print(f"    [stage] {stage.name} 제출")
+            future = submit(stage.build_prompt(results), stage.max_new_tokens, stage.params)
+            pending[future] = stage.name
+
+        if not pending:
+            raise ValueError(f"Stage dependency cycle: {[stage.name for stage in remaining]}")
+
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+
+    return results
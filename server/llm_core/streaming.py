@@ -0,0 +1,193 @@
+"""
+SSE 토큰 스트리밍
+- ?stream=1 또는 Accept: text/event-stream 요청 시 /api/llm/*, /api/chat/* 응답을 Server-Sent Events로 전송
+- 엔드포인트 핸들러는 그대로 두고 별도 스레드에서 실행, 그 안의 모든 생성 호출이 토큰을 sink로 흘려보냄
+- 마지막 done 이벤트에는 기존 JSON 응답과 동일한 본문(currentPhase, monthlyScores 등)을 담음
+
+이벤트 형식:
+  event: stage  data: {"stage": n}                 새 생성 단계 시작 (multi-query 엔드포인트는 여러 단계)
+  event: token  data: {"stage": n, "text": "..."}  디코딩된 텍스트 조각
+  event: reset  data: {"stage": n}                 CUDA 에러 재시도로 해당 단계 텍스트 폐기
+  event: done   data: {...기존 JSON 응답..., "status": 200}
+"""
+import json
+import queue
+import threading
+from functools import wraps
+
+from flask import Response, request, copy_current_request_context
+
+from llm_core.scheduler import QueueFullError
+
+_local = threading.local()
+_DONE = object()
+
+
+class TokenStreamer:
+    """TextIteratorStreamer 방식의 증분 디코더 - 생성 루프에서 put/end 호출"""
+
+    def __init__(self, sink, stage: int, tokenizer, skip_prompt: bool = False):
+        self.sink = sink
+        self.stage = stage
+        self.tokenizer = tokenizer
+        self.skip_prompt = skip_prompt
+        self._next_is_prompt = True
+        self._token_cache = []
+        self._printed_len = 0
+
+    def put(self, value):
+        """토큰 id(int) 또는 model.generate 스트리머 규약의 텐서를 받아 텍스트 조각 전송"""
+        if hasattr(value, "tolist"):
+            # HF generate: 첫 호출은 프롬프트 전체
+            if self.skip_prompt and self._next_is_prompt:
+                self._next_is_prompt = False
+                return
+            ids = value.view(-1).tolist()
+        else:
+            ids = [value]
+        self._next_is_prompt = False
+
+        self._token_cache.extend(ids)
+        text = self.tokenizer.decode(self._token_cache, skip_special_tokens=True)
+        if text.endswith("\n"):
+            chunk = text[self._printed_len:]
+            self._token_cache = []
+            self._printed_len = 0
+        elif text.endswith("�"):
+            # 멀티바이트(한글) 토큰이 아직 완성되지 않음
+            return
+        else:
+            chunk = text[self._printed_len:]
+            self._printed_len = len(text)
+        if chunk:
+            self.sink.emit("token", {"stage": self.stage, "text": chunk})
+
+    def end(self):
+        if self._token_cache:
+            text = self.tokenizer.decode(self._token_cache, skip_special_tokens=True)
+            chunk = text[self._printed_len:]
+            if chunk:
+                self.sink.emit("token", {"stage": self.stage, "text": chunk})
+        self._token_cache = []
+        self._printed_len = 0
+
+    def reset(self):
+        self._token_cache = []
+        self._printed_len = 0
+        self.sink.emit("reset", {"stage": self.stage})
+
+
+class StreamSink:
+    """요청 1건의 SSE 이벤트 큐"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._stage_lock = threading.Lock()
+        self._stages = 0
+
+    def emit(self, event: str, data: dict):
+        self._queue.put((event, data))
+
+    def new_stage(self, tokenizer, skip_prompt: bool = False) -> TokenStreamer:
+        with self._stage_lock:
+            stage = self._stages
+            self._stages += 1
+        self.emit("stage", {"stage": stage})
+        return TokenStreamer(self, stage, tokenizer, skip_prompt)
+
+    def close(self):
+        self._queue.put(_DONE)
+
+    def events(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+
+def open_stream_stage(tokenizer, skip_prompt: bool = False):
+    """현재 스레드가 스트리밍 요청을 처리 중이면 새 단계 스트리머 반환, 아니면 None"""
+    sink = getattr(_local, "sink", None)
+    if sink is None:
+        return None
+    return sink.new_stage(tokenizer, skip_prompt)
+
+
+def stream_active() -> bool:
+    """현재 스레드가 SSE 스트리밍 요청을 처리 중인지"""
+    return getattr(_local, "sink", None) is not None
+
+
+def wants_stream() -> bool:
+    """?stream=1 또는 Accept: text/event-stream"""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    return "text/event-stream" in request.headers.get("Accept", "")
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _response_payload(rv):
+    """view 반환값(Response 또는 (Response, status))에서 JSON 본문과 상태 코드 추출"""
+    status = None
+    if isinstance(rv, tuple):
+        rv, status = rv[0], rv[1]
+    payload = rv.get_json(silent=True) if hasattr(rv, "get_json") else rv
+    if status is None:
+        status = getattr(rv, "status_code", 200)
+    return payload, status
+
+
+def sse_streamable(view):
+    """엔드포인트 view를 스트리밍 가능하도록 감쌈 (스트리밍 요청이 아니면 그대로 실행)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not wants_stream():
+            return view(*args, **kwargs)
+
+        sink = StreamSink()
+
+        @copy_current_request_context
+        def run_view():
+            _local.sink = sink
+            try:
+                payload, status = _response_payload(view(*args, **kwargs))
+                payload = dict(payload or {})
+                payload["status"] = status
+                sink.emit("done", payload)
+            except QueueFullError as e:
+                sink.emit("done", {"success": False, "error": str(e), "retryAfter": e.retry_after, "status": 429})
+            except Exception as e:
+                sink.emit("done", {"success": False, "error": str(e), "status": 500})
+            finally:
+                _local.sink = None
+                sink.close()
+
+        threading.Thread(target=run_view, name="sse-view", daemon=True).start()
+
+        def generate():
+            for event, data in sink.events():
+                yield format_sse(event, data)
+
+        return Response(generate(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+
+    return wrapper
+
+
+def enable_sse_streaming(app, prefixes=("/api/llm/", "/api/chat/")):
+    """app에 등록된 POST 엔드포인트 중 prefix에 해당하는 것에 SSE 스트리밍 옵션 적용"""
+    for rule in app.url_map.iter_rules():
+        if "POST" not in rule.methods or not rule.rule.startswith(prefixes):
+            continue
+        view = app.view_functions[rule.endpoint]
+        if getattr(view, "_sse_streamable", False):
+            continue
+        wrapped = sse_streamable(view)
+        wrapped._sse_streamable = True
+        app.view_functions[rule.endpoint] = wrapped
@@ -0,0 +1,406 @@
+"""
+구조화 출력 (constrained decoding)
+- 엔드포인트별 출력 형식을 작은 문법(Lit, Choice, Digits, Text, Seq, Repeat)으로 정의하고
+  디코딩 중 형식에 맞지 않는 토큰의 logits를 -inf로 막음 → 파싱이 항상 첫 번째 생성에서 성공
+- 문법은 바이트 단위 NFA로 컴파일 (한글 등 멀티바이트 토큰도 그대로 처리)
+- 허용 토큰 mask는 (토크나이저, NFA 상태)별로 캐시: 어휘 trie를 따라가며 계산
+- SamplingParams(schema="plc-prediction") 처럼 스키마 이름으로 선택
+- LLM_STRUCTURED_OUTPUT=0 이면 with_schema()가 스키마를 붙이지 않음 (기존 자유 생성 + 파서 fallback)
+
+자유 텍스트(Text) 구간은 금지 바이트(기본: 줄바꿈)가 없는 토큰을 모두 허용하고,
+구간을 빠져나가는 토큰은 금지 바이트로 시작하는 경우만 허용 (예: "\n" 후 다음 섹션 제목)
+"""
+import os
+import threading
+from dataclasses import dataclass, replace
+
+import torch
+from transformers import LogitsProcessor
+
+# ===== 문법 요소 =====
+
+
+class Element:
+    def build(self, nfa, start: int) -> int:
+        """start 노드에서 시작하는 조각을 추가하고 끝 노드 반환"""
+        raise NotImplementedError
+
+
+@dataclass
+class Lit(Element):
+    text: str
+
+    def build(self, nfa, start):
+        node = start
+        for byte in self.text.encode("utf-8"):
+            nxt = nfa.new_node()
+            nfa.add_edge(node, ("byte", byte), nxt)
+            node = nxt
+        return node
+
+
+class Choice(Element):
+    def __init__(self, *options):
+        self.options = [Lit(o) if isinstance(o, str) else o for o in options]
+
+    def build(self, nfa, start):
+        end = nfa.new_node()
+        for option in self.options:
+            branch = nfa.new_node()
+            nfa.add_eps(start, branch)
+            nfa.add_eps(option.build(nfa, branch), end)
+        return end
+
+
+@dataclass
+class Digits(Element):
+    min_len: int = 1
+    max_len: int = 3
+
+    def build(self, nfa, start):
+        end = nfa.new_node()
+        node = start
+        for i in range(self.max_len):
+            if i >= self.min_len:
+                nfa.add_eps(node, end)
+            nxt = nfa.new_node()
+            for byte in b"0123456789":
+                nfa.add_edge(node, ("byte", byte), nxt)
+            node = nxt
+        nfa.add_eps(node, end)
+        return end
+
+
+@dataclass
+class Text(Element):
+    """금지 문자 없는 자유 텍스트 (최소 1글자)"""
+    forbidden: str = "\n"
+
+    def build(self, nfa, start):
+        banned = frozenset(self.forbidden.encode("utf-8"))
+        body = nfa.new_node()
+        nfa.add_edge(start, ("not", banned), body)
+        nfa.add_edge(body, ("not", banned), body, loop=True)
+        return body
+
+
+class Seq(Element):
+    def __init__(self, *elements):
+        self.elements = [Lit(e) if isinstance(e, str) else e for e in elements]
+
+    def build(self, nfa, start):
+        node = start
+        for element in self.elements:
+            node = element.build(nfa, node)
+        return node
+
+
+class Repeat(Element):
+    """element를 sep로 구분해 min~max번 반복 (max=None이면 제한 없음)"""
+
+    def __init__(self, element, sep: str = "", min_count: int = 1, max_count=None):
+        self.element = Lit(element) if isinstance(element, str) else element
+        self.sep = sep
+        self.min_count = min_count
+        self.max_count = max_count
+
+    def build(self, nfa, start):
+        end = nfa.new_node()
+        node = self.element.build(nfa, start)
+        count = 1
+        if self.min_count <= 1:
+            nfa.add_eps(node, end)
+        if self.max_count is None:
+            # 최소 횟수까지 펼친 뒤 마지막 반복은 루프로
+            while count < max(self.min_count, 1):
+                node = self.element.build(nfa, Lit(self.sep).build(nfa, node))
+                count += 1
+            loop_start = nfa.new_node()
+            nfa.add_eps(node, loop_start)
+            nfa.add_eps(Seq(self.sep, self.element).build(nfa, loop_start), loop_start)
+            nfa.add_eps(loop_start, end)
+            return end
+        while count < self.max_count:
+            node = self.element.build(nfa, Lit(self.sep).build(nfa, node))
+            count += 1
+            if count >= self.min_count:
+                nfa.add_eps(node, end)
+        return end
+
+
+# ===== NFA =====
+
+
+class _NFA:
+    def __init__(self):
+        self.edges = []  # node -> [(cls, target, loop)]
+        self.eps = []  # node -> [target]
+
+    def new_node(self) -> int:
+        self.edges.append([])
+        self.eps.append([])
+        return len(self.edges) - 1
+
+    def add_edge(self, src, cls, dst, loop=False):
+        self.edges[src].append((cls, dst, loop))
+
+    def add_eps(self, src, dst):
+        self.eps[src].append(dst)
+
+    def closure(self, nodes) -> frozenset:
+        stack = list(nodes)
+        seen = set(stack)
+        while stack:
+            node = stack.pop()
+            for nxt in self.eps[node]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return frozenset(seen)
+
+    def step(self, state: frozenset, byte: int, allow_loops: bool = True) -> frozenset:
+        targets = []
+        for node in state:
+            for cls, dst, loop in self.edges[node]:
+                if loop and not allow_loops:
+                    continue
+                kind, value = cls
+                if (kind == "byte" and byte == value) or (kind == "not" and byte not in value):
+                    targets.append(dst)
+        return self.closure(targets) if targets else frozenset()
+
+
+# ===== 토큰 어휘 =====
+
+
+def _byte_level_decoder() -> dict:
+    """GPT2 byte-level BPE의 문자 -> 바이트 매핑 (bytes_to_unicode의 역)"""
+    printable = list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1)) + list(range(ord("®"), ord("ÿ") + 1))
+    chars = printable[:]
+    extra = 0
+    for byte in range(256):
+        if byte not in printable:
+            printable.append(byte)
+            chars.append(256 + extra)
+            extra += 1
+    return {chr(c): b for b, c in zip(printable, chars)}
+
+
+def _token_bytes(tokenizer) -> list:
+    """토큰 id별 바이트열 (특수 토큰은 None)"""
+    vocab_size = len(tokenizer)
+    tokens = tokenizer.convert_ids_to_tokens(list(range(vocab_size)))
+    special = set(tokenizer.all_special_ids)
+
+    byte_decoder = None
+    if any(t and t.startswith("Ġ") for t in tokens):
+        # GPT2 방식 byte-level BPE
+        byte_decoder = _byte_level_decoder()
+    sentencepiece = byte_decoder is None and any(t and t.startswith("▁") for t in tokens)
+
+    result = []
+    for token_id, token in enumerate(tokens):
+        if token_id in special or token is None:
+            result.append(None)
+        elif byte_decoder is not None and all(c in byte_decoder for c in token):
+            result.append(bytes(byte_decoder[c] for c in token))
+        elif sentencepiece and token.startswith("<0x") and token.endswith(">") and len(token) == 6:
+            result.append(bytes([int(token[3:5], 16)]))
+        elif sentencepiece:
+            result.append(token.replace("▁", " ").encode("utf-8"))
+        else:
+            result.append(tokenizer.decode([token_id]).encode("utf-8"))
+    return result
+
+
+class TokenIndex:
+    """토크나이저 어휘의 바이트 trie + 금지 바이트별 자유 텍스트 mask"""
+
+    def __init__(self, tokenizer):
+        self.token_bytes = _token_bytes(tokenizer)
+        self.vocab_size = len(self.token_bytes)
+        self.trie = {}  # byte -> [children, token_ids]
+        for token_id, data in enumerate(self.token_bytes):
+            if not data:
+                continue
+            node = None
+            children = self.trie
+            for byte in data:
+                node = children.setdefault(byte, [{}, []])
+                children = node[0]
+            node[1].append(token_id)
+        self._free_masks = {}
+
+    def free_mask(self, banned: frozenset) -> torch.Tensor:
+        if banned not in self._free_masks:
+            self._free_masks[banned] = torch.tensor(
+                [bool(data) and not any(b in banned for b in data) for data in self.token_bytes], dtype=torch.bool)
+        return self._free_masks[banned]
+
+
+_token_indexes = {}
+_index_lock = threading.Lock()
+
+
+def token_index(tokenizer) -> TokenIndex:
+    with _index_lock:
+        key = id(tokenizer)
+        if key not in _token_indexes:
+            _token_indexes[key] = TokenIndex(tokenizer)
+        return _token_indexes[key]
+
+
+# ===== 스키마 =====
+
+
+class OutputSchema:
+    def __init__(self, name: str, grammar: Element):
+        self.name = name
+        self.nfa = _NFA()
+        start = self.nfa.new_node()
+        self.accept = grammar.build(self.nfa, start)
+        self.start = self.nfa.closure([start])
+        self._masks = {}
+        self._lock = threading.Lock()
+
+    def advance(self, state: frozenset, data: bytes) -> frozenset:
+        for byte in data:
+            state = self.nfa.step(state, byte)
+            if not state:
+                break
+        return state
+
+    def is_complete(self, state: frozenset) -> bool:
+        return self.accept in state
+
+    def allowed_mask(self, state: frozenset, index: TokenIndex) -> torch.Tensor:
+        """state에서 다음에 올 수 있는 토큰 mask (EOS 제외, CPU bool 텐서)"""
+        key = (id(index), state)
+        with self._lock:
+            cached = self._masks.get(key)
+        if cached is not None:
+            return cached
+
+        mask = torch.zeros(index.vocab_size, dtype=torch.bool)
+        # 자유 텍스트 구간 안에 머무는 토큰
+        for node in state:
+            for (kind, value), dst, loop in self.nfa.edges[node]:
+                if kind == "not" and any(l for _, d, l in self.nfa.edges[dst] if d == dst):
+                    mask |= index.free_mask(value)
+
+        # 그 외(리터럴/선택지/숫자, 자유 텍스트 탈출)는 trie를 따라가며 확인
+        stack = [(index.trie, state)]
+        while stack:
+            children, current = stack.pop()
+            for byte, (sub, ids) in children.items():
+                nxt = self.nfa.step(current, byte, allow_loops=False)
+                if not nxt:
+                    continue
+                for token_id in ids:
+                    mask[token_id] = True
+                if sub:
+                    stack.append((sub, nxt))
+
+        with self._lock:
+            self._masks[key] = mask
+        return mask
+
+
+class StructuredLogitsProcessor(LogitsProcessor):
+    """스키마에 맞지 않는 토큰 차단 (batch 1 기준, prompt_len 이후 토큰만 따라감)"""
+
+    def __init__(self, schema: OutputSchema, tokenizer, prompt_len: int, eos_token_ids):
+        self.schema = schema
+        self.index = token_index(tokenizer)
+        self.state = schema.start
+        self.eos_token_ids = [t for t in eos_token_ids if t is not None]
+        self._consumed = prompt_len
+        self._device_masks = {}
+
+    def _feed(self, input_ids: torch.LongTensor):
+        for token_id in input_ids[0, self._consumed:].tolist():
+            if token_id in self.eos_token_ids:
+                continue
+            data = self.index.token_bytes[token_id] if token_id < self.index.vocab_size else None
+            self.state = self.schema.advance(self.state, data or b"")
+        self._consumed = input_ids.shape[1]
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        self._feed(input_ids)
+        if not self.state:
+            # 형식에서 벗어난 경우(이론상 없음)에는 제약 해제
+            return scores
+
+        key = self.state
+        mask = self._device_masks.get(key)
+        if mask is None:
+            mask = self.schema.allowed_mask(self.state, self.index).clone()
+            if mask.shape[0] < scores.shape[-1]:
+                mask = torch.cat([mask, torch.zeros(scores.shape[-1] - mask.shape[0], dtype=torch.bool)])
+            mask = mask[:scores.shape[-1]]
+            if self.schema.is_complete(self.state) or not mask.any():
+                mask[self.eos_token_ids] = True
+            mask = mask.to(scores.device)
+            self._device_masks[key] = mask
+        return scores.masked_fill(~mask, float("-inf"))
+
+
+# ===== 엔드포인트 스키마 =====
+
+STRUCTURED_OUTPUT = os.environ.get("LLM_STRUCTURED_OUTPUT", "1") != "0"
+
+SCHEMAS = {}
+
+
+def register_schema(name: str, grammar: Element) -> OutputSchema:
+    SCHEMAS[name] = OutputSchema(name, grammar)
+    return SCHEMAS[name]
+
+
+def get_schema(name: str) -> OutputSchema:
+    return SCHEMAS[name]
+
+
+def with_schema(params, name: str):
+    """params에 스키마 지정 (구조화 출력이 꺼져 있으면 그대로 반환)"""
+    return replace(params, schema=name) if STRUCTURED_OUTPUT else params
+
+
+PLC_PHASES = Choice("도입기", "성장기", "성숙기", "쇠퇴기")
+SCORE = Choice(Digits(1, 2), "100")  # 0-100
+
+
+def _bullets(prefix: str, min_count: int, max_count: int) -> Element:
+    return Repeat(Seq(prefix, Text()), "\n", min_count, max_count)
+
+
+register_schema("plc-prediction", Seq(
+    "[현재단계] ", PLC_PHASES,
+    "\n[6개월예측] ", PLC_PHASES,
+    "\n[12개월예측] ", PLC_PHASES,
+    "\n[월별점수] ", Repeat(SCORE, ", ", 13, 13),
+    "\n\n[성장드라이버]\n", _bullets("• ", 2, 3),
+    "\n\n[하락리스크]\n", _bullets("• ", 2, 3),
+    "\n\n[시나리오]\n• 긍정 시나리오: ", Text(), "\n• 부정 시나리오: ", Text(),
+    "\n\n[종합의견] ", Text(),
+))
+
+register_schema("kbeauty-trends", Seq(
+    "[브랜드별 전략]\n", _bullets("- ", 4, 4),
+    "\n\n[성분 트렌드]\n", _bullets("- ", 3, 3),
+    "\n\n[기능 트렌드]\n", _bullets("- ", 3, 3),
+    "\n\n[시장 전망]\n", Text(),
+))
+
+REVIEW_TYPES = ("효과", "보습", "텍스처", "향", "가성비", "자극", "지속력", "흡수력", "재구매", "성분")
+
+# scripts/reclassify_with_exaone.py 응답: [{"id": 1, "sentiment": "positive", "reviewType": "효과"}, ...]
+register_schema("review-classification", Seq(
+    "[",
+    Repeat(Seq(
+        '{"id": ', Digits(1, 3),
+        ', "sentiment": "', Choice("positive", "negative"),
+        '", "reviewType": "', Choice(*REVIEW_TYPES), '"}',
+    ), ", ", 1, None),
+    "]",
+))
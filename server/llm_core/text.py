@@ -0,0 +1,66 @@
+"""
+LLM 출력 후처리 공용 함수
+- 기존 서버마다 복사되어 있던 clean_text / remove_repetitions 통합
+"""
+import re
+
+COUNTRY_NAMES = {
+    "usa": "미국", "japan": "일본", "singapore": "싱가포르",
+    "malaysia": "말레이시아", "indonesia": "인도네시아"
+}
+
+
+def clean_text(text: str, convert_bullets: bool = True) -> str:
+    """Remove markdown formatting from LLM output"""
+    # Remove bold/italic markers
+    text = text.replace("**", "").replace("*", "")
+    # Remove heading markers (##, ###, etc.) at start of lines
+    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
+    # Remove links [text](url) -> text
+    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+    # Remove code markers
+    text = text.replace("``", "").replace("`", "")
+    if convert_bullets:
+        # Remove any remaining markdown-style formatting
+        text = re.sub(r'^\s*[-*+]\s+', '• ', text, flags=re.MULTILINE)  # Convert list markers to bullet
+    return text.strip()
+
+
+def normalize_for_repetition(text: str) -> str:
+    """반복 비교용 정규화 (공백, 특수문자 제거)"""
+    return re.sub(r'[^\w가-힣]', '', text.lower())
+
+
+def remove_repetitions(text: str) -> str:
+    """텍스트에서 반복되는 문장/구문 제거"""
+    # 줄 단위로 분리
+    lines = text.split('\n')
+    seen_lines = set()
+    unique_lines = []
+
+    for line in lines:
+        # 정규화된 버전으로 비교 (공백, 특수문자 제거)
+        normalized = normalize_for_repetition(line)
+        if normalized and len(normalized) > 10:  # 짧은 줄은 무시
+            if normalized in seen_lines:
+                continue
+            seen_lines.add(normalized)
+        unique_lines.append(line)
+
+    # 연속 반복 문장 제거
+    result = '\n'.join(unique_lines)
+
+    # 같은 문장이 2번 이상 나오면 첫 번째만 유지
+    sentences = re.split(r'(?<=[.!?])\s+', result)
+    seen_sentences = set()
+    unique_sentences = []
+
+    for sentence in sentences:
+        normalized = normalize_for_repetition(sentence)
+        if normalized and len(normalized) > 20:
+            if normalized in seen_sentences:
+                continue
+            seen_sentences.add(normalized)
+        unique_sentences.append(sentence)
+
+    return ' '.join(unique_sentences)
@@ -0,0 +1,18 @@
+"""
+AMORE CLUE 멀티 엔드포인트 LLM 호스트
+- llm_host.json 설정대로 포트 5004~5007을 한 프로세스에서 실행 (디바이스당 모델 1회 로드)
+- 엔드포인트를 다른 포트/GPU로 옮기거나 한 GPU에 여러 포트를 올릴 때는 설정만 수정
+
+사용법:
+  python llm_host.py                     # 설정의 전체 포트
+  python llm_host.py --ports 5004 5005   # 일부 포트만
+  python llm_host.py --config my.json
+"""
+import setproctitle
+setproctitle.setproctitle("wook-llm-host")
+
+from llm_core.host import main
+
+
+if __name__ == "__main__":
+    main()
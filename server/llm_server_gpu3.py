@@ -2,33 +2,29 @@
 VLM Chatbot Server GPU3 for AMORE CLUE Dashboard
 Uses Qwen/Qwen2-VL-2B-Instruct on cuda:3
 Endpoints: chat/text, chat/multimodal, chat/health
-Features: RAG (ChromaDB), MongoDB context, VLM (image+text)
+Features: session memory (conversation_memory), MongoDB context, VLM (image+text)
 """
-import os
-import json
-import re
 import uuid
 import base64
 import io
-from datetime import datetime
 
 import torch
 from flask import Flask, request, jsonify
-from transformers import Qwen2VLForConditionalGeneration, AutoProcessor
+from transformers import Qwen2VLForConditionalGeneration, AutoProcessor, StoppingCriteriaList
 from qwen_vl_utils import process_vision_info
 from PIL import Image
-import chromadb
-from chromadb.config import Settings
-from pymongo import MongoClient
+from llm_core.context_snapshot import ContextProvider, ContextSnapshot, gather_context
+from llm_core.conversation_memory import conversation_memory
+from llm_core.mongo import MONGODB_DATABASE, get_db, mongo_health
+from llm_core.repetition import RepetitionStoppingCriteria
+from llm_core.streaming import enable_sse_streaming, open_stream_stage
+from llm_core.text import remove_repetitions
 
 app = Flask(__name__)
 
 # ===== Configuration =====
 DEVICE = "cuda:7"
 MODEL_NAME = "Qwen/Qwen2-VL-2B-Instruct"
-MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
-MONGODB_DATABASE = os.environ.get("MONGODB_DATABASE", "amore")
-CHROMA_PERSIST_DIR = os.path.join(os.path.dirname(__file__), "vector_db", "chat_history")
 
 # ===== Model Loading =====
 print(f"Loading VLM model: {MODEL_NAME} on {DEVICE}...")
@@ -42,30 +38,16 @@ model = Qwen2VLForConditionalGeneration.from_pretrained(
 model.eval()
 print(f"VLM model loaded successfully on {DEVICE}!")
 
-# ===== MongoDB Connection =====
-mongo_client = None
+# ===== MongoDB Connection (llm_core.mongo 공용 커넥션 풀) =====
 mongo_db = None
 try:
-    mongo_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-    mongo_client.server_info()
-    mongo_db = mongo_client[MONGODB_DATABASE]
+    mongo_db = get_db()
+    mongo_db.command("ping")
     print(f"MongoDB connected: {MONGODB_DATABASE}")
 except Exception as e:
+    mongo_db = None  # ping 실패 시 if mongo_db is not None 분기에서 MongoDB 조회 생략
     print(f"MongoDB connection failed: {e}")
 
-# ===== ChromaDB Setup =====
-os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
-chroma_client = chromadb.Client(Settings(
-    persist_directory=CHROMA_PERSIST_DIR,
-    anonymized_telemetry=False,
-    is_persistent=True,
-))
-chat_collection = chroma_client.get_or_create_collection(
-    name="chat_history",
-    metadata={"description": "AMORE CLUE chatbot conversation history"}
-)
-print(f"ChromaDB initialized: {CHROMA_PERSIST_DIR}")
-
 # ===== System Prompt =====
 SYSTEM_PROMPT = """당신은 AMORE CLUE 대시보드의 K-뷰티 이미지 분석 AI 어시스턴트입니다.
 
@@ -92,175 +74,119 @@ SYSTEM_PROMPT = """당신은 AMORE CLUE 대시보드의 K-뷰티 이미지 분
 - 답변은 명확하고 간결하게 한 번만 작성하세요"""
 
 
-def get_rag_context(query: str, top_k: int = 3) -> str:
-    """ChromaDB에서 유사한 이전 대화 검색"""
+def get_rag_context(session_id: str, query: str) -> str:
+    """같은 세션의 이전 대화 (최근 턴 + 밀려난 턴 중 질문과 비슷한 것, llm_core.conversation_memory)"""
     try:
-        if chat_collection.count() == 0:
-            return ""
+        return conversation_memory.context(session_id, query)
+    except Exception as e:
+        print(f"Conversation memory error: {e}")
+        return ""
 
-        results = chat_collection.query(
-            query_texts=[query],
-            n_results=min(top_k, chat_collection.count()),
-        )
 
-        if not results or not results["documents"] or not results["documents"][0]:
-            return ""
+def trends_context(db) -> list:
+    """트렌드 데이터 조회"""
+    trends = list(db.get_collection("trends").find(
+        {},
+        {"combination": 1, "category": 1, "score": 1, "country": 1, "ingredients": 1, "effects": 1, "_id": 0}
+    ).sort("score", -1).limit(15))
 
-        context_parts = []
-        for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
-            context_parts.append(f"Q: {meta.get('question', '')}\nA: {doc}")
+    if not trends:
+        return []
+    trend_summary = ", ".join([
+        f"{t.get('combination', '')}({t.get('category', '')}/{t.get('score', 0)}점)"
+        for t in trends
+    ])
+    return [f"[인기 트렌드 조합 Top15] {trend_summary}"]
 
-        return "\n---\n".join(context_parts)
-    except Exception as e:
-        print(f"RAG search error: {e}")
-        return ""
+
+def leaderboard_context(db) -> list:
+    """리더보드 데이터 조회 (국가별로 그룹화)"""
+    leaders = list(db.get_collection("leaderboard").find(
+        {},
+        {"keyword": 1, "score": 1, "trendLevel": 1, "itemType": 1, "country": 1, "_id": 0}
+    ).sort("score", -1).limit(20))
+
+    by_country = {}
+    for l in leaders:
+        country = l.get("country", "usa")
+        if country not in by_country:
+            by_country[country] = []
+        by_country[country].append(f"{l.get('keyword', '')}({l.get('trendLevel', '')}/{l.get('score', 0)}점)")
+
+    parts = []
+    for country, keywords in by_country.items():
+        country_name = {"usa": "미국", "japan": "일본", "singapore": "싱가포르"}.get(country, country)
+        parts.append(f"[{country_name} 인기 키워드] {', '.join(keywords[:10])}")
+    return parts
+
+
+def sns_context(db) -> list:
+    """SNS 플랫폼 통계"""
+    sns_stats = list(db.get_collection("sns_platform_stats").find(
+        {},
+        {"keyword": 1, "platform": 1, "mentionCount": 1, "_id": 0}
+    ).sort("mentionCount", -1).limit(10))
+
+    if not sns_stats:
+        return []
+    sns_summary = ", ".join([
+        f"{s.get('keyword', '')}({s.get('platform', '')}/{s.get('mentionCount', 0)}건)"
+        for s in sns_stats
+    ])
+    return [f"[SNS 인기 키워드] {sns_summary}"]
+
+
+def review_context(db) -> list:
+    """리뷰 키워드 통계 (긍정)"""
+    review_keywords = list(db.get_collection("review_keywords").find(
+        {},
+        {"keyword": 1, "sentiment": 1, "count": 1, "_id": 0}
+    ).sort("count", -1).limit(15))
+
+    positive = [r for r in review_keywords if r.get("sentiment") == "positive"]
+    if not positive:
+        return []
+    pos_summary = ", ".join([f"{r.get('keyword', '')}({r.get('count', 0)}건)" for r in positive[:8]])
+    return [f"[긍정 리뷰 키워드] {pos_summary}"]
+
+
+# 서로 독립인 4개 조회를 동시에 실행 (LLM_CONTEXT_PROVIDER_TIMEOUT 초과 시 해당 블록만 제외)
+CONTEXT_PROVIDERS = [
+    ContextProvider("Trends", trends_context),
+    ContextProvider("Leaderboard", leaderboard_context),
+    ContextProvider("SNS stats", sns_context),
+    ContextProvider("Review keywords", review_context),
+]
+
+
+def build_mongodb_context(db) -> str:
+    """트렌드/리더보드/SNS/리뷰 블록 (질문과 무관 → dashboard_snapshot이 TTL 동안 재사용)"""
+    return "\n".join(gather_context(CONTEXT_PROVIDERS, db))
+
+
+dashboard_snapshot = ContextSnapshot("gpu3", build_mongodb_context)
 
 
 def get_mongodb_context(query: str) -> str:
-    """MongoDB에서 관련 트렌드/리더보드/SNS 데이터 조회 (풍부한 컨텍스트)"""
+    """MongoDB 대시보드 컨텍스트 (스냅샷에서 반환, 요청마다 DB 조회 없음)"""
     if mongo_db is None:
         return ""
 
     try:
-        context_parts = []
-
-        # 1. 트렌드 데이터 조회
-        try:
-            trends_collection = mongo_db.get_collection("trends")
-            trends = list(trends_collection.find(
-                {},
-                {"combination": 1, "category": 1, "score": 1, "country": 1, "ingredients": 1, "effects": 1, "_id": 0}
-            ).sort("score", -1).limit(15))
-
-            if trends:
-                trend_summary = ", ".join([
-                    f"{t.get('combination', '')}({t.get('category', '')}/{t.get('score', 0)}점)"
-                    for t in trends
-                ])
-                context_parts.append(f"[인기 트렌드 조합 Top15] {trend_summary}")
-        except Exception as e:
-            print(f"Trends query error: {e}")
-
-        # 2. 리더보드 데이터 조회
-        try:
-            leaderboard_collection = mongo_db.get_collection("leaderboard")
-            leaders = list(leaderboard_collection.find(
-                {},
-                {"keyword": 1, "score": 1, "trendLevel": 1, "itemType": 1, "country": 1, "_id": 0}
-            ).sort("score", -1).limit(20))
-
-            if leaders:
-                # 국가별로 그룹화
-                by_country = {}
-                for l in leaders:
-                    country = l.get("country", "usa")
-                    if country not in by_country:
-                        by_country[country] = []
-                    by_country[country].append(f"{l.get('keyword', '')}({l.get('trendLevel', '')}/{l.get('score', 0)}점)")
-
-                for country, keywords in by_country.items():
-                    country_name = {"usa": "미국", "japan": "일본", "singapore": "싱가포르"}.get(country, country)
-                    context_parts.append(f"[{country_name} 인기 키워드] {', '.join(keywords[:10])}")
-        except Exception as e:
-            print(f"Leaderboard query error: {e}")
-
-        # 3. SNS 플랫폼 통계
-        try:
-            sns_collection = mongo_db.get_collection("sns_platform_stats")
-            sns_stats = list(sns_collection.find(
-                {},
-                {"keyword": 1, "platform": 1, "mentionCount": 1, "_id": 0}
-            ).sort("mentionCount", -1).limit(10))
-
-            if sns_stats:
-                sns_summary = ", ".join([
-                    f"{s.get('keyword', '')}({s.get('platform', '')}/{s.get('mentionCount', 0)}건)"
-                    for s in sns_stats
-                ])
-                context_parts.append(f"[SNS 인기 키워드] {sns_summary}")
-        except Exception as e:
-            print(f"SNS stats query error: {e}")
-
-        # 4. 리뷰 키워드 통계
-        try:
-            review_collection = mongo_db.get_collection("review_keywords")
-            review_keywords = list(review_collection.find(
-                {},
-                {"keyword": 1, "sentiment": 1, "count": 1, "_id": 0}
-            ).sort("count", -1).limit(15))
-
-            if review_keywords:
-                positive = [r for r in review_keywords if r.get("sentiment") == "positive"]
-                if positive:
-                    pos_summary = ", ".join([f"{r.get('keyword', '')}({r.get('count', 0)}건)" for r in positive[:8]])
-                    context_parts.append(f"[긍정 리뷰 키워드] {pos_summary}")
-        except Exception as e:
-            print(f"Review keywords query error: {e}")
-
-        return "\n".join(context_parts)
+        return dashboard_snapshot.get()
     except Exception as e:
         print(f"MongoDB context error: {e}")
         return ""
 
 
 def save_conversation(session_id: str, question: str, answer: str):
-    """대화를 MongoDB와 ChromaDB에 저장"""
+    """대화를 세션 메모리와 MongoDB chat_conversations(영구 기록, 재시작 후 세션 복원용)에 저장"""
     try:
-        # MongoDB에 저장
-        if mongo_db is not None:
-            mongo_db.get_collection("chat_conversations").insert_one({
-                "sessionId": session_id,
-                "question": question,
-                "answer": answer,
-                "timestamp": datetime.utcnow(),
-            })
-
-        # ChromaDB에 임베딩 저장
-        doc_id = str(uuid.uuid4())
-        chat_collection.add(
-            documents=[answer],
-            metadatas=[{"question": question, "sessionId": session_id, "timestamp": datetime.utcnow().isoformat()}],
-            ids=[doc_id],
-        )
+        conversation_memory.add(session_id, question, answer)
     except Exception as e:
         print(f"Save conversation error: {e}")
 
 
-def remove_repetitions(text: str) -> str:
-    """텍스트에서 반복되는 문장/구문 제거"""
-    # 줄 단위로 분리
-    lines = text.split('\n')
-    seen_lines = set()
-    unique_lines = []
-
-    for line in lines:
-        # 정규화된 버전으로 비교 (공백, 특수문자 제거)
-        normalized = re.sub(r'[^\w가-힣]', '', line.lower())
-        if normalized and len(normalized) > 10:  # 짧은 줄은 무시
-            if normalized in seen_lines:
-                continue
-            seen_lines.add(normalized)
-        unique_lines.append(line)
-
-    # 연속 반복 문장 제거
-    result = '\n'.join(unique_lines)
-
-    # 같은 문장이 2번 이상 나오면 첫 번째만 유지
-    sentences = re.split(r'(?<=[.!?])\s+', result)
-    seen_sentences = set()
-    unique_sentences = []
-
-    for sentence in sentences:
-        normalized = re.sub(r'[^\w가-힣]', '', sentence.lower())
-        if normalized and len(normalized) > 20:
-            if normalized in seen_sentences:
-                continue
-            seen_sentences.add(normalized)
-        unique_sentences.append(sentence)
-
-    return ' '.join(unique_sentences)
-
-
 def generate_text_response(user_message: str, rag_context: str, db_context: str) -> str:
     """텍스트 전용 VLM 응답 생성 (반복 방지 강화)"""
     # 프롬프트 구성
@@ -289,6 +215,9 @@ def generate_text_response(user_message: str, rag_context: str, db_context: str)
             do_sample=True,
             repetition_penalty=1.3,  # 반복 방지 강화 (1.1 → 1.3)
             no_repeat_ngram_size=4,  # 4-gram 반복 금지
+            streamer=open_stream_stage(processor.tokenizer, skip_prompt=True),
+            # 같은 문장이 반복되기 시작하면 생성 중단 (remove_repetitions와 같은 기준)
+            stopping_criteria=StoppingCriteriaList([RepetitionStoppingCriteria(processor.tokenizer, inputs["input_ids"].shape[1])]),
         )
 
     generated = outputs[0][inputs["input_ids"].shape[1]:]
@@ -349,6 +278,9 @@ def generate_multimodal_response(user_message: str, image_base64: str, rag_conte
             do_sample=True,
             repetition_penalty=1.3,  # 반복 방지 강화 (1.1 → 1.3)
             no_repeat_ngram_size=4,  # 4-gram 반복 금지
+            streamer=open_stream_stage(processor.tokenizer, skip_prompt=True),
+            # 같은 문장이 반복되기 시작하면 생성 중단 (remove_repetitions와 같은 기준)
+            stopping_criteria=StoppingCriteriaList([RepetitionStoppingCriteria(processor.tokenizer, inputs["input_ids"].shape[1])]),
         )
 
     generated = outputs[0][inputs["input_ids"].shape[1]:]
@@ -373,8 +305,8 @@ def chat_text():
         if not message:
             return jsonify({"success": False, "error": "메시지가 비어있습니다."}), 400
 
-        # RAG: 유사 이전 대화 검색
-        rag_context = get_rag_context(message)
+        # 같은 세션의 이전 대화
+        rag_context = get_rag_context(session_id, message)
 
         # MongoDB: 관련 데이터 조회
         db_context = get_mongodb_context(message)
@@ -410,7 +342,7 @@ def chat_multimodal():
 
         if not image_base64:
             # 이미지가 없으면 텍스트 전용으로 처리
-            rag_context = get_rag_context(message)
+            rag_context = get_rag_context(session_id, message)
             db_context = get_mongodb_context(message)
             response = generate_text_response(message, rag_context, db_context)
         else:
@@ -418,7 +350,7 @@ def chat_multimodal():
             if "," in image_base64:
                 image_base64 = image_base64.split(",", 1)[1]
 
-            rag_context = get_rag_context(message or "이미지 분석")
+            rag_context = get_rag_context(session_id, message or "이미지 분석")
             db_context = get_mongodb_context(message or "이미지 분석")
             response = generate_multimodal_response(message or "이 이미지를 분석해주세요.", image_base64, rag_context, db_context)
 
@@ -444,11 +376,16 @@ def health_check():
         "model": MODEL_NAME,
         "device": DEVICE,
         "port": 5008,
-        "mongodb": "connected" if mongo_db is not None else "disconnected",
-        "chromadb_docs": chat_collection.count(),
+        "mongodb": mongo_health(),
+        "contextSnapshot": dashboard_snapshot.stats(),
+        "conversationMemory": conversation_memory.stats(),
     })
 
 
+# ?stream=1 / Accept: text/event-stream 요청은 SSE로 토큰 스트리밍
+enable_sse_streaming(app)
+
+
 if __name__ == "__main__":
     print(f"\n{'='*50}")
     print(f"  AMORE CLUE VLM Chatbot Server")
@@ -456,6 +393,7 @@ if __name__ == "__main__":
     print(f"  Device: {DEVICE}")
     print(f"  Port: 5008")
     print(f"  MongoDB: {'connected' if mongo_db is not None else 'disconnected'}")
-    print(f"  ChromaDB: {CHROMA_PERSIST_DIR}")
     print(f"{'='*50}\n")
+    if mongo_db is not None:
+        dashboard_snapshot.start_watcher()
     app.run(host="0.0.0.0", port=5008, debug=False)
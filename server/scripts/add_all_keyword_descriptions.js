@@ -577,6 +577,13 @@ async function addAllDescriptions() {
   console.log(`\n아직 설명 없는 상위 키워드 ${remaining.length}개:`);
   remaining.forEach(k => console.log(` - ${k._id} (점수: ${Math.round(k.avgScore)})`));
 
+  // 챗봇 서버(llm_core/context_snapshot.py)가 대시보드 컨텍스트와 키워드 사전을 다시 로드하도록 신호 갱신
+  await db.collection('cache_signals').updateOne(
+    { _id: 'dashboard' },
+    { $set: { updatedAt: new Date(), source: 'add_all_keyword_descriptions' } },
+    { upsert: true }
+  );
+
   await client.close();
 }
 
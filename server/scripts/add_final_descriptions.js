@@ -244,6 +244,13 @@ async function addFinalDescriptions() {
   console.log(`\n고점수(70+) 키워드: ${highScoreTotal}개`);
   console.log(`고점수 설명 있음: ${highScoreWithDesc}개 (${Math.round(highScoreWithDesc/highScoreTotal*100)}%)`);
 
+  // 챗봇 서버(llm_core/context_snapshot.py)가 대시보드 컨텍스트와 키워드 사전을 다시 로드하도록 신호 갱신
+  await db.collection('cache_signals').updateOne(
+    { _id: 'dashboard' },
+    { $set: { updatedAt: new Date(), source: 'add_final_descriptions' } },
+    { upsert: true }
+  );
+
   await client.close();
 }
 
@@ -138,6 +138,13 @@ async function addDescriptions() {
     console.log('\n✅ 모든 키워드에 설명이 추가되었습니다!');
   }
 
+  // 챗봇 서버(llm_core/context_snapshot.py)가 대시보드 컨텍스트와 키워드 사전을 다시 로드하도록 신호 갱신
+  await db.collection('cache_signals').updateOne(
+    { _id: 'dashboard' },
+    { $set: { updatedAt: new Date(), source: 'add_keyword_descriptions' } },
+    { upsert: true }
+  );
+
   await client.close();
 }
 
@@ -377,6 +377,13 @@ async function addRemainingDescriptions() {
   console.log(`설명 있음: ${withDesc}개 (${Math.round(withDesc/total*100)}%)`);
   console.log(`설명 없음: ${total - withDesc}개`);
 
+  // 챗봇 서버(llm_core/context_snapshot.py)가 대시보드 컨텍스트와 키워드 사전을 다시 로드하도록 신호 갱신
+  await db.collection('cache_signals').updateOne(
+    { _id: 'dashboard' },
+    { $set: { updatedAt: new Date(), source: 'add_remaining_descriptions' } },
+    { upsert: true }
+  );
+
   await client.close();
 }
 
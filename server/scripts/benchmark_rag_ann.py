@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+RAG ANN 검색 벤치마크 (recall / latency, exact 검색 대비)
+- 기존 인덱스: python scripts/benchmark_rag_ann.py --index-dir rag_data/rag_index
+- 합성 데이터: python scripts/benchmark_rag_ann.py --synthetic 100000
+- 쿼리는 인덱스 문서 임베딩에 노이즈를 더해 생성 (임베딩 모델 불필요)
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from llm_core.ann import HNSW_AVAILABLE, ExactSearch, HNSWSearch, IVFSearch, build_ann  # noqa: E402
+from llm_core.rag_index import RagIndex, write_rag_index  # noqa: E402
+
+DEFAULT_INDEX_DIR = os.path.join(BASE_DIR, "rag_data", "rag_index")
+
+
+def make_synthetic_index(n, dim=384, clusters=200, seed=0):
+    """군집 구조가 있는 정규화 임베딩으로 임시 인덱스 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    embeddings = centers[rng.integers(clusters, size=n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    records = [{"id": f"doc_{i}", "type": "marketing_case" if i % 4 else "market_signal"} for i in range(n)]
+    index_dir = tempfile.mkdtemp(prefix="rag_ann_bench_")
+    write_rag_index(index_dir, records, embeddings, "synthetic")
+    return index_dir
+
+
+def make_queries(index, count, noise, seed=1):
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), size=min(count, len(index)), replace=False)
+    queries = np.asarray(index.embeddings[np.sort(rows)], dtype=np.float32)
+    queries += noise * rng.normal(size=queries.shape).astype(np.float32) / np.sqrt(queries.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def run(search, queries, k, doc_types, **options):
+    """(결과 행 목록, 쿼리별 latency ms)"""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = search.search(query, k, doc_types=doc_types, **options)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(set(int(r) for r in rows))
+    return results, np.asarray(latencies)
+
+
+def report(label, results, latencies, truth, k):
+    recall = np.mean([len(r & t) / max(1, min(k, len(t))) for r, t in zip(results, truth)])
+    print(f"  {label:<22} recall@{k}={recall:.3f}  p50={np.percentile(latencies, 50):.2f}ms  "
+          f"p95={np.percentile(latencies, 95):.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG ANN recall/latency benchmark")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 문서 수 (지정 시 --index-dir 무시)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--doc-type", default=None, help="type 필터 (예: marketing_case)")
+    parser.add_argument("--nprobe", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--ef", type=int, nargs="*", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RAG ANN 벤치마크")
+    print("=" * 60)
+
+    index_dir = make_synthetic_index(args.synthetic) if args.synthetic else args.index_dir
+    index = RagIndex(index_dir)
+    ann = index.manifest.get("ann", {}).get("backend")
+    print(f"인덱스: {index_dir} ({len(index)} documents, {index.dimension}D, {index.embeddings.dtype}, ann={ann})")
+
+    doc_types = (args.doc_type,) if args.doc_type else None
+    queries = make_queries(index, args.queries, args.noise)
+    truth, latencies = run(ExactSearch(index), queries, args.k, doc_types)
+    report("exact", truth, latencies, truth, args.k)
+
+    if ann != "ivf":
+        start = time.perf_counter()
+        build_ann(index_dir, "ivf", update_manifest=False)
+        print(f"  (ivf 빌드: {time.perf_counter() - start:.1f}s)")
+    ivf = IVFSearch(index)
+    for nprobe in args.nprobe:
+        results, latencies = run(ivf, queries, args.k, doc_types, nprobe=nprobe)
+        report(f"ivf nprobe={nprobe}", results, latencies, truth, args.k)
+
+    if HNSW_AVAILABLE:
+        start = time.perf_counter()
+        build_ann(index_dir, "hnsw", update_manifest=False)
+        print(f"  (hnsw 빌드: {time.perf_counter() - start:.1f}s)")
+        hnsw = HNSWSearch(index)
+        for ef in args.ef:
+            results, latencies = run(hnsw, queries, args.k, doc_types, ef=ef)
+            report(f"hnsw ef={ef}", results, latencies, truth, args.k)
+    else:
+        print("  hnsw: hnswlib 미설치 (pip install hnswlib) - 건너뜀")
+
+
+if __name__ == "__main__":
+    main()
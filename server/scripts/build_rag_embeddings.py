@@ -4,10 +4,11 @@ RAG용 벡터 임베딩 구축 스크립트
 - 마케팅 성공 사례 데이터셋
 - 시장/제품 신호 데이터셋
 - Transformers 직접 사용
+- 증분 빌드: 내용이 같은 문서는 기존 벡터 재사용, 새/수정 문서만 임베딩 (--force: 원본 변경 없어도 재빌드)
 """
 
 import os
-import json
+import sys
 import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModel
@@ -17,10 +18,24 @@ import numpy as np
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data_for_rag")
 OUTPUT_DIR = os.path.join(BASE_DIR, "rag_data")
+INDEX_DIR = os.path.join(OUTPUT_DIR, "rag_index")
+
+sys.path.insert(0, BASE_DIR)
+from llm_core.ann import ANN_BACKEND_OVERRIDE, DEFAULT_BUILD_BACKEND  # noqa: E402
+from llm_core.rag_build import build_incremental, source_digests, sources_unchanged  # noqa: E402
+from llm_core.rag_index import RagIndex  # noqa: E402
+
+# ANN 인덱스 종류 (LLM_RAG_ANN - 서버 검색 설정과 같은 변수, ivf: 기본, hnsw: hnswlib 필요, exact: 빌드 안 함)
+ANN_BACKEND = ANN_BACKEND_OVERRIDE or DEFAULT_BUILD_BACKEND
 
 # 임베딩 모델 (다국어 지원)
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
+SOURCE_FILES = [
+    os.path.join(DATA_DIR, "마케팅 성공 사례 데이터셋.xlsx"),
+    os.path.join(DATA_DIR, "시장, 제품 신호 데이터셋.xlsx"),
+]
+
 def mean_pooling(model_output, attention_mask):
     """Mean pooling for sentence embeddings"""
     token_embeddings = model_output[0]
@@ -49,8 +64,8 @@ def get_embeddings(texts, tokenizer, model, device, batch_size=16):
 
 def load_data():
     """엑셀 데이터 로드"""
-    marketing_df = pd.read_excel(os.path.join(DATA_DIR, "마케팅 성공 사례 데이터셋.xlsx"))
-    signal_df = pd.read_excel(os.path.join(DATA_DIR, "시장, 제품 신호 데이터셋.xlsx"))
+    marketing_df = pd.read_excel(SOURCE_FILES[0])
+    signal_df = pd.read_excel(SOURCE_FILES[1])
     return marketing_df, signal_df
 
 def create_marketing_documents(df):
@@ -136,83 +151,78 @@ def create_signal_documents(df):
 
     return documents, records
 
-def build_embeddings():
-    """임베딩 구축"""
+class LazyEncoder:
+    """바뀐 문서가 있을 때만 임베딩 모델 로드"""
+
+    def __init__(self):
+        self.tokenizer = None
+        self.model = None
+        self.device = torch.device("cpu")  # CPU 사용 (GPU 메모리 절약)
+
+    def __call__(self, texts):
+        if self.model is None:
+            print(f"   - 임베딩 모델 로드: {MODEL_NAME} ({self.device})")
+            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            self.model = AutoModel.from_pretrained(MODEL_NAME).to(self.device)
+            self.model.eval()
+        return get_embeddings(texts, self.tokenizer, self.model, self.device)
+
+
+def build_embeddings(force=False):
+    """임베딩 구축 (증분)"""
     print("=" * 60)
     print("RAG 벡터 임베딩 구축 시작")
     print("=" * 60)
 
+    if not force and sources_unchanged(INDEX_DIR, SOURCE_FILES, MODEL_NAME):
+        print(f"\n원본 데이터 변경 없음 - 기존 인덱스 유지: {INDEX_DIR} (--force로 재빌드)")
+        return INDEX_DIR
+
     # 1. 데이터 로드
-    print("\n[1/5] 데이터 로드 중...")
+    print("\n[1/4] 데이터 로드 중...")
+    sources = source_digests(SOURCE_FILES)
     marketing_df, signal_df = load_data()
     print(f"   - 마케팅 성공 사례: {len(marketing_df)}건")
     print(f"   - 시장/제품 신호: {len(signal_df)}건")
 
     # 2. 문서 생성
-    print("\n[2/5] 문서 생성 중...")
-    marketing_docs, marketing_records = create_marketing_documents(marketing_df)
-    signal_docs, signal_records = create_signal_documents(signal_df)
-
-    all_documents = marketing_docs + signal_docs
+    print("\n[2/4] 문서 생성 중...")
+    _, marketing_records = create_marketing_documents(marketing_df)
+    _, signal_records = create_signal_documents(signal_df)
     all_records = marketing_records + signal_records
+    print(f"   - 총 문서 수: {len(all_records)}건")
 
-    print(f"   - 총 문서 수: {len(all_documents)}건")
-
-    # 3. 임베딩 모델 로드
-    print(f"\n[3/5] 임베딩 모델 로드 중: {MODEL_NAME}")
-    # CPU 사용 (GPU 메모리 절약)
-    device = torch.device("cpu")
-    print(f"   - 디바이스: {device}")
-
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModel.from_pretrained(MODEL_NAME).to(device)
-    model.eval()
-
-    # 4. 임베딩 생성
-    print("\n[4/5] 임베딩 생성 중...")
-    embeddings = get_embeddings(all_documents, tokenizer, model, device)
-    print(f"   - 임베딩 차원: {embeddings.shape[1]}")
-
-    # 5. 저장
-    print(f"\n[5/5] 저장 중: {OUTPUT_DIR}")
+    # 3. 새/수정 문서만 임베딩 후 새 버전으로 저장, rag_index 링크 교체
+    print(f"\n[3/4] 임베딩 + 인덱스 저장 중: {INDEX_DIR}")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    # 임베딩을 records에 추가
-    for i, record in enumerate(all_records):
-        record["embedding"] = embeddings[i].tolist()
-
-    # JSON으로 저장
-    output_file = os.path.join(OUTPUT_DIR, "rag_embeddings.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "model": MODEL_NAME,
-            "dimension": int(embeddings.shape[1]),
-            "total_documents": len(all_records),
-            "documents": all_records
-        }, f, ensure_ascii=False, indent=2)
-
-    print(f"   - 저장 완료: {output_file}")
-
-    # 테스트 쿼리
-    print("\n[테스트] 유사도 검색...")
-    test_query = "일본 시장에서 VT 리들샷 마케팅"
-    test_embedding = get_embeddings([test_query], tokenizer, model, device)[0]
-
-    # 코사인 유사도 계산
-    similarities = np.dot(embeddings, test_embedding)
-    top_indices = np.argsort(similarities)[::-1][:3]
-
-    print(f"   쿼리: '{test_query}'")
-    print(f"   TOP 3 결과:")
-    for i, idx in enumerate(top_indices):
-        print(f"     {i+1}. {all_records[idx]['id']} (유사도: {similarities[idx]:.3f})")
-        print(f"        - {all_records[idx].get('brand', '')} {all_records[idx].get('product', '')}")
+    encoder = LazyEncoder()
+    result = build_incremental(INDEX_DIR, all_records, encoder, MODEL_NAME,
+                               ann_backend=ANN_BACKEND, sources=sources)
+    print(f"   - 재사용: {result['reused']}건, 새로 임베딩: {result['embedded']}건")
+    print(f"   - ANN 인덱스: {result['ann']}")
+    print(f"   - BM25 인덱스: {result['bm25']}")
+    print(f"   - 저장 완료: {INDEX_DIR} (version {result['version']})")
+
+    # 4. 테스트 쿼리 (모델을 로드한 경우만)
+    if encoder.model is not None:
+        print("\n[4/4] 유사도 검색 테스트...")
+        test_query = "일본 시장에서 VT 리들샷 마케팅"
+        index = RagIndex(INDEX_DIR)
+        similarities = index.scores(encoder([test_query])[0])
+        top_indices = np.argsort(similarities)[::-1][:3]
+
+        print(f"   쿼리: '{test_query}'")
+        print(f"   TOP 3 결과:")
+        for i, idx in enumerate(top_indices):
+            print(f"     {i+1}. {all_records[idx]['id']} (유사도: {similarities[idx]:.3f})")
+            print(f"        - {all_records[idx].get('brand', '')} {all_records[idx].get('product', '')}")
+        index.close()
 
     print("\n" + "=" * 60)
     print("RAG 벡터 임베딩 구축 완료!")
     print("=" * 60)
 
-    return output_file
+    return INDEX_DIR
 
 if __name__ == "__main__":
-    build_embeddings()
+    build_embeddings(force="--force" in sys.argv)
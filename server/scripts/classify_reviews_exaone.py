@@ -27,17 +27,23 @@ EXAONE_URL = os.getenv('EXAONE_URL', 'http://localhost:5006')  # GPU6
 REVIEW_TYPES = ['효과', '보습', '텍스처', '향', '가성비', '자극', '지속력', '흡수력']
 
 
-def call_exaone(prompt: str, max_tokens: int = 500) -> str:
-    """EXAONE API 호출"""
+def call_exaone(prompt: str, max_tokens: int = 500, max_busy_retries: int = 5) -> str:
+    """EXAONE API 호출 (서버가 429로 거절하면 Retry-After 만큼 쉬고 재시도)"""
     try:
-        response = requests.post(
-            f"{EXAONE_URL}/api/llm/classify-review",
-            json={
-                'prompt': prompt,
-                'max_tokens': max_tokens
-            },
-            timeout=60
-        )
+        for _ in range(max_busy_retries + 1):
+            response = requests.post(
+                f"{EXAONE_URL}/api/llm/classify-review",
+                json={
+                    'prompt': prompt,
+                    'max_tokens': max_tokens
+                },
+                timeout=60
+            )
+            if response.status_code != 429:
+                break
+            wait = int(response.headers.get('Retry-After', '10'))
+            print(f"EXAONE busy, retrying in {wait}s...")
+            time.sleep(wait)
         if response.status_code == 200:
             result = response.json()
             return result.get('response', result.get('text', ''))
@@ -2,25 +2,37 @@
 RAG 임베딩 재구축 스크립트
 - market_signal 데이터 제외
 - marketing_case에서 source_url, tags 컬럼 제외하고 재임베딩
+- 증분: 텍스트가 같은 문서는 기존 벡터 재사용, 바뀐 문서만 배치 임베딩 (--force: 원본 변경 없어도 재빌드)
+- 이전 버전은 rag_index.<version>/ 으로 남음 (백업 대신)
 """
-import json
+import numpy as np
 import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModel
 import os
+import sys
 
 # 경로 설정
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, 'data_for_rag')
-OUTPUT_PATH = os.path.join(BASE_DIR, 'rag_data', 'rag_embeddings.json')
+OUTPUT_PATH = os.path.join(BASE_DIR, 'rag_data', 'rag_index')
+
+sys.path.insert(0, BASE_DIR)
+from llm_core.ann import ANN_BACKEND_OVERRIDE, DEFAULT_BUILD_BACKEND  # noqa: E402
+from llm_core.rag_build import build_incremental, source_digests, sources_unchanged  # noqa: E402
+
+# ANN 인덱스 종류 (LLM_RAG_ANN - 서버 검색 설정과 같은 변수, ivf: 기본, hnsw: hnswlib 필요, exact: 빌드 안 함)
+ANN_BACKEND = ANN_BACKEND_OVERRIDE or DEFAULT_BUILD_BACKEND
 
 # 임베딩 모델
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBED_BATCH_SIZE = 16
 
-print(f"Loading embedding model: {MODEL_NAME}")
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModel.from_pretrained(MODEL_NAME)
-model.eval()
+EXCEL_PATH = os.path.join(DATA_DIR, '마케팅 성공 사례 데이터셋.xlsx')
+
+# 바뀐 문서가 있을 때만 로드
+tokenizer = None
+model = None
 
 def mean_pooling(model_output, attention_mask):
     """Mean pooling for sentence embeddings"""
@@ -28,21 +40,30 @@ def mean_pooling(model_output, attention_mask):
     input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
     return torch.sum(token_embeddings * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
 
-def get_embedding(text: str) -> list:
-    """텍스트 임베딩 생성"""
-    encoded = tokenizer([text], padding=True, truncation=True, max_length=512, return_tensors='pt')
-    with torch.no_grad():
-        output = model(**encoded)
-    embedding = mean_pooling(output, encoded['attention_mask'])
-    embedding = torch.nn.functional.normalize(embedding, p=2, dim=1)
-    return embedding.numpy()[0].tolist()
+def get_embeddings(texts: list):
+    """텍스트 배치 임베딩 생성"""
+    global tokenizer, model
+    if model is None:
+        print(f"Loading embedding model: {MODEL_NAME}")
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model = AutoModel.from_pretrained(MODEL_NAME)
+        model.eval()
+
+    batches = []
+    for i in range(0, len(texts), EMBED_BATCH_SIZE):
+        encoded = tokenizer(texts[i:i + EMBED_BATCH_SIZE], padding=True, truncation=True, max_length=512, return_tensors='pt')
+        with torch.no_grad():
+            output = model(**encoded)
+        embedding = mean_pooling(output, encoded['attention_mask'])
+        batches.append(torch.nn.functional.normalize(embedding, p=2, dim=1).numpy())
+        print(f"  Embedded {min(i + EMBED_BATCH_SIZE, len(texts))}/{len(texts)} documents")
+    return np.vstack(batches)
 
 def process_marketing_cases():
     """마케팅 성공 사례 데이터 처리 (source_url, tags 제외)"""
-    excel_path = os.path.join(DATA_DIR, '마케팅 성공 사례 데이터셋.xlsx')
-    print(f"Loading: {excel_path}")
+    print(f"Loading: {EXCEL_PATH}")
 
-    df = pd.read_excel(excel_path)
+    df = pd.read_excel(EXCEL_PATH)
     print(f"Loaded {len(df)} marketing cases")
 
     # source_url, tags 컬럼 제외
@@ -64,9 +85,6 @@ def process_marketing_cases():
         ]
         text = "\n".join(text_parts)
 
-        # 임베딩 생성
-        embedding = get_embedding(text)
-
         # 문서 구조 (source_url, tags 제외)
         doc = {
             "id": f"marketing_{row['case_id']}",
@@ -84,46 +102,36 @@ def process_marketing_cases():
             "why_it_worked": row['why_it_worked'],
             "evidence_snippet": row['evidence_snippet'],
             # source_url, tags 제외됨
-            "text": text,
-            "embedding": embedding
+            "text": text
         }
         documents.append(doc)
 
-        if (idx + 1) % 20 == 0:
-            print(f"  Processed {idx + 1}/{len(df)} documents")
-
     return documents
 
-def main():
+def main(force=False):
     print("=" * 50)
     print("RAG 임베딩 재구축 시작")
     print("=" * 50)
 
+    if not force and sources_unchanged(OUTPUT_PATH, [EXCEL_PATH], MODEL_NAME):
+        print(f"원본 데이터 변경 없음 - 기존 인덱스 유지: {OUTPUT_PATH} (--force로 재빌드)")
+        return
+
     # 마케팅 성공 사례만 처리 (market_signal 제외)
+    sources = source_digests([EXCEL_PATH])
     documents = process_marketing_cases()
 
-    # 최종 JSON 구조
-    result = {
-        "model": MODEL_NAME,
-        "dimension": 384,
-        "total_documents": len(documents),
-        "documents": documents
-    }
-
-    # 백업 생성
-    if os.path.exists(OUTPUT_PATH):
-        backup_path = OUTPUT_PATH.replace('.json', '_backup.json')
-        os.rename(OUTPUT_PATH, backup_path)
-        print(f"Backup created: {backup_path}")
-
-    # 저장
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-
-    print(f"\n저장 완료: {OUTPUT_PATH}")
+    # 바뀐 문서만 임베딩 → 새 버전 디렉터리에 저장 후 rag_index 링크 교체
+    result = build_incremental(OUTPUT_PATH, documents, get_embeddings, MODEL_NAME,
+                               ann_backend=ANN_BACKEND, sources=sources)
+    print(f"Reused {result['reused']}, embedded {result['embedded']} documents")
+    print(f"ANN index: {result['ann']}")
+    print(f"BM25 index: {result['bm25']}")
+
+    print(f"\n저장 완료: {OUTPUT_PATH} (version {result['version']})")
     print(f"총 문서 수: {len(documents)}")
     print("- market_signal: 0 (제외됨)")
     print(f"- marketing_case: {len(documents)} (source_url, tags 제외)")
 
 if __name__ == "__main__":
-    main()
+    main(force="--force" in sys.argv)
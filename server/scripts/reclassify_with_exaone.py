@@ -45,7 +45,8 @@ def classify_with_exaone(sentences: list) -> list:
     try:
         response = requests.post(EXAONE_URL, json={
             "prompt": prompt,
-            "max_tokens": 1500
+            "max_tokens": 1500,
+            "schema": "review-classification"  # 서버가 JSON 배열 형식으로만 생성
         }, timeout=120)
 
         if response.status_code == 200:
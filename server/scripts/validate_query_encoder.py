@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+RAG 쿼리 인코더 검증 (int8 / ONNX vs fp32)
+- 같은 쿼리를 fp32 torch 인코더와 후보 인코더로 임베딩해 cosine 일치도와 검색 top-k 일치율 비교
+- 최소 cosine이 --threshold 미만이면 exit 1
+- 사용: python scripts/validate_query_encoder.py --backend int8
+        python scripts/validate_query_encoder.py --backend onnx --threads 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from llm_core.ann import ExactSearch  # noqa: E402
+from llm_core.query_encoder import (  # noqa: E402
+    AGREEMENT_THRESHOLD, DEFAULT_MODEL_NAME, ONNX_PATH, VALIDATION_QUERIES, OnnxQueryEncoder, TorchQueryEncoder,
+)
+from llm_core.rag_index import RagIndex, index_exists  # noqa: E402
+
+DEFAULT_INDEX_DIR = os.path.join(BASE_DIR, "rag_data", "rag_index")
+
+
+def timed(encoder, queries):
+    start = time.perf_counter()
+    embeddings = np.stack([encoder.encode(q) for q in queries])
+    return embeddings, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query encoder cosine-agreement check")
+    parser.add_argument("--backend", choices=["int8", "onnx"], default="int8")
+    parser.add_argument("--model", default=None, help="기본: 인덱스 manifest의 model")
+    parser.add_argument("--onnx-path", default=ONNX_PATH)
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=AGREEMENT_THRESHOLD)
+    args = parser.parse_args()
+
+    index = RagIndex(args.index_dir) if index_exists(args.index_dir) else None
+    model_name = args.model or (index.model if index else "") or DEFAULT_MODEL_NAME
+    queries = list(VALIDATION_QUERIES)
+    if index:
+        # 인덱스 문서 첫 줄(제목)도 쿼리로 사용
+        for row in range(0, len(index), max(1, len(index) // 32)):
+            queries.append(index.document(row).get("text", "").split("\n")[0])
+
+    print("=" * 60)
+    print(f"쿼리 인코더 검증: fp32 vs {args.backend} ({model_name}, {len(queries)} queries)")
+    print("=" * 60)
+
+    reference = TorchQueryEncoder(model_name, threads=args.threads)
+    if args.backend == "onnx":
+        candidate = OnnxQueryEncoder(model_name, args.onnx_path, threads=args.threads)
+    else:
+        candidate = TorchQueryEncoder(model_name, quantize=True, threads=args.threads)
+
+    # 워밍업 후 측정
+    reference.encode(queries[0])
+    candidate.encode(queries[0])
+    ref_emb, ref_ms = timed(reference, queries)
+    cand_emb, cand_ms = timed(candidate, queries)
+
+    cosines = np.sum(ref_emb * cand_emb, axis=1)
+    print(f"  cosine: min={cosines.min():.4f} mean={cosines.mean():.4f}")
+    print(f"  latency: fp32 {ref_ms:.1f}ms/query, {args.backend} {cand_ms:.1f}ms/query")
+
+    if index:
+        search = ExactSearch(index)
+        agree = []
+        for r, c in zip(ref_emb, cand_emb):
+            ref_rows = set(int(x) for x in search.search(r, args.k)[0])
+            cand_rows = set(int(x) for x in search.search(c, args.k)[0])
+            agree.append(len(ref_rows & cand_rows) / max(1, len(ref_rows)))
+        print(f"  top-{args.k} 검색 일치율: {np.mean(agree):.3f}")
+
+    if cosines.min() < args.threshold:
+        print(f"FAIL: min cosine {cosines.min():.4f} < {args.threshold}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
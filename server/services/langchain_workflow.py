@@ -8,19 +8,21 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import BaseMessage
 from typing import TypedDict, List, Dict, Any
-from pymongo import MongoClient
 from datetime import datetime, timedelta
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# MongoDB 연결
-mongodb_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-mongodb_db = os.getenv("MONGODB_DATABASE", "amore")
-client = MongoClient(mongodb_uri)
-db = client[mongodb_db]
+# MongoDB 연결 (llm_core.mongo 공용 클라이언트, .env 로드 후 import)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_core.context_snapshot import mark_dashboard_updated  # noqa: E402
+from llm_core.mongo import get_db, get_mongo_client  # noqa: E402
+
+client = get_mongo_client()
+db = get_db()
 
 # Gemini API 키 (amore 폴더에서 가져온 값)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE")
@@ -460,7 +462,9 @@ def save_to_db(state: WorkflowState):
             "date": datetime.now(),
             "calculatedAt": datetime.now()
         })
-    
+
+    # 챗봇 서버의 대시보드 컨텍스트 스냅샷 갱신 신호
+    mark_dashboard_updated(db, source="langchain_workflow")
     print("✅ DB 저장 완료")
 
 
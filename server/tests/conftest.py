@@ -0,0 +1,68 @@
+"""
+테스트 공용 설정
+- server/ 를 import 경로에 추가 (python -m pytest 는 server/ 에서 실행)
+- CharTokenizer / tiny_lm: GPU·모델 다운로드 없이 배치 엔진/구조화 디코딩을 검증하는 문자 단위 토크나이저 + 랜덤 소형 Llama
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CharTokenizer:
+    """문자 1개 = 토큰 1개, id 0은 EOS"""
+
+    def __init__(self, alphabet: str = "abcdefghijklmnopqrstuvwxyz0123456789 .,:-#*{}[]\"\n가나다라마바사"):
+        self.alphabet = alphabet
+        self.eos_token_id = 0
+        self.pad_token_id = 0
+        self.all_special_ids = [0]
+        self._ids = {ch: i + 1 for i, ch in enumerate(alphabet)}
+
+    def __len__(self):
+        return len(self.alphabet) + 1
+
+    def encode(self, text: str, add_special_tokens: bool = False) -> list:
+        return [self._ids[ch] for ch in text if ch in self._ids]
+
+    def __call__(self, text, return_tensors=None, add_special_tokens=False):
+        import torch
+        ids = self.encode(text)
+        return {"input_ids": torch.tensor([ids], dtype=torch.long) if return_tensors == "pt" else ids}
+
+    def decode(self, ids, skip_special_tokens: bool = True) -> str:
+        if hasattr(ids, "tolist"):
+            ids = ids.tolist()
+        if isinstance(ids, int):
+            ids = [ids]
+        return "".join(self.alphabet[i - 1] for i in ids if 0 < i <= len(self.alphabet))
+
+    def convert_ids_to_tokens(self, ids):
+        return [self.alphabet[i - 1] if 0 < i <= len(self.alphabet) else "</s>" for i in ids]
+
+    def get_vocab(self) -> dict:
+        return {"</s>": 0, **self._ids}
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=True):
+        return "".join(f"{m['role'][0]}:{m['content']}\n" for m in messages)
+
+
+@pytest.fixture(scope="session")
+def char_tokenizer():
+    return CharTokenizer()
+
+
+@pytest.fixture(scope="session")
+def tiny_lm(char_tokenizer):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=len(char_tokenizer), hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=512,
+        eos_token_id=char_tokenizer.eos_token_id, pad_token_id=char_tokenizer.pad_token_id,
+    )
+    model = transformers.LlamaForCausalLM(config).eval()
+    return model
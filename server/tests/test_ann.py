@@ -0,0 +1,116 @@
+"""RAG ANN 백엔드: exact/IVF 검색 결과, type 필터, 백엔드 선택 fallback"""
+import numpy as np
+import pytest
+
+from llm_core import ann
+from llm_core.rag_index import RagIndex, write_rag_index
+
+
+def _unit(rows):
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    # 클러스터 8개 × 50문서, type은 marketing/npd 번갈아
+    rng = np.random.default_rng(0)
+    centers = _unit(rng.normal(size=(8, 16)))
+    vectors = _unit(np.repeat(centers, 50, axis=0) + 0.05 * rng.normal(size=(400, 16)))
+    records = [{"text": f"doc {i}", "type": "marketing" if i % 2 else "npd"} for i in range(len(vectors))]
+    write_rag_index(str(tmp_path), records, vectors, model="test", dtype="float32")
+    return str(tmp_path), vectors
+
+
+def test_exact_search_matches_brute_force(index_dir):
+    path, vectors = index_dir
+    index = RagIndex(path)
+    query = vectors[123]
+
+    rows, scores = ann.ExactSearch(index).search(query, 5)
+
+    expected = np.argsort(-(vectors @ query), kind="stable")[:5]
+    assert rows.tolist() == expected.tolist()
+    assert rows[0] == 123
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_exact_search_type_filter(index_dir):
+    path, vectors = index_dir
+    index = RagIndex(path)
+
+    rows, _ = ann.ExactSearch(index).search(vectors[10], 10, doc_types=["marketing"])
+    assert all(index.document(int(row))["type"] == "marketing" for row in rows)
+    # 없는 type이면 필터 없이 전체 검색
+    rows, _ = ann.ExactSearch(index).search(vectors[10], 3, doc_types=["unknown"])
+    assert rows[0] == 10
+
+
+def test_ivf_matches_exact_when_probing_every_cluster(index_dir):
+    path, vectors = index_dir
+    info = ann.build_ann(path, "ivf", nlist=8)
+    index = RagIndex(path)
+    ivf = ann.IVFSearch(index)
+
+    assert info == {"backend": "ivf", "nlist": 8}
+    assert index.manifest["ann"] == info
+    for row in (0, 77, 399):
+        exact_rows, _ = ann.ExactSearch(index).search(vectors[row], 5, doc_types=["npd"])
+        ivf_rows, _ = ivf.search(vectors[row], 5, doc_types=["npd"], nprobe=8)
+        assert ivf_rows.tolist() == exact_rows.tolist()
+
+
+def test_ivf_with_few_probes_still_finds_the_cluster(index_dir):
+    path, vectors = index_dir
+    ann.build_ann(path, "ivf", nlist=8)
+    ivf = ann.IVFSearch(RagIndex(path))
+
+    rows, _ = ivf.search(vectors[200], 5, nprobe=1)
+    assert rows[0] == 200
+    assert all(200 <= row < 250 for row in rows)  # 같은 클러스터(중심 4번) 문서
+
+
+def test_ivf_falls_back_to_exact_when_candidates_run_out(index_dir):
+    path, vectors = index_dir
+    ann.build_ann(path, "ivf", nlist=8)
+    index = RagIndex(path)
+
+    rows, _ = ann.IVFSearch(index).search(vectors[0], 120, nprobe=1)
+    assert len(rows) == 120
+    assert rows.tolist() == ann.ExactSearch(index).search(vectors[0], 120)[0].tolist()
+
+
+def test_load_ann_uses_exact_for_small_indexes(index_dir, monkeypatch):
+    path, _ = index_dir
+    ann.build_ann(path, "ivf", nlist=8)
+
+    assert isinstance(ann.load_ann(RagIndex(path)), ann.ExactSearch)  # 문서 수 < ANN_MIN_DOCUMENTS
+    monkeypatch.setattr(ann, "ANN_MIN_DOCUMENTS", 10)
+    assert isinstance(ann.load_ann(RagIndex(path)), ann.IVFSearch)
+
+
+def test_load_ann_falls_back_when_backend_is_unavailable(index_dir, monkeypatch):
+    path, _ = index_dir
+    monkeypatch.setattr(ann, "ANN_MIN_DOCUMENTS", 10)
+    monkeypatch.setattr(ann, "ANN_BACKEND_OVERRIDE", "ivf")  # 빌드 안 된 IVF → 파일 없음
+
+    assert isinstance(ann.load_ann(RagIndex(path)), ann.ExactSearch)
+
+
+def test_search_many_matches_single_queries(index_dir):
+    path, vectors = index_dir
+    search = ann.ExactSearch(RagIndex(path))
+    queries = vectors[[3, 150, 300]]
+    options = [{}, {"doc_types": ["marketing"]}, {"doc_types": ["npd"]}]
+
+    batched = ann.search_many(search, queries, [4, 4, 2], options)
+    for (rows, _), query, k, opts in zip(batched, queries, [4, 4, 2], options):
+        assert rows.tolist() == search.search(query, k, **opts)[0].tolist()
+
+
+@pytest.mark.skipif(not ann.HNSW_AVAILABLE, reason="hnswlib not installed")
+def test_hnsw_finds_nearest_neighbours(index_dir):
+    path, vectors = index_dir
+    ann.build_ann(path, "hnsw")
+    rows, _ = ann.HNSWSearch(RagIndex(path)).search(vectors[42], 5, doc_types=["npd"])
+
+    assert rows[0] == 42
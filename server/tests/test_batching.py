@@ -0,0 +1,70 @@
+"""ContinuousBatchingEngine: 배치 디코딩 결과가 단독 실행/model.generate와 같은지 (CPU, greedy)"""
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from llm_core.batching import ContinuousBatchingEngine, SamplingParams  # noqa: E402
+
+GREEDY = SamplingParams(do_sample=False, repetition_penalty=1.0)
+
+
+@pytest.fixture
+def engine(tiny_lm, char_tokenizer):
+    return ContinuousBatchingEngine(tiny_lm, char_tokenizer, "cpu", max_batch_size=4)
+
+
+def _messages(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_single_request_matches_model_generate(engine, tiny_lm, char_tokenizer):
+    messages = _messages("abcabc")
+    ids = char_tokenizer(char_tokenizer.apply_chat_template(messages), return_tensors="pt")["input_ids"]
+    with torch.no_grad():
+        expected = tiny_lm.generate(ids, max_new_tokens=20, do_sample=False)
+
+    assert engine.generate(messages, 20, GREEDY) == char_tokenizer.decode(expected[0, ids.shape[1]:])
+
+
+def test_batched_requests_match_sequential(engine):
+    # 길이가 다른 프롬프트 → 왼쪽 정렬 KV 병합 경로
+    prompts = [_messages("abc" * k) for k in (1, 3, 5, 2)]
+    sequential = [engine.generate(messages, 20, GREEDY) for messages in prompts]
+
+    futures = [engine.submit(messages, 20, GREEDY) for messages in prompts]
+    batched = [future.result(timeout=60) for future in futures]
+
+    assert batched == sequential
+    assert engine.stats()["peakBatchSize"] > 1
+
+
+def test_max_new_tokens_is_respected(engine, char_tokenizer):
+    text = engine.generate(_messages("hello"), 5, GREEDY)
+    assert len(char_tokenizer.encode(text)) <= 5
+
+
+class _RecordingStreamer:
+    def __init__(self):
+        self.tokens = []
+        self.ended = False
+
+    def put(self, token_id):
+        self.tokens.append(token_id)
+
+    def end(self):
+        self.ended = True
+
+    def reset(self):
+        self.tokens = []
+
+
+def test_expired_waiting_request_fails_and_ends_streamer(engine):
+    streamer = _RecordingStreamer()
+    future = engine.submit(_messages("abc"), 20, GREEDY, streamer=streamer, deadline=time.time() - 1)
+
+    with pytest.raises(RuntimeError, match="Inference timeout"):
+        future.result(timeout=30)
+    assert streamer.ended
+    assert streamer.tokens == []
@@ -0,0 +1,219 @@
+"""ConversationMemory: 세션 수/TTL 삭제, 링 버퍼 → recall, 세션별 recall 분리, chat_conversations 저장/복원"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from llm_core.conversation_memory import HISTORY_COLLECTION, ConversationMemory
+
+TOPICS = ["retinol", "cica", "snail", "vitamin", "sunscreen", "peptide"]
+
+
+class TopicEncoder:
+    """주제 단어 등장 여부로 만든 정규화 벡터 (같은 주제끼리만 유사)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode_batch(self, texts):
+        self.calls += 1
+        vectors = np.full((len(texts), len(TOPICS)), 1e-3, dtype=np.float32)
+        for row, text in enumerate(texts):
+            for col, topic in enumerate(TOPICS):
+                if topic in text.lower():
+                    vectors[row, col] = 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_memory(**kwargs):
+    options = {"max_turns": 2, "max_sessions": 10, "ttl": 3600, "recall": True, "recall_max": 10,
+               "encoder": TopicEncoder()}
+    options.update(kwargs)
+    return ConversationMemory(**options)
+
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient().db
+
+
+def test_ring_buffer_keeps_recent_turns_and_moves_dropped_to_recall():
+    memory = make_memory()
+    for topic in ["retinol", "cica", "snail", "vitamin"]:
+        memory.add("s1", f"{topic} question", f"{topic} answer")
+    memory.flush()
+
+    assert memory.recent("s1") == [("snail question", "snail answer"), ("vitamin question", "vitamin answer")]
+    assert memory.recall("s1", "is retinol safe?", k=1) == [("retinol question", "retinol answer")]
+    assert memory.recall("s1", "cica or retinol?", k=2) == [
+        ("retinol question", "retinol answer"), ("cica question", "cica answer"),
+    ]
+
+    context = memory.context("s1", "retinol again")
+    assert context.startswith("Q: retinol question")
+    assert context.endswith("A: vitamin answer")
+
+
+def test_recall_is_capped_per_session():
+    memory = make_memory(recall_max=2)
+    for topic in TOPICS:
+        memory.add("s1", f"{topic} q", f"{topic} a")
+    memory.flush()
+
+    # 링 버퍼 2턴 + recall 2턴, 가장 오래된 retinol/cica는 삭제
+    assert memory.stats()["turns"] == 4
+    assert memory.recall("s1", "retinol", k=5) == [("snail q", "snail a"), ("vitamin q", "vitamin a")]
+
+
+def test_recall_is_isolated_per_session():
+    memory = make_memory(max_turns=1)
+    memory.add("alice", "retinol for night?", "alice-only answer")
+    memory.add("alice", "sunscreen?", "spf 50")
+    memory.add("bob", "cica cream?", "bob answer")
+    memory.add("bob", "peptide serum?", "bob peptide")
+    memory.flush()
+
+    assert memory.recall("bob", "retinol", k=3) == [("cica cream?", "bob answer")]
+    assert "alice-only" not in memory.context("bob", "retinol")
+    assert memory.recall("alice", "retinol", k=3) == [("retinol for night?", "alice-only answer")]
+    assert memory.recent("carol") == [] and memory.recall("carol", "retinol") == []
+
+
+def test_least_recently_used_session_is_evicted():
+    memory = make_memory(max_sessions=2)
+    memory.add("a", "q", "a")
+    memory.add("b", "q", "b")
+    memory.recent("a")  # a 사용 → b가 가장 오래 안 쓴 세션
+    memory.add("c", "q", "c")
+
+    assert memory.recent("b") == []
+    assert memory.recent("a") == [("q", "a")]
+    assert memory.stats()["sessions"] == 2
+    assert memory.evicted == 1
+
+
+def test_idle_sessions_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    memory = make_memory(ttl=60)
+    memory.add("old", "q", "a")
+    now[0] += 30
+    memory.add("fresh", "q", "a")
+
+    now[0] += 40  # old는 70초, fresh는 40초
+    assert memory.recent("old") == []
+    assert memory.recent("fresh") == [("q", "a")]
+    assert memory.stats()["sessions"] == 1
+
+
+def test_add_persists_full_turn_to_chat_conversations(db):
+    memory = make_memory(db_fn=lambda: db)
+    long_answer = "x" * 1000
+    memory.add("s1", "retinol?", long_answer)
+    memory.add("", "ignored", "no session")
+    memory.flush()
+
+    docs = list(db[HISTORY_COLLECTION].find({}, {"_id": 0}))
+    assert len(docs) == 1
+    assert docs[0]["sessionId"] == "s1" and docs[0]["answer"] == long_answer  # 원문 그대로 저장
+    assert len(memory.recent("s1")[0][1]) < len(long_answer)  # 프롬프트용은 잘라서
+
+
+def test_session_is_rebuilt_from_chat_conversations_after_restart(db):
+    before = make_memory(db_fn=lambda: db)
+    for topic in ["retinol", "cica", "snail", "vitamin"]:
+        before.add("s1", f"{topic} q", f"{topic} a")
+    before.add("s2", "sunscreen q", "other session")
+    before.flush()
+
+    encoder = TopicEncoder()
+    after = make_memory(db_fn=lambda: db, encoder=encoder)  # 재시작 (메모리 비어 있음)
+
+    assert after.recent("s1") == [("snail q", "snail a"), ("vitamin q", "vitamin a")]
+    after.flush()  # 이전 턴 recall 임베딩은 백그라운드
+    assert after.recall("s1", "retinol", k=1) == [("retinol q", "retinol a")]
+    assert after.recall("s1", "sunscreen", k=5) == [("retinol q", "retinol a"), ("cica q", "cica a")]
+    assert after.stats()["restoredSessions"] == 1
+    assert encoder.calls == 3  # 복원 1회(일괄) + recall 질문 2회
+
+    after.add("s1", "peptide q", "peptide a")
+    after.flush()
+    assert after.recent("s1") == [("vitamin q", "vitamin a"), ("peptide q", "peptide a")]
+    assert db[HISTORY_COLLECTION].count_documents({"sessionId": "s1"}) == 5
+
+
+def test_unknown_session_is_looked_up_once(db):
+    memory = make_memory(db_fn=lambda: db)
+    assert memory.recent("new") == []
+
+    # 조회 후 생긴 기록은 같은 프로세스에서 add()로만 들어옴 → 다시 조회하지 않음
+    db[HISTORY_COLLECTION].insert_one({"sessionId": "new", "question": "q", "answer": "a"})
+    assert memory.recent("new") == []
+    assert memory.stats()["restoredSessions"] == 0
+
+
+class CountingDB:
+    """get_collection 호출 수를 세고, gate가 열릴 때까지 대기 (느린 MongoDB 흉내)"""
+
+    def __init__(self, db, gate=None):
+        self.db = db
+        self.gate = gate
+        self.calls = 0
+
+    def get_collection(self, name):
+        self.calls += 1
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        return self.db.get_collection(name)
+
+
+def test_concurrent_first_access_restores_session_once(db):
+    db[HISTORY_COLLECTION].insert_one({"sessionId": "s1", "question": "q", "answer": "a"})
+    gate = threading.Event()
+    counting = CountingDB(db, gate)
+    memory = make_memory(db_fn=lambda: counting)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(memory.recent("s1"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [[("q", "a")]] * 8
+    assert counting.calls == 1
+    assert memory.stats()["restoredSessions"] == 1
+
+
+def test_add_does_not_wait_for_database_or_encoder(db):
+    gate = threading.Event()
+    gate.set()
+    counting = CountingDB(db, gate)
+    memory = make_memory(max_turns=1, db_fn=lambda: counting)
+    memory.add("s1", "retinol q", "retinol a")  # 세션 복원(빈 기록) + 저장
+    memory.flush()
+    gate.clear()  # 이후 MongoDB 응답 지연
+
+    start = time.monotonic()
+    memory.add("s1", "cica q", "cica a")  # 저장 + recall 임베딩이 막혀 있어도 바로 반환
+    assert time.monotonic() - start < 1
+    assert memory.recent("s1") == [("cica q", "cica a")]
+
+    gate.set()
+    memory.flush(timeout=5)
+    assert db[HISTORY_COLLECTION].count_documents({"sessionId": "s1"}) == 2
+    assert memory.recall("s1", "retinol", k=1) == [("retinol q", "retinol a")]
+
+
+def test_database_errors_fall_back_to_process_memory():
+    def broken_db():
+        raise RuntimeError("mongo down")
+
+    memory = make_memory(db_fn=broken_db)
+    memory.add("s1", "q", "a")
+
+    assert memory.recent("s1") == [("q", "a")]
@@ -0,0 +1,100 @@
+"""KeywordDictionary: 겹치는 키워드, 영문 단어 경계, 한글 조사, Aho-Corasick 일치 위치"""
+import random
+
+import pytest
+
+from llm_core.keyword_dictionary import DESCRIPTION_COLLECTION, AhoCorasick, KeywordDictionary
+
+ENTRIES = [
+    ("snail mucin", "스네일 뮤신"),
+    ("snail", "달팽이"),
+    ("retinol", "레티놀"),
+    ("oil", "오일"),
+    ("cica", "시카"),
+    ("peptide", None),
+    ("x", "엑"),  # 1글자 영문은 등록 안 됨
+]
+
+
+@pytest.fixture
+def dictionary():
+    return KeywordDictionary(ENTRIES)
+
+
+def test_longest_overlapping_keyword_wins(dictionary):
+    assert dictionary.find("Snail Mucin essence review") == ["snail mucin"]
+    assert dictionary.find("snail   mucin") == ["snail mucin"]  # 공백 정규화
+    assert dictionary.find("snail cream and snail mucin") == ["snail", "snail mucin"]
+
+
+def test_english_keywords_match_only_on_word_boundaries(dictionary):
+    assert dictionary.find("toilet water and boiling") == []
+    assert dictionary.find("oil-free, oil.") == ["oil"]
+    assert dictionary.find("retinols") == []
+    assert dictionary.find("retinol3") == []
+    assert dictionary.find("(retinol)") == ["retinol"]
+
+
+def test_korean_names_match_with_particles(dictionary):
+    assert dictionary.find("레티놀이랑 시카를 같이 써도 돼?") == ["retinol", "cica"]
+    assert dictionary.find("스네일 뮤신은 달팽이 점액") == ["snail mucin", "snail"]
+    assert dictionary.find("오일리한 피부") == ["oil"]
+
+
+def test_results_are_ordered_deduplicated_and_limited(dictionary):
+    text = "peptide retinol peptide cica oil"
+    assert dictionary.find(text) == ["peptide", "retinol", "cica", "oil"]
+    assert dictionary.find(text, limit=2) == ["peptide", "retinol"]
+
+
+def test_short_patterns_are_skipped(dictionary):
+    assert len(dictionary) == 11
+    assert dictionary.find("x 엑") == []
+
+
+def test_automaton_matches_brute_force():
+    rng = random.Random(0)
+    patterns = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))): i for i in range(30)}
+    automaton = AhoCorasick(patterns)
+
+    for _ in range(200):
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        found = sorted((start, end, pattern) for start, end, _, pattern in automaton.iter_matches(text))
+        expected = sorted(
+            (i, i + len(p), p) for p in patterns for i in range(len(text) - len(p) + 1) if text.startswith(p, i)
+        )
+        assert found == expected
+
+
+def test_load_from_keyword_descriptions():
+    mongomock = pytest.importorskip("mongomock")
+    db = mongomock.MongoClient().db
+    db[DESCRIPTION_COLLECTION].insert_many([
+        {"keyword": "niacinamide", "koreanName": "나이아신아마이드", "description": "..."},
+        {"keyword": "ceramide", "description": "..."},
+        {"keyword": None, "koreanName": "무시"},
+    ])
+
+    dictionary = KeywordDictionary.load(db)
+
+    assert dictionary.find("나이아신아마이드 and ceramide") == ["niacinamide", "ceramide"]
+    assert dictionary.find("무시") == []
+
+
+def test_snapshot_reloads_dictionary_after_dashboard_signal():
+    mongomock = pytest.importorskip("mongomock")
+    from llm_core.context_snapshot import ContextSnapshot, dashboard_signal, mark_dashboard_updated
+
+    db = mongomock.MongoClient().db
+    db[DESCRIPTION_COLLECTION].insert_one({"keyword": "retinol", "koreanName": "레티놀"})
+    snapshot = ContextSnapshot("keywords", KeywordDictionary.load, db_fn=lambda: db, ttl=3600)
+    assert snapshot.get().find("레티놀 bakuchiol") == ["retinol"]
+
+    # 키워드 설명 스크립트가 끝나면서 남기는 신호 → 감시 스레드가 비교 후 다시 로드
+    db[DESCRIPTION_COLLECTION].insert_one({"keyword": "bakuchiol", "koreanName": "바쿠치올"})
+    mark_dashboard_updated(db, source="add_keyword_descriptions")
+    assert dashboard_signal(db) != snapshot.stats()["signal"]
+    snapshot.invalidate()
+
+    assert snapshot.refresh().find("레티놀 bakuchiol") == ["retinol", "bakuchiol"]
+    assert snapshot.builds == 2
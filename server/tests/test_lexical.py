@@ -0,0 +1,118 @@
+"""BM25 키워드 검색: 토큰화, 점수, 필드 가중치, RRF 순서, 읽기 전용 로드와 새 버전 게시"""
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from llm_core import lexical
+from llm_core.rag_index import MANIFEST_FILE, RagIndex, publish_index_version, stage_index_version, write_rag_index
+
+DOCS = [
+    {"text": "tirtir cushion foundation glow", "brand": "TIRTIR", "type": "marketing"},
+    {"text": "reedle shot serum with cica", "brand": "VT", "product": "Reedle Shot", "type": "npd"},
+    {"text": "cica cream for sensitive skin cica", "type": "npd"},
+    {"text": "snail mucin essence", "brand": "COSRX", "type": "marketing"},
+    {"text": "리들샷 앰플 판매 급증", "type": "overseas"},
+]
+
+
+def _write(path, docs=DOCS):
+    vectors = np.eye(len(docs), 4, dtype=np.float32) + 0.01
+    write_rag_index(str(path), [dict(d) for d in docs], vectors, model="test", dtype="float32")
+    return str(path)
+
+
+@pytest.fixture
+def bm25_index(tmp_path):
+    path = _write(tmp_path)
+    lexical.build_bm25(path)
+    return RagIndex(path)
+
+
+def test_tokenize_splits_korean_into_bigrams():
+    assert lexical.tokenize("Reedle Shot 리들샷을") == ["reedle", "shot", "리들", "들샷", "샷을"]
+    assert lexical.tokenize("앰플") == ["앰플"]
+
+
+def test_bm25_score_matches_formula(bm25_index):
+    search = lexical.BM25Search(bm25_index)
+    rows, scores = search.search("cica", 5)
+
+    # cica: 문서 1(tf 1), 문서 2(tf 2) → 짧고 tf 높은 문서 2가 먼저
+    assert rows.tolist() == [2, 1]
+    n, df = len(DOCS), 2
+    doclen = np.load(os.path.join(bm25_index.index_dir, lexical.DOCLEN_FILE))
+    avgdl = doclen.mean()
+    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    expected = [idf * tf * (lexical.BM25_K1 + 1) / (tf + lexical.BM25_K1 * (1 - lexical.BM25_B + lexical.BM25_B * doclen[row] / avgdl))
+                for row, tf in ((2, 2), (1, 1))]
+    assert np.allclose(scores, expected, rtol=1e-5)
+
+
+def test_brand_and_product_fields_are_weighted(bm25_index):
+    search = lexical.BM25Search(bm25_index)
+
+    rows, _ = search.search("reedle shot", 3)
+    assert rows[0] == 1
+    rows, _ = search.search("리들샷", 3)  # 한글 2-gram
+    assert rows.tolist() == [4]
+
+
+def test_type_filter_and_no_match(bm25_index):
+    search = lexical.BM25Search(bm25_index)
+
+    rows, _ = search.search("cica snail", 5, doc_types=["marketing"])
+    assert rows.tolist() == [3]
+    rows, scores = search.search("retinol", 5)
+    assert len(rows) == 0 and len(scores) == 0
+
+
+def test_reciprocal_rank_fusion_order():
+    vector = [10, 11, 12, 13]
+    keyword = [12, 10, 20]
+
+    # 두 목록 모두 상위인 문서가 먼저, 한쪽에만 있으면 순위가 높은 쪽이 먼저
+    assert lexical.reciprocal_rank_fusion([vector, keyword], k=60) == [10, 12, 11, 20, 13]
+    assert lexical.reciprocal_rank_fusion([vector, []]) == vector
+
+
+def test_load_without_bm25_is_vector_only_and_read_only(tmp_path):
+    path = _write(tmp_path)
+    before = {name: os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)}
+
+    assert lexical.load_bm25(RagIndex(path)) is None
+    assert {name: os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)} == before
+
+
+def test_load_with_broken_bm25_files_falls_back(bm25_index):
+    os.remove(os.path.join(bm25_index.index_dir, lexical.IDF_FILE))
+    assert lexical.load_bm25(RagIndex(bm25_index.index_dir)) is None
+
+
+def test_build_replaces_manifest_atomically(bm25_index):
+    path = bm25_index.index_dir
+    with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    assert manifest["bm25"]["terms"] > 0
+    assert manifest["model"] == "test"
+    assert not [name for name in os.listdir(path) if ".tmp-" in name]
+
+
+def test_rebuild_publishes_new_version_and_keeps_live_files(tmp_path):
+    index_dir = str(tmp_path / "rag_index")
+    first = stage_index_version(index_dir)
+    _write(first)
+    publish_index_version(index_dir, first)
+    live_files = sorted(os.listdir(first))
+
+    lexical.rebuild_bm25(index_dir)
+
+    assert sorted(os.listdir(first)) == live_files  # 게시됐던 버전은 그대로
+    current = os.path.realpath(index_dir)
+    assert current != os.path.realpath(first)
+    search = lexical.load_bm25(RagIndex(index_dir))
+    assert search is not None
+    assert search.search("cushion", 1)[0].tolist() == [0]
@@ -0,0 +1,88 @@
+"""PrefixCache: 최장 prefix 일치, 최소 일치 길이, LRU 삭제, 엔진에서 prefix KV 재사용 결과"""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from llm_core.batching import ContinuousBatchingEngine, SamplingParams  # noqa: E402
+from llm_core.prefix_cache import PrefixCache  # noqa: E402
+
+
+def _kv(length, layers=2):
+    """위치 i의 값이 i인 가짜 KV ((1, H, L, D) 텐서)"""
+    positions = torch.arange(length, dtype=torch.float32).view(1, 1, length, 1).expand(1, 2, length, 4)
+    return tuple((positions.clone(), positions.clone()) for _ in range(layers))
+
+
+def _add(cache, name, ids):
+    cache.add(name, torch.tensor(ids), _kv(len(ids)))
+
+
+def test_longest_prefix_wins():
+    cache = PrefixCache(min_match_tokens=2)
+    _add(cache, "short", [1, 2, 3])
+    _add(cache, "long", [1, 2, 3, 4, 5])
+    _add(cache, "other", [9, 9, 9, 9, 9, 9])
+
+    length, kv = cache.lookup(torch.tensor([[1, 2, 3, 4, 5, 6, 7]]))
+
+    assert length == 5
+    assert kv[0][0].shape[2] == 5
+    assert cache.stats()["hits"] == 1
+
+
+def test_partial_match_is_sliced_and_last_token_is_kept():
+    cache = PrefixCache(min_match_tokens=2)
+    _add(cache, "system", [1, 2, 3, 4, 5, 6])
+
+    # 4번째에서 갈라짐 → 앞 3개만 재사용
+    length, kv = cache.lookup(torch.tensor([[1, 2, 3, 7, 8]]))
+    assert length == 3
+    assert kv[0][0][0, 0, :, 0].tolist() == [0.0, 1.0, 2.0]
+
+    # prefix와 완전히 같은 프롬프트도 마지막 토큰은 새로 인코딩
+    length, _ = cache.lookup(torch.tensor([[1, 2, 3, 4, 5, 6]]))
+    assert length == 5
+
+
+def test_short_match_is_not_reused():
+    cache = PrefixCache(min_match_tokens=4)
+    _add(cache, "system", [1, 2, 3, 4, 5])
+
+    assert cache.lookup(torch.tensor([[1, 2, 3, 9, 9]])) == (0, None)
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_prefix_is_evicted():
+    cache = PrefixCache(min_match_tokens=2, max_entries=2)
+    _add(cache, "a", [1, 1, 1])
+    _add(cache, "b", [2, 2, 2])
+    cache.lookup(torch.tensor([[1, 1, 1, 5]]))  # a 사용 → b가 가장 오래됨
+    _add(cache, "c", [3, 3, 3])
+
+    assert set(cache.stats()["prefixes"]) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup(torch.tensor([[2, 2, 2, 5]])) == (0, None)
+
+
+def test_re_adding_a_name_replaces_the_entry():
+    cache = PrefixCache(min_match_tokens=2, max_entries=2)
+    _add(cache, "system", [1, 2, 3])
+    _add(cache, "system", [4, 5, 6, 7])
+
+    assert cache.stats()["prefixes"] == {"system": 4}
+    assert cache.stats()["evictions"] == 0
+    assert cache.lookup(torch.tensor([[1, 2, 3, 9]])) == (0, None)
+
+
+def test_engine_output_is_unchanged_by_prefix_reuse(tiny_lm, char_tokenizer):
+    system = "you are a helpful beauty trend analyst. answer briefly."
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": "retinol"}]
+    params = SamplingParams(do_sample=False, repetition_penalty=1.0)
+
+    plain = ContinuousBatchingEngine(tiny_lm, char_tokenizer, "cpu", max_batch_size=2)
+    expected = plain.generate(messages, 20, params)
+
+    cached = ContinuousBatchingEngine(tiny_lm, char_tokenizer, "cpu", max_batch_size=2)
+    cached.register_prefix("system", system)
+    assert cached.generate(messages, 20, params) == expected
+    assert cached.stats()["prefixCache"]["hits"] == 1
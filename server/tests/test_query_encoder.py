@@ -0,0 +1,59 @@
+"""쿼리 인코더 일치도: int8/ONNX 인코더가 fp32 torch 기준과 cosine AGREEMENT_THRESHOLD 이상인지
+(임베딩 모델이 로컬 HF 캐시에 없으면 skip, 다른 경로는 LLM_TEST_ENCODER_MODEL)"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from llm_core.query_encoder import (  # noqa: E402
+    AGREEMENT_THRESHOLD, DEFAULT_MODEL_NAME, ONNX_PATH, VALIDATION_QUERIES, OnnxQueryEncoder, TorchQueryEncoder,
+)
+
+MODEL_NAME = os.environ.get("LLM_TEST_ENCODER_MODEL", DEFAULT_MODEL_NAME)
+
+
+def _model_available(name: str) -> bool:
+    if os.path.isdir(name):
+        return True
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(name, "config.json"), str)
+
+
+pytestmark = pytest.mark.skipif(not _model_available(MODEL_NAME), reason=f"{MODEL_NAME} is not in the local model cache")
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return TorchQueryEncoder(MODEL_NAME)
+
+
+@pytest.fixture(scope="module")
+def reference_embeddings(reference):
+    return reference.encode_batch(VALIDATION_QUERIES)
+
+
+def _min_cosine(candidate, reference_embeddings) -> float:
+    return float(np.sum(reference_embeddings * candidate.encode_batch(VALIDATION_QUERIES), axis=1).min())
+
+
+def test_int8_encoder_agrees_with_fp32(reference_embeddings):
+    assert _min_cosine(TorchQueryEncoder(MODEL_NAME, quantize=True), reference_embeddings) >= AGREEMENT_THRESHOLD
+
+
+def test_onnx_encoder_agrees_with_fp32(reference_embeddings):
+    pytest.importorskip("onnxruntime")
+    if not os.path.exists(ONNX_PATH):
+        pytest.skip(f"{ONNX_PATH} not exported (python -m llm_core.query_encoder export)")
+    assert _min_cosine(OnnxQueryEncoder(MODEL_NAME, ONNX_PATH), reference_embeddings) >= AGREEMENT_THRESHOLD
+
+
+def test_batch_encoding_matches_single_queries(reference, reference_embeddings):
+    # 패딩이 섞인 배치와 단건 인코딩 결과가 같아야 함 (search_rag_batch가 배치로 인코딩)
+    single = np.stack([reference.encode(query) for query in VALIDATION_QUERIES])
+    np.testing.assert_allclose(single, reference_embeddings, atol=1e-4)
@@ -0,0 +1,64 @@
+"""RepetitionDetector: 문장 반복, 문장 경계 없는 구절 반복(n-gram), 정상 텍스트"""
+import pytest
+
+pytest.importorskip("torch")
+
+from llm_core.repetition import RepetitionDetector  # noqa: E402
+
+
+def _feed(tokenizer, text, **kwargs):
+    detector = RepetitionDetector(tokenizer, **kwargs)
+    for token_id in tokenizer.encode(text):
+        detector.feed(token_id)
+    return detector
+
+
+def test_repeated_sentences_stop_generation(char_tokenizer):
+    sentence = "the serum sells well in korea and japan. "
+    detector = _feed(char_tokenizer, "intro line here.\n" + sentence * 3)
+
+    assert detector.repeats == 2
+    assert detector.looping
+
+
+def test_phrase_loop_without_sentence_breaks_is_detected(char_tokenizer):
+    # 마침표/줄바꿈 없이 같은 구절만 반복 → 문장 단위 비교로는 잡히지 않음
+    detector = _feed(char_tokenizer, "retinol trend is rising " * 8)
+
+    assert detector.repeats == 0
+    assert detector.ngram_loop
+    assert detector.looping
+
+
+def test_phrase_loop_stops_within_a_few_repeats(char_tokenizer):
+    detector = RepetitionDetector(char_tokenizer)
+    phrase = char_tokenizer.encode("가나 다라 마바 사 ")
+    fed = 0
+    while not detector.looping and fed < 50:
+        for token_id in phrase:
+            detector.feed(token_id)
+        fed += 1
+
+    assert detector.looping
+    assert fed <= 6
+
+
+def test_normalization_ignores_case_and_punctuation(char_tokenizer):
+    detector = _feed(char_tokenizer, "Snail mucin, retinol - ceramide: peptide " + "snail mucin retinol ceramide peptide " * 4)
+    assert detector.ngram_loop
+
+
+def test_varied_text_is_not_flagged(char_tokenizer):
+    text = " ".join(f"keyword{i} score {i * 7} trend rising in market {i % 3}" for i in range(30)) + " "
+    detector = _feed(char_tokenizer, text)
+
+    assert not detector.looping
+
+
+def test_ngram_counts_only_recent_window(char_tokenizer):
+    phrase = "a b c d e f "
+    filler = " ".join(f"w{i}" for i in range(60)) + " "
+    # 같은 구절이 창 밖으로 밀려난 뒤 다시 나오면 누적하지 않음
+    detector = _feed(char_tokenizer, (phrase + filler) * 4, ngram_window=20)
+
+    assert not detector.looping
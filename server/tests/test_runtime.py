@@ -0,0 +1,23 @@
+"""runtime.visible_device: 설정의 물리 GPU 번호 → CUDA_VISIBLE_DEVICES 안의 번호"""
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("flask")
+
+from llm_core.runtime import visible_device  # noqa: E402
+
+
+@pytest.mark.parametrize("visible, device, expected", [
+    (None, "cuda:4", "cuda:4"),
+    ("4", "cuda:4", "cuda:0"),
+    ("6,7", "cuda:7", "cuda:1"),
+    (" 5 , 4 ", "cuda:4", "cuda:1"),
+    ("4", "cuda:5", "cuda:5"),  # 목록에 없으면 그대로 (torch가 에러)
+    ("4", "cpu", "cpu"),
+])
+def test_visible_device(monkeypatch, visible, device, expected):
+    if visible is None:
+        monkeypatch.delenv("CUDA_VISIBLE_DEVICES", raising=False)
+    else:
+        monkeypatch.setenv("CUDA_VISIBLE_DEVICES", visible)
+    assert visible_device(device) == expected
@@ -0,0 +1,147 @@
+"""PriorityScheduler: 가중치 순서, 배치 점유율 상한, deadline 만료, 대기열 상한"""
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pytest
+
+from llm_core.scheduler import (
+    BATCH, DASHBOARD, DEFAULT_CLASSES, INTERACTIVE, PriorityClass, PriorityScheduler, QueueFullError,
+)
+
+
+@dataclass(eq=False)
+class _Seq:
+    priority: str
+    name: str = ""
+    deadline: Optional[float] = None
+    future: Future = field(default_factory=Future)
+
+
+CLASSES = {
+    INTERACTIVE: PriorityClass(INTERACTIVE, weight=4, max_waiting=8, max_share=1.0, deadline=60),
+    DASHBOARD: PriorityClass(DASHBOARD, weight=2, max_waiting=8, max_share=0.5, deadline=120),
+    BATCH: PriorityClass(BATCH, weight=1, max_waiting=2, max_share=0.25, deadline=600),
+}
+
+
+def _drain(scheduler, active=None):
+    active = Counter(active or {})
+    order = []
+    while True:
+        seq = scheduler.pop_next(active)
+        if seq is None:
+            return order
+        order.append(seq.name)
+
+
+def test_weights_decide_admission_order():
+    scheduler = PriorityScheduler(max_batch_size=100, classes=CLASSES)
+    for i in range(4):
+        scheduler.push(_Seq(INTERACTIVE, f"i{i}"))
+        scheduler.push(_Seq(DASHBOARD, f"d{i}"))
+    for i in range(2):
+        scheduler.push(_Seq(BATCH, f"b{i}"))
+
+    order = _drain(scheduler)
+
+    # 같은 가상 시간이면 가중치 큰 클래스 먼저, 이후 가중치 비율(4:2:1)로 섞임
+    assert order[0] == "i0"
+    assert Counter(name[0] for name in order[:7]) == Counter({"i": 4, "d": 2, "b": 1})
+    # 클래스 안에서는 FIFO
+    assert [name for name in order if name.startswith("d")] == ["d0", "d1", "d2", "d3"]
+
+
+def test_lower_class_is_not_starved():
+    scheduler = PriorityScheduler(max_batch_size=100, classes=CLASSES)
+    for i in range(8):
+        scheduler.push(_Seq(INTERACTIVE, f"i{i}"))
+    scheduler.push(_Seq(BATCH, "b0"))
+
+    assert "b0" in _drain(scheduler)[:6]
+
+
+def test_max_share_caps_active_sequences_per_class():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=CLASSES)
+    for i in range(2):
+        scheduler.push(_Seq(BATCH, f"b{i}"))
+
+    assert scheduler.max_active(BATCH) == 2
+    assert scheduler.pop_next({BATCH: 2}) is None  # 이미 상한만큼 실행 중
+    assert scheduler.pop_next({BATCH: 1}).name == "b0"
+
+
+def _admit(scheduler, active):
+    """엔진 _admit_waiting과 같은 순서로 빈 슬롯을 채움"""
+    while sum(active.values()) < scheduler.max_batch_size:
+        seq = scheduler.pop_next(active)
+        if seq is None:
+            return
+        active[seq.priority] += 1
+
+
+def test_interactive_slot_is_reserved_when_batch_fills_with_background_work():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=DEFAULT_CLASSES)
+    for i in range(8):
+        scheduler.push(_Seq(DASHBOARD, f"d{i}"))
+        scheduler.push(_Seq(BATCH, f"b{i}"))
+
+    active = Counter()
+    _admit(scheduler, active)
+    assert sum(active.values()) == 8 - scheduler.reserved(INTERACTIVE)
+    assert scheduler.pop_next(active) is None  # 남은 슬롯은 interactive 전용
+
+    scheduler.push(_Seq(INTERACTIVE, "chat"))
+    seq = scheduler.pop_next(active)  # 다음 스텝에서 바로 합류
+    assert seq.name == "chat"
+
+
+def test_reserved_slot_is_released_when_interactive_is_running():
+    classes = dict(CLASSES, **{INTERACTIVE: PriorityClass(INTERACTIVE, 4, 8, 1.0, 60, reserved=1)})
+    scheduler = PriorityScheduler(max_batch_size=4, classes=classes)
+    scheduler.push(_Seq(DASHBOARD, "d0"))
+
+    assert scheduler.pop_next(Counter({DASHBOARD: 1, BATCH: 2})) is None
+    assert scheduler.pop_next(Counter({INTERACTIVE: 1, BATCH: 2})).name == "d0"
+    assert PriorityScheduler(max_batch_size=1, classes=classes).reserved(INTERACTIVE) == 0
+
+
+def test_retries_go_first():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=CLASSES)
+    scheduler.push(_Seq(INTERACTIVE, "i0"))
+    scheduler.push_retry(_Seq(BATCH, "retry"))
+
+    assert _drain(scheduler) == ["retry", "i0"]
+
+
+def test_expire_removes_past_deadline_and_cancelled():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=CLASSES)
+    late = _Seq(DASHBOARD, "late", deadline=100.0)
+    on_time = _Seq(DASHBOARD, "on_time", deadline=300.0)
+    cancelled = _Seq(INTERACTIVE, "cancelled", deadline=300.0)
+    cancelled.future.cancel()
+    for seq in (late, on_time, cancelled):
+        scheduler.push(seq)
+
+    assert scheduler.expire(now=200.0) == [late]
+    assert _drain(scheduler) == ["on_time"]
+    assert scheduler.stats({})[DASHBOARD]["expired"] == 1
+
+
+def test_full_queue_raises_with_retry_after():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=CLASSES)
+    scheduler.push(_Seq(BATCH, "b0"))
+    scheduler.push(_Seq(BATCH, "b1"))
+
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.push(_Seq(BATCH, "b2"))
+    assert excinfo.value.priority == BATCH
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats({})[BATCH]["rejected"] == 1
+    scheduler.check_admission(INTERACTIVE)  # 다른 클래스는 영향 없음
+
+
+def test_unknown_priority_falls_back_to_dashboard():
+    scheduler = PriorityScheduler(max_batch_size=8, classes=CLASSES)
+    assert scheduler.resolve("urgent") == DASHBOARD
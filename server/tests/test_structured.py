@@ -0,0 +1,149 @@
+"""구조화 출력: 문법 수용/거부, 토이 어휘의 허용 토큰 mask, 엔진 생성 결과 형식"""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from llm_core.batching import ContinuousBatchingEngine, SamplingParams  # noqa: E402
+from llm_core.structured import (  # noqa: E402
+    Choice, Digits, OutputSchema, Repeat, Seq, StructuredLogitsProcessor, Text, get_schema, register_schema,
+    TokenIndex,
+)
+
+
+class ToyTokenizer:
+    """여러 글자 토큰이 섞인 작은 어휘 (id 0 = EOS)"""
+
+    TOKENS = ["</s>", "[", "]", "[a]", " ", "yes", "no", "y", "n", "1", "2", "12", "123", ",", ", ",
+              "\n", "\nx", "x", "hi", "hi\n", "가", "가나"]
+
+    def __init__(self):
+        self.eos_token_id = 0
+        self.all_special_ids = [0]
+
+    def __len__(self):
+        return len(self.TOKENS)
+
+    def convert_ids_to_tokens(self, ids):
+        return [self.TOKENS[i] for i in ids]
+
+    def decode(self, ids, skip_special_tokens=True):
+        return "".join(self.TOKENS[i] for i in ids if i != 0)
+
+    def ids(self, *tokens):
+        return {self.TOKENS.index(t) for t in tokens}
+
+
+@pytest.fixture(scope="module")
+def toy():
+    return ToyTokenizer()
+
+
+def _accepts(schema, text):
+    state = schema.advance(schema.start, text.encode("utf-8"))
+    return bool(state) and schema.is_complete(state)
+
+
+def _allowed(schema, toy, prefix=""):
+    state = schema.advance(schema.start, prefix.encode("utf-8"))
+    mask = schema.allowed_mask(state, TokenIndex(toy))
+    return set(mask.nonzero().view(-1).tolist())
+
+
+def test_grammar_accepts_and_rejects():
+    schema = OutputSchema("test", Seq("[a] ", Choice("yes", "no"), "\n", Repeat(Digits(1, 2), ", ", 2, 3)))
+
+    assert _accepts(schema, "[a] yes\n1, 12")
+    assert _accepts(schema, "[a] no\n1, 2, 99")
+    assert not _accepts(schema, "[a] maybe\n1, 2")  # 선택지 밖
+    assert not _accepts(schema, "[a] yes\n1")  # 반복 최소 횟수 미달
+    assert not _accepts(schema, "[a] yes\n1, 2, 3, 4")  # 최대 횟수 초과
+    assert not _accepts(schema, "[a] yes\n123, 4")  # 자릿수 초과
+    assert not _accepts(schema, "[a] yes")  # 미완성
+
+
+def test_text_element_excludes_forbidden_bytes():
+    schema = OutputSchema("test", Seq("x", Text(), "\nx"))
+
+    assert _accepts(schema, "x한글 text\nx")
+    assert not _accepts(schema, "x\nx")  # Text는 최소 1글자
+    assert not _accepts(schema, "xa\nb\nx")
+
+
+def test_unbounded_repeat():
+    schema = OutputSchema("test", Seq("[", Repeat(Digits(1, 1), ",", 1, None), "]"))
+
+    assert _accepts(schema, "[1]")
+    assert _accepts(schema, "[" + ",".join("7" * 40) + "]")
+    assert not _accepts(schema, "[]")
+
+
+def test_registered_schemas_accept_expected_outputs():
+    plc = get_schema("plc-prediction")
+    sample = (
+        "[현재단계] 성장기\n[6개월예측] 성숙기\n[12개월예측] 성숙기\n"
+        "[월별점수] " + ", ".join(["70"] * 12 + ["100"]) + "\n\n"
+        "[성장드라이버]\n• 드라이버1\n• 드라이버2\n\n"
+        "[하락리스크]\n• 리스크1\n• 리스크2\n• 리스크3\n\n"
+        "[시나리오]\n• 긍정 시나리오: 좋음\n• 부정 시나리오: 나쁨\n\n"
+        "[종합의견] 의견"
+    )
+    assert _accepts(plc, sample)
+    assert not _accepts(plc, sample.replace("성장기", "폭발기", 1))
+    assert not _accepts(plc, sample.replace("100", "101"))
+
+    review = get_schema("review-classification")
+    assert _accepts(review, '[{"id": 1, "sentiment": "positive", "reviewType": "보습"}, '
+                            '{"id": 22, "sentiment": "negative", "reviewType": "향"}]')
+    assert not _accepts(review, '[{"id": 1, "sentiment": "neutral", "reviewType": "보습"}]')
+
+
+def test_mask_allows_multi_token_paths(toy):
+    schema = OutputSchema("test", Seq("[a] ", Choice("yes", "no")))
+
+    # "[" 와 "[a]" 모두 형식에 맞는 시작, "]"나 "yes"는 불가
+    assert _allowed(schema, toy) == toy.ids("[", "[a]")
+    assert _allowed(schema, toy, "[a] ") == toy.ids("yes", "no", "y", "n")
+    assert _allowed(schema, toy, "[a] y") == set()  # "es"로 시작하는 토큰이 어휘에 없음
+
+
+def test_mask_for_digits_and_separators(toy):
+    schema = OutputSchema("test", Repeat(Digits(1, 2), ", ", 1, 2))
+
+    assert _allowed(schema, toy) == toy.ids("1", "2", "12")  # 3자리 "123"은 제외
+    # 두 번째 자리 또는 구분자 (", " 한 토큰이든 "," + " "든), "12"는 3자리가 되어 제외
+    assert _allowed(schema, toy, "1") == toy.ids("1", "2", ",", ", ")
+    assert _allowed(schema, toy, "1, 2") == toy.ids("1", "2")  # 최대 2회 → 구분자 불가
+
+
+def test_mask_inside_free_text(toy):
+    schema = OutputSchema("test", Seq(Text(), "\nx"))
+    inside = _allowed(schema, toy, "hi")
+
+    # 줄바꿈 없는 토큰은 모두 허용, 탈출은 "\n"/"\nx"로만
+    assert toy.ids("hi", "가", "가나", "yes", "\n", "\nx") <= inside
+    assert not toy.ids("hi\n", "</s>") & inside
+
+
+def test_processor_allows_eos_only_when_complete(toy):
+    schema = OutputSchema("test", Choice("yes", "no"))
+    prompt = torch.tensor([[1, 1]])
+    processor = StructuredLogitsProcessor(schema, toy, prompt.shape[1], [0])
+    scores = torch.zeros(1, len(toy))
+
+    out = processor(prompt, scores)
+    assert torch.isinf(out[0, 0])  # 아직 완성 전 → EOS 차단
+    assert not torch.isinf(out[0, toy.TOKENS.index("yes")])
+
+    done = torch.cat([prompt, torch.tensor([[toy.TOKENS.index("no")]])], dim=1)
+    out = processor(done, scores)
+    assert (~torch.isinf(out[0])).nonzero().view(-1).tolist() == [0]
+
+
+def test_engine_output_follows_schema(tiny_lm, char_tokenizer):
+    register_schema("test-grades", Seq("[grade] ", Choice("a", "b", "c"), "\n[score] ", Digits(1, 2)))
+    engine = ContinuousBatchingEngine(tiny_lm, char_tokenizer, "cpu", max_batch_size=2)
+    schema = get_schema("test-grades")
+
+    for params in (SamplingParams(do_sample=False, schema="test-grades"), SamplingParams(schema="test-grades")):
+        text = engine.generate([{"role": "user", "content": "grade it"}], 30, params)
+        assert _accepts(schema, text), text